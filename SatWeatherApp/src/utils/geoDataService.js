@@ -24,6 +24,10 @@ const MAX_CACHE_SIZE = 30;
 // Cache TTL in milliseconds (15 minutes) - reduced for better memory management
 const CACHE_TTL_MS = 15 * 60 * 1000;
 
+// Shared domain geometry (lat/lon grids, bounds, padding) keyed by geometry id.
+// Split geodata files reference one geometry file instead of repeating it per frame
+const geometryCache = new Map();
+
 // Cleanup interval reference
 let cleanupIntervalId = null;
 
@@ -96,6 +100,200 @@ export const generateGeoDataUrl = (domain, product, timestamp) => {
   return geoDataUrl;
 };
 
+// Compact binary geodata (written by convert_geodata.py):
+// 'SWGD' magic, uint16 version, uint16 reserved, uint32 header length,
+// ASCII JSON header, then 8-byte aligned little-endian grid blocks
+const BINARY_GEODATA_MAGIC = 'SWGD';
+const BINARY_GEODATA_VERSION = 1;
+const BINARY_GEODATA_PREFIX_BYTES = 12;
+
+/**
+ * Decode a binary geodata file into the same shape as the JSON format
+ * Grids become arrays of Float32Array rows, so grid[row][col] lookups keep working.
+ * 3D blocks (multi-frame bundles) become arrays of such grids
+ * @param {ArrayBuffer} buffer - Raw file contents
+ * @returns {Object} Geospatial data object
+ */
+export const decodeBinaryGeoData = (buffer) => {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(
+    view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3)
+  );
+  if (magic !== BINARY_GEODATA_MAGIC) {
+    throw new Error('Not a binary geodata file');
+  }
+  const version = view.getUint16(4, true);
+  if (version !== BINARY_GEODATA_VERSION) {
+    throw new Error(`Unsupported binary geodata version: ${version}`);
+  }
+
+  // Header is plain ASCII - decode by hand since TextDecoder is not available everywhere
+  const headerLength = view.getUint32(8, true);
+  const headerBytes = new Uint8Array(buffer, BINARY_GEODATA_PREFIX_BYTES, headerLength);
+  let headerText = '';
+  for (let i = 0; i < headerBytes.length; i += 8192) {
+    headerText += String.fromCharCode.apply(null, headerBytes.subarray(i, i + 8192));
+  }
+  const geoData = JSON.parse(headerText);
+
+  Object.entries(geoData.blocks || {}).forEach(([name, block]) => {
+    const [frames, rows, cols] = block.shape.length === 3 ? block.shape : [1, ...block.shape];
+    let values;
+    if (block.dtype === 'int16') {
+      const quantized = new Int16Array(buffer, block.offset, frames * rows * cols);
+      values = new Float32Array(quantized.length);
+      for (let i = 0; i < quantized.length; i++) {
+        values[i] = quantized[i] === block.fill
+          ? NaN
+          : quantized[i] * block.scale + block.add_offset;
+      }
+    } else {
+      values = new Float32Array(buffer, block.offset, frames * rows * cols);
+    }
+
+    const grids = new Array(frames);
+    for (let frame = 0; frame < frames; frame++) {
+      const grid = new Array(rows);
+      for (let row = 0; row < rows; row++) {
+        const start = (frame * rows + row) * cols;
+        grid[row] = values.subarray(start, start + cols);
+      }
+      grids[frame] = grid;
+    }
+    geoData[name] = block.shape.length === 3 ? grids : grids[0];
+  });
+  delete geoData.blocks;
+
+  return geoData;
+};
+
+/**
+ * Decode an int16-quantized JSON data grid (data_encoding: { scale, add_offset, fill })
+ * into Float32Array rows of physical values; fill codes become NaN
+ * @param {Array} grid - 2D array of integer codes
+ * @param {Object} encoding - Quantization parameters
+ * @returns {Array} Array of Float32Array rows
+ */
+const decodeQuantizedGrid = (grid, encoding) =>
+  grid.map((row) => {
+    const decoded = new Float32Array(row.length);
+    for (let i = 0; i < row.length; i++) {
+      decoded[i] = row[i] === encoding.fill ? NaN : row[i] * encoding.scale + encoding.add_offset;
+    }
+    return decoded;
+  });
+
+/**
+ * Expand adaptive lat/lon control points back to the full grid
+ * (separable linear interpolation between the kept rows/cols)
+ * @param {Array} control - Control grid rows (grid_index.rows x grid_index.cols)
+ * @param {Object} gridIndex - { rows, cols } kept grid indices
+ * @returns {Float32Array[]} Full grid rows
+ */
+const expandControlGrid = (control, gridIndex) => {
+  const { rows, cols } = gridIndex;
+  const width = cols[cols.length - 1] + 1;
+  const height = rows[rows.length - 1] + 1;
+
+  // Interpolate each control row across all columns
+  const controlRows = control.map((row) => {
+    const expanded = new Float32Array(width);
+    for (let k = 0; k < cols.length - 1; k++) {
+      const c0 = cols[k];
+      const c1 = cols[k + 1];
+      for (let c = c0; c <= c1; c++) {
+        const t = (c - c0) / (c1 - c0);
+        expanded[c] = row[k] * (1 - t) + row[k + 1] * t;
+      }
+    }
+    if (cols.length === 1) expanded[0] = row[0];
+    return expanded;
+  });
+
+  // Then between control rows
+  const grid = new Array(height);
+  for (let k = 0; k < rows.length - 1; k++) {
+    const r0 = rows[k];
+    const r1 = rows[k + 1];
+    for (let r = r0; r <= r1; r++) {
+      const t = (r - r0) / (r1 - r0);
+      const expanded = new Float32Array(width);
+      for (let c = 0; c < width; c++) {
+        expanded[c] = controlRows[k][c] * (1 - t) + controlRows[k + 1][c] * t;
+      }
+      grid[r] = expanded;
+    }
+  }
+  if (rows.length === 1) grid[0] = controlRows[0];
+  return grid;
+};
+
+/**
+ * Fetch and parse a geodata file in either format
+ * @param {string} url - File URL (.json or .bin)
+ * @param {number} timeout - Request timeout in ms
+ * @returns {Promise<Object|null>} Parsed geodata or null if not found
+ */
+const fetchGeoDataFile = async (url, timeout) => {
+  const binary = /\.bin$/.test(url);
+  const controller = new AbortController();
+  const timeoutId = setTimeout(() => controller.abort(), timeout);
+
+  try {
+    const response = await fetch(url, {
+      signal: controller.signal,
+      headers: {
+        'Accept': binary ? 'application/octet-stream' : 'application/json',
+      },
+    });
+    if (!response.ok) {
+      return null;
+    }
+    return binary ? decodeBinaryGeoData(await response.arrayBuffer()) : await response.json();
+  } finally {
+    clearTimeout(timeoutId);
+  }
+};
+
+/**
+ * Attach shared geometry to a split values file
+ * Values files carry geometry: { id, file_stem }; file_stem is the geometry file's
+ * path relative to the values file (one per domain, e.g. '../conus.geometry.<id>')
+ * and it is fetched once per id
+ * @param {Object} geoData - Parsed values file
+ * @param {string} url - URL the values file was fetched from
+ * @param {number} timeout - Request timeout in ms
+ * @returns {Promise<Object>} Geodata with geometry fields merged in
+ */
+const resolveGeometry = async (geoData, url, timeout) => {
+  const ref = geoData?.geometry;
+  if (!ref?.id || geoData.lat_grid) {
+    return geoData;
+  }
+
+  let geometry = geometryCache.get(ref.id);
+  if (!geometry) {
+    const extension = url.match(/\.(json|bin)$/)?.[0] || '.json';
+    const geometryUrl = url.replace(/[^/]*$/, `${ref.file_stem}${extension}`);
+    geometry = await fetchGeoDataFile(geometryUrl, timeout);
+    if (!geometry) {
+      console.warn('[GEODATA] Geometry file not found:', geometryUrl);
+      return geoData;
+    }
+    geometryCache.set(ref.id, geometry);
+  }
+
+  return { ...geometry, ...geoData };
+};
+
+/**
+ * Check that a value is a 2D grid (array of arrays or array of typed-array rows)
+ * @param {*} grid - Candidate grid
+ * @returns {boolean} True if grid[row][col] indexing is valid
+ */
+const isGrid = (grid) =>
+  Array.isArray(grid) && (Array.isArray(grid[0]) || ArrayBuffer.isView(grid[0]));
+
 /**
  * Generate cache key for geospatial data
  * @param {Object} domain - Domain configuration
@@ -145,6 +343,7 @@ export const fetchGeoData = async (domain, product, timestamp, options = {}) =>
     timeout = 10000,
     useCache = true,
     fallbackToDomainBounds = true,
+    format = 'json', // 'json' or 'binary'
   } = options;
 
   if (!domain || !product || !timestamp) {
@@ -164,7 +363,8 @@ export const fetchGeoData = async (domain, product, timestamp, options = {}) =>
     return geoDataCache.get(cacheKey);
   }
 
-  const url = generateGeoDataUrl(domain, product, timestamp);
+  const jsonUrl = generateGeoDataUrl(domain, product, timestamp);
+  const url = jsonUrl && format === 'binary' ? jsonUrl.replace(/\.json$/, '.bin') : jsonUrl;
 
   if (!url) {
     return fallbackToDomainBounds ? createFallbackGeoData(domain) : null;
@@ -177,7 +377,7 @@ export const fetchGeoData = async (domain, product, timestamp, options = {}) =>
     const response = await fetch(url, {
       signal: controller.signal,
       headers: {
-        'Accept': 'application/json',
+        'Accept': format === 'binary' ? 'application/octet-stream' : 'application/json',
       },
     });
 
@@ -197,7 +397,11 @@ export const fetchGeoData = async (domain, product, timestamp, options = {}) =>
       return fallbackData;
     }
 
-    const geoData = await response.json();
+    const geoData = await resolveGeometry(
+      format === 'binary' ? decodeBinaryGeoData(await response.arrayBuffer()) : await response.json(),
+      url,
+      timeout
+    );
 
     // Validate the structure
     const validatedData = validateGeoData(geoData, domain);
@@ -270,6 +474,7 @@ const validateGeoData = (geoData, domain) => {
     isFallback: false,
     lat_grid: null,
     lon_grid: null,
+    lookup: null,
     metadata: {},
   };
 
@@ -307,8 +512,11 @@ const validateGeoData = (geoData, domain) => {
   // Validate data values (2D grid)
   if (geoData.data_values || geoData.dataValues) {
     const dataGrid = geoData.data_values || geoData.dataValues;
-    if (Array.isArray(dataGrid) && Array.isArray(dataGrid[0])) {
-      validated.dataValues = dataGrid;
+    if (isGrid(dataGrid)) {
+      // Quantized physical values (K / %) from the pipeline; binary files arrive decoded
+      validated.dataValues = geoData.data_encoding
+        ? decodeQuantizedGrid(dataGrid, geoData.data_encoding)
+        : dataGrid;
     }
   }
 
@@ -317,11 +525,22 @@ const validateGeoData = (geoData, domain) => {
   validated.data_name = geoData.data_name || '';
 
   // Validate lat/lon grids for geostationary projection
-  if (geoData.lat_grid && Array.isArray(geoData.lat_grid) && Array.isArray(geoData.lat_grid[0])) {
-    validated.lat_grid = geoData.lat_grid;
+  // (adaptive geometry ships control points only; expand to the full grid)
+  const gridIndex = geoData.grid_index;
+  if (isGrid(geoData.lat_grid)) {
+    validated.lat_grid = gridIndex ? expandControlGrid(geoData.lat_grid, gridIndex) : geoData.lat_grid;
   }
-  if (geoData.lon_grid && Array.isArray(geoData.lon_grid) && Array.isArray(geoData.lon_grid[0])) {
-    validated.lon_grid = geoData.lon_grid;
+  if (isGrid(geoData.lon_grid)) {
+    validated.lon_grid = gridIndex ? expandControlGrid(geoData.lon_grid, gridIndex) : geoData.lon_grid;
+  }
+
+  // Optional inverse lookup raster (lat/lon -> fractional grid row/col)
+  if (geoData.lookup && isGrid(geoData.lookup_row) && isGrid(geoData.lookup_col)) {
+    validated.lookup = {
+      ...geoData.lookup,
+      row: geoData.lookup_row,
+      col: geoData.lookup_col,
+    };
   }
 
   // Validate polygons
@@ -349,13 +568,15 @@ const validateGeoData = (geoData, domain) => {
  * @param {Object} domain - Domain configuration
  * @param {Object} product - Product configuration
  * @param {Array} timestamps - Array of timestamp strings
- * @param {Object} options - Fetch options
+ * @param {Object} options - Fetch options (bundleUrl loads the whole loop from one bundle file)
  * @returns {Promise<Map>} Map of timestamp -> geoData
  */
 export const prefetchGeoData = async (domain, product, timestamps, options = {}) => {
   const {
     batchSize = 3,
     timeout = 10000,
+    bundleUrl = null,
+    format = 'json',
   } = options;
 
   const results = new Map();
@@ -364,6 +585,20 @@ export const prefetchGeoData = async (domain, product, timestamps, options = {})
     return results;
   }
 
+  if (bundleUrl) {
+    const bundleResults = await loadGeoDataBundle(domain, product, bundleUrl, timeout);
+    timestamps.forEach((timestamp) => {
+      if (bundleResults.has(timestamp)) {
+        results.set(timestamp, bundleResults.get(timestamp));
+      }
+    });
+    // Anything the bundle did not cover falls through to per-frame requests
+    timestamps = timestamps.filter(timestamp => !results.has(timestamp));
+    if (timestamps.length === 0) {
+      return results;
+    }
+  }
+
   console.log(`Prefetching geospatial data for ${timestamps.length} frames...`);
 
   // Process in batches to avoid overwhelming network
@@ -375,6 +610,7 @@ export const prefetchGeoData = async (domain, product, timestamps, options = {})
         timeout,
         useCache: true,
         fallbackToDomainBounds: true,
+        format,
       });
 
       return { timestamp, geoData };
@@ -392,12 +628,53 @@ export const prefetchGeoData = async (domain, product, timestamps, options = {})
   return results;
 };
 
+/**
+ * Load a multi-frame bundle (one values file for a whole animation loop)
+ * Each frame is validated and cached under its own timestamp
+ * @param {Object} domain - Domain configuration
+ * @param {Object} product - Product configuration
+ * @param {string} url - Bundle URL (.json or .bin)
+ * @param {number} timeout - Request timeout in ms
+ * @returns {Promise<Map>} Map of timestamp -> geoData
+ */
+export const loadGeoDataBundle = async (domain, product, url, timeout = 10000) => {
+  const results = new Map();
+
+  try {
+    const bundle = await resolveGeometry(await fetchGeoDataFile(url, timeout), url, timeout);
+    if (!bundle || !Array.isArray(bundle.timestamps)) {
+      console.warn('[GEODATA] Bundle missing or invalid:', url);
+      return results;
+    }
+
+    const { timestamps, data_values: frames, ...shared } = bundle;
+    timestamps.forEach((timestamp, index) => {
+      const validated = validateGeoData(
+        { ...shared, timestamp, data_values: frames?.[index] },
+        domain
+      );
+      const cacheKey = generateCacheKey(domain, product, timestamp);
+      geoDataCache.set(cacheKey, validated);
+      cacheMetadata.set(cacheKey, { timestamp: Date.now(), lastAccess: Date.now() });
+      results.set(timestamp, validated);
+    });
+    cleanupCache();
+
+    console.log(`[GEODATA] Loaded bundle with ${results.size} frames`);
+  } catch (error) {
+    console.warn('[GEODATA] Bundle fetch error:', error.message);
+  }
+
+  return results;
+};
+
 /**
  * Clear the geospatial data cache
  */
 export const clearGeoDataCache = () => {
   geoDataCache.clear();
   cacheMetadata.clear();
+  geometryCache.clear();
   console.log('GeoData cache cleared');
 };
 
@@ -230,7 +230,10 @@ export const getDataAtPixel = (dataGrid, x, y, imageSize) => {
     return null;
   }
 
-  return dataGrid[row]?.[col] ?? null;
+  const value = dataGrid[row]?.[col];
+
+  // NaN marks missing data (off-disk or fill values in quantized grids)
+  return value === undefined || value === null || Number.isNaN(value) ? null : value;
 };
 
 /**
@@ -339,11 +342,53 @@ export const pixelToLatLonGeostationary = (x, y, geoGrids, imageSize) => {
 };
 
 /**
- * Convert lat/lon to pixel coordinates using geostationary grid search
- * Uses nearest-neighbor search in the grid
+ * Look up fractional grid indices in a precomputed inverse lookup raster
+ * O(1): bilinear interpolation between the four surrounding raster points
+ * @param {number} lat - Latitude
+ * @param {number} lon - Longitude
+ * @param {Object} lookup - {min_lat, max_lat, min_lon, step, rows, cols, row, col}
+ * @returns {Object|null} Fractional grid indices {row, col} or null if outside
+ */
+const lookupGridIndex = (lat, lon, lookup) => {
+  const fy = (lookup.max_lat - lat) / lookup.step;
+  const fx = (lon - lookup.min_lon) / lookup.step;
+  const y0 = Math.floor(fy);
+  const x0 = Math.floor(fx);
+
+  if (y0 < 0 || x0 < 0 || y0 >= lookup.rows - 1 || x0 >= lookup.cols - 1) {
+    return null;
+  }
+
+  const wy = fy - y0;
+  const wx = fx - x0;
+  const interpolate = (grid) => {
+    const v00 = grid[y0][x0];
+    const v01 = grid[y0][x0 + 1];
+    const v10 = grid[y0 + 1][x0];
+    const v11 = grid[y0 + 1][x0 + 1];
+    // Missing corners (null in JSON, NaN in binary) mean the point is outside the grid
+    if (v00 == null || v01 == null || v10 == null || v11 == null) {
+      return NaN;
+    }
+    return (1 - wy) * ((1 - wx) * v00 + wx * v01) + wy * ((1 - wx) * v10 + wx * v11);
+  };
+
+  const row = interpolate(lookup.row);
+  const col = interpolate(lookup.col);
+
+  if (Number.isNaN(row) || Number.isNaN(col)) {
+    return null;
+  }
+  return { row, col };
+};
+
+/**
+ * Convert lat/lon to pixel coordinates for geostationary imagery
+ * Uses the inverse lookup raster when the geodata ships one, otherwise
+ * falls back to a nearest-neighbor search in the grid
  * @param {number} targetLat - Target latitude
  * @param {number} targetLon - Target longitude
- * @param {Object} geoGrids - {lat_grid, lon_grid} 2D arrays
+ * @param {Object} geoGrids - {lat_grid, lon_grid, lookup} 2D arrays
  * @param {Object} imageSize - Image dimensions {width, height}
  * @returns {Object} Pixel coordinates {x, y}
  */
@@ -363,6 +408,16 @@ export const latLonToPixelGeostationary = (targetLat, targetLon, geoGrids, image
     return null;
   }
 
+  if (geoGrids.lookup) {
+    const index = lookupGridIndex(targetLat, targetLon, geoGrids.lookup);
+    if (index) {
+      return {
+        x: (index.col / (gridCols - 1)) * width,
+        y: (index.row / (gridRows - 1)) * height,
+      };
+    }
+  }
+
   // Find the grid cell containing or closest to the target lat/lon
   // This is a simple search - could be optimized with spatial indexing
   let minDist = Infinity;
@@ -410,6 +465,7 @@ export const extractGeoGrids = (geoData) => {
     return {
       lat_grid: geoData.lat_grid,
       lon_grid: geoData.lon_grid,
+      lookup: geoData.lookup || null,
     };
   }
 
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Chunk-parallel reader for GOES ABI NetCDF4 variables (Rad, CMI_*).
+
+Usage:
+    python abi_reader.py OR_ABI-L1b-RadC-M6C02_*.nc OR_ABI-L1b-RadC-M6C13_*.nc
+    python abi_reader.py OR_ABI-L1b-RadC-M6C02_*.nc --workers 8 --repeats 5
+
+xr.open_dataset(path)['Rad'].values inflates every compressed chunk on one
+thread, then applies the CF scale / offset / fill as further full-array
+passes. read_direct() instead looks up each chunk's byte range with h5py,
+reads and decodes the chunks across a thread pool (zlib releases the GIL) and
+writes each one straight into its slot of a preallocated output, scaling to
+float32 on the way when asked. Only chunks that intersect the requested
+rows / cols are touched, so it composes with subset-on-read windows.
+"""
+
+import argparse
+import os
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import h5py
+import numpy as np
+
+try:
+    import xarray as xr
+except ImportError:
+    xr = None
+
+# HDF5 filter ids found in ABI / netCDF4 files
+FILTER_DEFLATE = 1
+FILTER_SHUFFLE = 2
+FILTER_FLETCHER32 = 3
+SUPPORTED_FILTERS = (FILTER_DEFLATE, FILTER_SHUFFLE, FILTER_FLETCHER32)
+
+
+def _attr_value(attrs, name):
+    """Scalar value of a netCDF attribute (stored as a 1-element array or bytes), or None."""
+    if name not in attrs:
+        return None
+    value = attrs[name]
+    if isinstance(value, bytes):
+        return value.decode('ascii')
+    value = np.asarray(value).ravel()
+    return value[0] if value.size else None
+
+
+def variable_encoding(dset):
+    """
+    CF encoding of a variable: {'dtype', 'scale', 'offset', 'fill'}.
+
+    dtype is the stored integer type, switched to unsigned for _Unsigned
+    variables (as xarray does); fill is in that dtype.
+    """
+    dtype = dset.dtype
+    fill = _attr_value(dset.attrs, '_FillValue')
+    if str(_attr_value(dset.attrs, '_Unsigned')).lower() == 'true' and dtype.kind == 'i':
+        dtype = np.dtype(f'u{dtype.itemsize}')
+        if fill is not None:
+            fill = np.array(fill, dtype=dset.dtype).view(dtype)[()]
+    scale = _attr_value(dset.attrs, 'scale_factor')
+    offset = _attr_value(dset.attrs, 'add_offset')
+    return {
+        'dtype': dtype,
+        'scale': None if scale is None else np.float32(scale),
+        'offset': None if offset is None else np.float32(offset),
+        'fill': fill,
+    }
+
+
+def chunk_filters(dset):
+    """Filter ids of a dataset's pipeline, in the order they were applied on write."""
+    plist = dset.id.get_create_plist()
+    return [plist.get_filter(index)[0] for index in range(plist.get_nfilters())]
+
+
+def decode_chunk(data, filters, filter_mask, dtype, chunk_shape):
+    """Undo a chunk's filter pipeline; returns the chunk as a chunk_shape array of dtype."""
+    for index in reversed(range(len(filters))):
+        if filter_mask & (1 << index):
+            continue
+        if filters[index] == FILTER_DEFLATE:
+            data = zlib.decompress(data, bufsize=int(np.prod(chunk_shape)) * dtype.itemsize)
+        elif filters[index] == FILTER_FLETCHER32:
+            data = data[:-4]
+        elif filters[index] == FILTER_SHUFFLE:
+            shuffled = np.frombuffer(data, dtype=np.uint8)
+            data = shuffled.reshape(dtype.itemsize, -1).T.copy()
+    return np.frombuffer(data, dtype=dtype).reshape(chunk_shape)
+
+
+def store_counts(out, counts, encoding, scaled):
+    """Write a block of stored counts into out, applying scale / offset / fill when scaled."""
+    if not scaled:
+        out[...] = counts
+        return
+    if encoding['scale'] is not None:
+        np.multiply(counts, encoding['scale'], out=out)
+    else:
+        out[...] = counts
+    if encoding['offset'] is not None:
+        out += encoding['offset']
+    if encoding['fill'] is not None:
+        out[counts == encoding['fill']] = np.nan
+
+
+def _window(index, length):
+    start, stop, step = (index or slice(None)).indices(length)
+    if step != 1:
+        raise ValueError("read_direct supports contiguous slices only")
+    return start, max(start, stop)
+
+
+def read_direct(path, name='Rad', rows=None, cols=None, scaled=True, max_workers=None):
+    """
+    Read a 2-D variable (or its rows x cols slice) with chunk-parallel decoding.
+
+    scaled=True returns float32 with scale_factor / add_offset applied and
+    fill values as NaN, matching xarray's decoding; scaled=False returns the
+    stored counts (unsigned for _Unsigned variables). Contiguous variables and
+    filters other than deflate / shuffle / fletcher32 fall back to h5py's own
+    read.
+    """
+    with h5py.File(path, 'r') as h5:
+        dset = h5[name]
+        encoding = variable_encoding(dset)
+        row0, row1 = _window(rows, dset.shape[0])
+        col0, col1 = _window(cols, dset.shape[1])
+        out = np.empty((row1 - row0, col1 - col0), dtype=np.float32 if scaled else encoding['dtype'])
+
+        filters = chunk_filters(dset) if dset.chunks else None
+        if filters is None or any(code not in SUPPORTED_FILTERS for code in filters):
+            counts = dset[row0:row1, col0:col1].view(encoding['dtype'])
+            store_counts(out, counts, encoding, scaled)
+            return out
+
+        chunk_rows, chunk_cols = dset.chunks
+        unwritten = np.array(dset.fillvalue, dtype=dset.dtype).view(encoding['dtype'])
+        chunks = []
+        for chunk_row in range(row0 // chunk_rows * chunk_rows, row1, chunk_rows):
+            for chunk_col in range(col0 // chunk_cols * chunk_cols, col1, chunk_cols):
+                info = dset.id.get_chunk_info_by_coord((chunk_row, chunk_col))
+                chunks.append((chunk_row, chunk_col, info.byte_offset, info.size, info.filter_mask))
+
+    def decode(chunk):
+        chunk_row, chunk_col, byte_offset, size, filter_mask = chunk
+        # Source rows / cols inside the chunk and their destination in out
+        r0, r1 = max(row0, chunk_row), min(row1, chunk_row + chunk_rows)
+        c0, c1 = max(col0, chunk_col), min(col1, chunk_col + chunk_cols)
+        target = out[r0 - row0:r1 - row0, c0 - col0:c1 - col0]
+        if byte_offset is None:
+            # Never written: the chunk holds the dataset's fill value
+            store_counts(target, np.broadcast_to(unwritten, target.shape), encoding, scaled)
+            return
+        data = os.pread(fd, size, byte_offset)
+        counts = decode_chunk(data, filters, filter_mask, encoding['dtype'], (chunk_rows, chunk_cols))
+        store_counts(target, counts[r0 - chunk_row:r1 - chunk_row, c0 - chunk_col:c1 - chunk_col],
+                     encoding, scaled)
+
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            # list() re-raises the first worker exception
+            list(executor.map(decode, chunks))
+    finally:
+        os.close(fd)
+    return out
+
+
+def read_xarray(path, name='Rad'):
+    """The loaders' xarray path: decoded float32 values of one variable."""
+    with xr.open_dataset(path) as ds:
+        return np.ascontiguousarray(ds[name].values, dtype=np.float32)
+
+
+def read_h5py(path, name='Rad'):
+    """Single-threaded h5py read with CF decoding, the baseline when xarray is missing."""
+    with h5py.File(path, 'r') as h5:
+        dset = h5[name]
+        encoding = variable_encoding(dset)
+        counts = dset[...].view(encoding['dtype'])
+    out = np.empty(counts.shape, dtype=np.float32)
+    store_counts(out, counts, encoding, True)
+    return out
+
+
+def benchmark_readers(paths, name='Rad', repeats=3, max_workers=None):
+    """
+    Time read_direct (scaled and raw counts) against xarray (or plain h5py
+    when xarray is not installed) for each file; checks the values agree.
+
+    Returns one dict per path with the best time of each reader in ms.
+    """
+    baseline_name, baseline = ('xarray', read_xarray) if xr is not None else ('h5py', read_h5py)
+    readers = {
+        baseline_name: lambda path: baseline(path, name),
+        'direct': lambda path: read_direct(path, name, max_workers=max_workers),
+        'direct_counts': lambda path: read_direct(path, name, scaled=False, max_workers=max_workers),
+    }
+
+    results = []
+    for path in paths:
+        times = {}
+        values = {}
+        for reader_name, reader in readers.items():
+            best = np.inf
+            for _ in range(repeats):
+                start = time.perf_counter()
+                values[reader_name] = reader(path)
+                best = min(best, time.perf_counter() - start)
+            times[reader_name] = best * 1000
+        matches = np.array_equal(values[baseline_name], values['direct'], equal_nan=True)
+        results.append({'path': path, 'shape': values['direct'].shape, 'times_ms': times, 'matches': matches})
+
+        print(f"{os.path.basename(path)} {values['direct'].shape[0]}x{values['direct'].shape[1]}:")
+        for reader_name, ms in times.items():
+            print(f"  {reader_name:14s} {ms:8.1f} ms  ({times[baseline_name] / ms:.1f}x)")
+        print(f"  values match {baseline_name}: {matches}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the chunk-parallel ABI reader against xarray.")
+    parser.add_argument('paths', nargs='+', help="ABI NetCDF files, e.g. a C02 and a C13 L1b file")
+    parser.add_argument('--variable', default='Rad', help="variable to read (default: Rad)")
+    parser.add_argument('--workers', type=int, default=None, help="decode threads (default: all cores)")
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    if xr is None:
+        print("xarray is not installed; comparing against a single-threaded h5py read")
+    benchmark_readers(args.paths, args.variable, args.repeats, args.workers)
@@ -0,0 +1,943 @@
+#!/usr/bin/env python3
+"""
+HDF5 product archives of the pipeline and what is built from them:
+
+- write_product_archive: tile-chunked products + geolocation, window reads
+- append_timeseries_frame / PointSeriesQuery: one appendable file per scene,
+  lat/lon point and region series across frames
+- generate_animation_loops: keyframe + delta loop containers per domain
+- build_region_tables / rect_stats / polygon_stats: summed-area statistics
+
+Usage:
+    python archive.py --samples        # tile-chunked sample H5 + window-read benchmark
+    python archive.py --check-pixels   # lat/lon -> pixel lookups vs a nearest-pixel search
+"""
+
+import argparse
+import json
+import os
+import time
+import zlib
+
+import numpy as np
+import h5py
+
+from convert_geodata import (BINARY_PREFIX, GEODATA_DOMAINS, SAMPLE_SOURCES, cod_base_path, cod_product_name,
+                             domain_windows, format_cod_timestamp, goes_fixed_grid_to_latlon,
+                             latlon_to_goes_fixed_grid, pixel_axis_coords, product_values, projection_params,
+                             scan_start_time, scene_domain_names)
+from goes_projection import GOESProjectionAuthority
+
+# Optional zstd codec for animation loops (zlib is always available)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# ============================================================================
+# CHUNKED PRODUCT ARCHIVE
+# ============================================================================
+# Products and geolocation in HDF5 with tile-aligned, compressed chunks, so
+# readers (the converter, a tile server) decompress only the tiles a window
+# touches instead of whole datasets.
+
+ARCHIVE_TILE = 256
+
+
+def archive_chunks(shape, tile=ARCHIVE_TILE):
+    """Chunk shape: tile x tile in rows/cols, trailing dims (e.g. RGB) whole."""
+    return tuple(min(tile, n) for n in shape[:2]) + tuple(shape[2:])
+
+
+def write_archive_dataset(group, name, data, tile=ARCHIVE_TILE, compression='gzip', level=4, **attrs):
+    """
+    Create a chunked, compressed dataset and fill it one tile row at a time.
+
+    data may be a NumPy array or an h5py dataset; only one band of tile rows
+    is held in memory. compression is 'gzip' (level 1-9) or 'lzf'.
+    """
+    dataset = group.create_dataset(
+        name, shape=data.shape, dtype=data.dtype, chunks=archive_chunks(data.shape, tile),
+        compression=compression, compression_opts=level if compression == 'gzip' else None,
+        shuffle=True,
+    )
+    for start in range(0, data.shape[0], tile):
+        dataset[start:start + tile] = data[start:start + tile]
+    dataset.attrs.update(attrs)
+    return dataset
+
+
+def write_latlon_datasets(group, x_coords, y_coords, projection, tile=ARCHIVE_TILE, compression='gzip', level=4):
+    """latitude / longitude for a fixed-grid x/y axis pair, computed one tile row at a time."""
+    shape = (len(y_coords), len(x_coords))
+    datasets = [group.create_dataset(name, shape=shape, dtype=np.float32, chunks=archive_chunks(shape, tile),
+                                     compression=compression,
+                                     compression_opts=level if compression == 'gzip' else None,
+                                     shuffle=True, fillvalue=np.nan)
+                for name in ('latitude', 'longitude')]
+    for start in range(0, shape[0], tile):
+        lat, lon = goes_fixed_grid_to_latlon(x_coords, y_coords[start:start + tile], projection)
+        datasets[0][start:start + tile] = lat
+        datasets[1][start:start + tile] = lon
+    datasets[0].attrs['units'] = 'degrees_north'
+    datasets[1].attrs['units'] = 'degrees_east'
+    return datasets
+
+
+def write_product_archive(path, channels, rgb_products, coordinate_data, metadata, tile=ARCHIVE_TILE,
+                          compression='gzip', level=4, geolocation=True):
+    """
+    Archive one processed scan as chunked, compressed HDF5.
+
+    Layout: products/{key} (calibrated K / reflectance % for channels, uint8
+    RGB arrays for RGB products), x / y scan-angle axes and, with geolocation,
+    latitude / longitude on the primary grid. Products on other grids map onto
+    it via pixel_axis_coords. The file is written to a temporary name and
+    moved into place, so readers never see a partial archive.
+    """
+    start_time = time.time()
+    projection = projection_params(coordinate_data)
+    x_coords = np.asarray(coordinate_data['x_coords'], dtype=np.float64)
+    y_coords = np.asarray(coordinate_data['y_coords'], dtype=np.float64)
+
+    tmp_path = path + '.tmp'
+    try:
+        with h5py.File(tmp_path, 'w') as h5:
+            h5.attrs['time_coverage_start'] = scan_start_time(metadata) or ''
+            h5.attrs['primary_channel'] = str(coordinate_data.get('primary_channel', ''))
+            h5.attrs['tile'] = tile
+            h5.attrs.update(projection)
+            h5.create_dataset('x', data=x_coords)
+            h5.create_dataset('y', data=y_coords)
+            if geolocation:
+                write_latlon_datasets(h5, x_coords, y_coords, projection, tile, compression, level)
+
+            group = h5.create_group('products')
+            for key, channel in (channels or {}).items():
+                if channel.get('enhanced') is None:
+                    continue
+                values, data_unit, data_name, _ = product_values(key, channel)
+                if data_unit == '%':
+                    values = values * np.float32(100.0)
+                write_archive_dataset(group, key, np.asarray(values), tile, compression, level,
+                                      units=data_unit, long_name=data_name)
+            for key, rgb in (rgb_products or {}).items():
+                write_archive_dataset(group, key, np.asarray(rgb), tile, compression, level,
+                                      units='rgb', long_name=key)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return {'success': False, 'path': path, 'error': str(e)}
+
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f"Product archive: {path} ({size_mb:.1f} MB, {tile}x{tile} {compression} chunks) "
+          f"in {time.time() - start_time:.1f}s")
+    return {'success': True, 'path': path, 'bytes': os.path.getsize(path), 'time': time.time() - start_time}
+
+
+def read_archive_window(source, name, window):
+    """
+    Read only window = (row_start, row_stop, col_start, col_stop) of a dataset.
+
+    source is an archive path or an open h5py.File; only the chunks that
+    intersect the window are read and decompressed.
+    """
+    row_start, row_stop, col_start, col_stop = window
+    if isinstance(source, h5py.File):
+        return source[name][row_start:row_stop, col_start:col_stop]
+    with h5py.File(source, 'r') as h5:
+        return h5[name][row_start:row_stop, col_start:col_stop]
+
+
+def write_sample_archive(domain, tile=ARCHIVE_TILE, compression='gzip', level=4):
+    """Rewrite a SAMPLE_SOURCES H5 file as a tile-chunked archive ({stem}.chunked.h5)."""
+    source = SAMPLE_SOURCES[domain]['h5']
+    path = os.path.splitext(source)[0] + '.chunked.h5'
+    with h5py.File(source, 'r') as src, h5py.File(path, 'w') as h5:
+        h5.attrs['tile'] = tile
+        for name in ('latitude', 'longitude', 'rgb_values'):
+            write_archive_dataset(h5, name, src[name], tile, compression, level)
+    return path
+
+
+def benchmark_archive_reads(path, name, window=ARCHIVE_TILE, repeats=10):
+    """
+    Time tile-aligned window reads against reading the whole dataset.
+
+    Windows are window x window pixels at random tile-aligned offsets, read
+    through an open file the way a tile server would.
+    """
+    rng = np.random.default_rng(0)
+    with h5py.File(path, 'r') as h5:
+        dataset = h5[name]
+        rows, cols = dataset.shape[:2]
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            dataset[...]
+        full_ms = (time.perf_counter() - start) / repeats * 1000
+
+        offsets = [(int(rng.integers(0, max(1, rows // window))) * window,
+                    int(rng.integers(0, max(1, cols // window))) * window) for _ in range(repeats)]
+        start = time.perf_counter()
+        for row, col in offsets:
+            read_archive_window(h5, name, (row, row + window, col, col + window))
+        window_ms = (time.perf_counter() - start) / repeats * 1000
+
+        print(f"{os.path.basename(path):<40} {name:<12} {rows}x{cols} chunks {dataset.chunks}: "
+              f"full {full_ms:.2f} ms, {window}x{window} window {window_ms:.2f} ms "
+              f"({full_ms / window_ms:.1f}x)")
+    return {'full_ms': full_ms, 'window_ms': window_ms, 'chunks': dataset.chunks}
+
+
+# ============================================================================
+# TIME-SERIES ARCHIVE
+# ============================================================================
+# One HDF5 file per scene that every run appends a frame to. Products are
+# (time, rows, cols[, 3]) datasets chunked time x tile x tile, so a point or
+# region query over hours of frames reads only the chunks it touches.
+
+# 8 frames per chunk: each append rewrites the partially filled time chunk,
+# so longer chunks make appends slower without speeding up point queries much
+TIMESERIES_TIME_CHUNK = 8
+TIMESERIES_TILE = 128
+TIMESERIES_TIME_UNITS = 'seconds since 1970-01-01T00:00:00Z'
+
+
+def epoch_seconds(value):
+    """Scan time (ISO string, datetime or datetime64) as integer seconds since 1970."""
+    if isinstance(value, bytes):
+        value = value.decode('ascii')
+    if isinstance(value, str):
+        value = value.rstrip('Z')
+    return int(np.datetime64(value, 's').astype(np.int64))
+
+
+def append_timeseries_frame(path, channels, rgb_products, metadata, products=None, authority=None,
+                            time_chunk=TIMESERIES_TIME_CHUNK, tile=TIMESERIES_TILE, compression='gzip', level=4):
+    """
+    Append one scan to the time-series archive at path (created on first use).
+
+    products limits which CHANNELS / RGB_PRODUCTS keys are archived (default:
+    all channels with calibrated data plus all RGB products). The frame is
+    committed by growing the 'time' dataset last: readers only trust the first
+    len(time) frames, so an interrupted run leaves the archive as it was and
+    the next append overwrites the partial frame. Archived products missing
+    from a scan get a fill-valued frame (NaN / 0). Scans already in the
+    archive are skipped; frames must be appended in time order. authority
+    (GOESProjectionAuthority) stores the projection and scan extent as file
+    attributes for lat/lon point queries (PointSeriesQuery). Returns a
+    result dict with the frame index.
+    """
+    start_time = time.time()
+    scan_time = scan_start_time(metadata)
+    if not scan_time:
+        return {'success': False, 'path': path, 'error': "No time_coverage_start in metadata"}
+    frame_time = epoch_seconds(scan_time)
+
+    frame = {}
+    for key, channel in (channels or {}).items():
+        if channel.get('calibrated') is None or (products and key not in products):
+            continue
+        values, data_unit, data_name, _ = product_values(key, channel)
+        if data_unit == '%':
+            values = values * np.float32(100.0)
+        frame[key] = (np.asarray(values, dtype=np.float32), data_unit, data_name)
+    for key, rgb in (rgb_products or {}).items():
+        if products and key not in products:
+            continue
+        frame[key] = (np.asarray(rgb, dtype=np.uint8), 'rgb', key)
+
+    # Persistent free-space tracking lets later runs reuse the space of
+    # rewritten (partially filled) time chunks instead of growing the file
+    if os.path.exists(path):
+        mode, file_options = 'a', {}
+    else:
+        mode, file_options = 'w-', {'fs_strategy': 'fsm', 'fs_persist': True}
+    try:
+        with h5py.File(path, mode, **file_options) as h5:
+            if 'time' not in h5:
+                h5.create_dataset('time', shape=(0,), maxshape=(None,), dtype=np.int64, chunks=(1024,))
+                h5['time'].attrs['units'] = TIMESERIES_TIME_UNITS
+                h5.create_group('products')
+            if authority is not None and 'x_min' not in h5.attrs:
+                h5.attrs.update(authority.params())
+                h5.attrs.update(authority_extent(authority))
+            times = h5['time']
+            index = times.shape[0]
+            if index and frame_time in times[:]:
+                return {'success': True, 'path': path, 'index': int(np.flatnonzero(times[:] == frame_time)[0]),
+                        'skipped': True}
+            if index and frame_time < times[index - 1]:
+                raise ValueError(f"{scan_time} is older than the last archived frame")
+
+            group = h5['products']
+            for key, (values, data_unit, data_name) in frame.items():
+                if key not in group:
+                    chunks = (time_chunk,) + archive_chunks(values.shape, tile)
+                    dataset = group.create_dataset(
+                        key, shape=(0,) + values.shape, maxshape=(None,) + values.shape, dtype=values.dtype,
+                        chunks=chunks, compression=compression,
+                        compression_opts=level if compression == 'gzip' else None, shuffle=True,
+                        fillvalue=np.nan if values.dtype == np.float32 else 0,
+                    )
+                    dataset.attrs.update({'units': data_unit, 'long_name': data_name})
+                dataset = group[key]
+                if dataset.shape[1:] != values.shape:
+                    raise ValueError(f"{key}: frame shape {values.shape} does not match archive {dataset.shape[1:]}")
+                dataset.resize(index + 1, axis=0)
+                dataset[index] = values
+            # Products missing from this scan get a fill-valued frame, so every
+            # product stays exactly as long as 'time'
+            for key, dataset in group.items():
+                if key not in frame:
+                    dataset.resize(index + 1, axis=0)
+                    dataset[index] = dataset.fillvalue
+            h5.flush()
+
+            # Commit the frame
+            times.resize(index + 1, axis=0)
+            times[index] = frame_time
+            h5.flush()
+    except Exception as e:
+        return {'success': False, 'path': path, 'error': str(e)}
+
+    print(f"Time-series archive: frame {index} ({scan_time}, {len(frame)} products) appended to {path} "
+          f"in {time.time() - start_time:.1f}s")
+    return {'success': True, 'path': path, 'index': index, 'skipped': False}
+
+
+def _timeseries_range(h5, start=None, end=None):
+    """(times, first, stop) of the committed frames between start and end (inclusive)."""
+    times = h5['time'][:]
+    first = 0 if start is None else int(np.searchsorted(times, epoch_seconds(start), side='left'))
+    stop = len(times) if end is None else int(np.searchsorted(times, epoch_seconds(end), side='right'))
+    return times[first:stop].astype('datetime64[s]'), first, stop
+
+
+def query_point_series(path, name, row, col, start=None, end=None):
+    """(times, values) of one pixel of a product across the frames in [start, end]."""
+    with h5py.File(path, 'r') as h5:
+        times, first, stop = _timeseries_range(h5, start, end)
+        return times, h5['products'][name][first:stop, row, col]
+
+
+def query_region_series(path, name, window, start=None, end=None):
+    """
+    (times, values) of window = (row_start, row_stop, col_start, col_stop)
+    across the frames in [start, end]; values is (frames, rows, cols[, 3]).
+    """
+    row_start, row_stop, col_start, col_stop = window
+    with h5py.File(path, 'r') as h5:
+        times, first, stop = _timeseries_range(h5, start, end)
+        return times, h5['products'][name][first:stop, row_start:row_stop, col_start:col_stop]
+
+
+def pixel_edge_extent(x_first, x_last, y_first, y_last, width, height):
+    """
+    Pixel-edge scan extent {'x_min', 'x_max', 'y_min', 'y_max'} (radians) of
+    a width x height grid from its first / last pixel-centre coordinates.
+    """
+    dx = (x_last - x_first) / (width - 1)
+    dy = (y_last - y_first) / (height - 1)
+    x_edges = (x_first - dx / 2, x_last + dx / 2)
+    y_edges = (y_first - dy / 2, y_last + dy / 2)
+    return {'x_min': float(min(x_edges)), 'x_max': float(max(x_edges)),
+            'y_min': float(min(y_edges)), 'y_max': float(max(y_edges))}
+
+
+def authority_extent(authority):
+    """
+    Pixel-edge scan extent (radians) of a GOESProjectionAuthority, whose
+    x_min ... y_max are the first / last pixel centres of its source grid.
+    """
+    return authority.edge_extent()
+
+
+def fixed_grid_position(lat, lon, projection, extent, height, width):
+    """
+    Fractional (row, col) of lat/lon on a height x width product grid through
+    the forward projection. extent is the pixel-edge extent (authority_extent,
+    pixel_edge_extent), the layout pixel_axis_coords uses for every product
+    resolution. Pixel (r, c) covers [r, r + 1) x [c, c + 1) with its centre
+    at (r + 0.5, c + 0.5); off-disk points are NaN.
+    """
+    x, y = latlon_to_goes_fixed_grid(np.atleast_1d(lat), np.atleast_1d(lon), projection)
+    col = (x - extent['x_min']) / (extent['x_max'] - extent['x_min']) * width
+    row = (extent['y_max'] - y) / (extent['y_max'] - extent['y_min']) * height
+    return row, col
+
+
+def fixed_grid_pixels(lat, lon, projection, extent, height, width):
+    """
+    (row, col) of the pixels holding lat/lon, i.e. the nearest pixel centres
+    (see fixed_grid_position). Points off the disk or outside the grid get -1.
+    """
+    row, col = fixed_grid_position(lat, lon, projection, extent, height, width)
+    with np.errstate(invalid='ignore'):
+        row, col = np.floor(row), np.floor(col)
+        valid = np.isfinite(col) & np.isfinite(row) & (col >= 0) & (col < width) & (row >= 0) & (row < height)
+    return np.where(valid, row, -1).astype(np.intp), np.where(valid, col, -1).astype(np.intp)
+
+
+class PointSeriesQuery:
+    """
+    Lat/lon point time series from a time-series archive, for crosshair
+    readouts across a loop.
+
+    Points map to pixels by forward projection (fixed_grid_pixels) with the
+    authority stored by append_timeseries_frame, or the one given here, so
+    no lat/lon grid is read or searched. The file is opened per query (the
+    pipeline must be able to append meanwhile) with a chunk cache, so
+    neighbouring points share decompressed chunks; frame times and product
+    shapes are cached until the file changes.
+    """
+
+    def __init__(self, path, authority=None, chunk_cache_mb=32):
+        self.path = path
+        self.authority = authority
+        self.chunk_cache_bytes = int(chunk_cache_mb * 1024 * 1024)
+        self._layout = None
+
+    def _open(self):
+        return h5py.File(self.path, 'r', rdcc_nbytes=self.chunk_cache_bytes, rdcc_nslots=10007)
+
+    def layout(self, h5):
+        """Cached {version, times, projection, extent, products: {key: (shape, units)}}."""
+        stat = os.stat(self.path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        if self._layout is None or self._layout['version'] != version:
+            if self.authority is not None:
+                projection, extent = self.authority.params(), authority_extent(self.authority)
+            elif 'x_min' in h5.attrs:
+                projection = {key: float(h5.attrs[key]) for key in ('sat_lon', 'sat_height', 'semi_major', 'semi_minor')}
+                extent = {key: float(h5.attrs[key]) for key in ('x_min', 'x_max', 'y_min', 'y_max')}
+            else:
+                raise ValueError(f"{self.path} has no projection attributes; pass the authority")
+            self._layout = {
+                'version': version,
+                'times': h5['time'][:],
+                'projection': projection,
+                'extent': extent,
+                'products': {key: (dataset.shape[1:], str(dataset.attrs.get('units', '')))
+                             for key, dataset in h5['products'].items()},
+            }
+        return self._layout
+
+    def query(self, lat, lon, products=None, frames=None, start=None, end=None):
+        """
+        Values of products (default: every archived product) at one or many
+        lat/lon points over the frames in [start, end], or the latest frames
+        of them. Returns {'times', 'lat', 'lon', 'products': {key: {'units',
+        'rows', 'cols', 'values'}}} with values shaped (frames, points[, 3]);
+        points outside a product's grid are NaN (0 for RGB).
+        """
+        start_time = time.time()
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        lon = np.atleast_1d(np.asarray(lon, dtype=np.float64))
+        with self._open() as h5:
+            layout = self.layout(h5)
+            times = layout['times']
+            first = 0 if start is None else int(np.searchsorted(times, epoch_seconds(start), side='left'))
+            stop = len(times) if end is None else int(np.searchsorted(times, epoch_seconds(end), side='right'))
+            if frames:
+                first = max(first, stop - frames)
+
+            results = {}
+            pixels = {}
+            for key in products or layout['products']:
+                shape, units = layout['products'][key]
+                if shape[:2] not in pixels:
+                    pixels[shape[:2]] = fixed_grid_pixels(lat, lon, layout['projection'], layout['extent'], *shape[:2])
+                rows, cols = pixels[shape[:2]]
+                dataset = h5['products'][key]
+                values = np.full((stop - first, len(lat)) + shape[2:], dataset.fillvalue, dtype=dataset.dtype)
+                for point, (row, col) in enumerate(zip(rows, cols)):
+                    if row >= 0:
+                        values[:, point] = dataset[first:stop, row, col]
+                results[key] = {'units': units, 'rows': rows, 'cols': cols, 'values': values}
+
+        return {
+            'times': times[first:stop].astype('datetime64[s]'),
+            'lat': lat,
+            'lon': lon,
+            'products': results,
+            'query_ms': (time.time() - start_time) * 1000,
+        }
+
+
+def region_series_stats(values):
+    """Per-frame mean / min / max of query_region_series values (NaN-aware)."""
+    flat = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+    return {
+        'mean': np.nanmean(flat, axis=1),
+        'min': np.nanmin(flat, axis=1),
+        'max': np.nanmax(flat, axis=1),
+    }
+
+
+# ============================================================================
+# ANIMATION LOOP CONTAINER
+# ============================================================================
+# The N most recent frames of one product / domain in a single file: a
+# keyframe every keyframe_interval frames and, in between, the byte-wise
+# difference to the previous frame (mod 256). Pixels that do not change
+# (space, off-disk, most of a 5-minute step) become zero runs that compress
+# to almost nothing.
+#
+# Layout: the BINARY_PREFIX struct with magic b'SWLP', then the JSON index
+# {shape, dtype, codec, keyframe_interval, frames: [{timestamp, type, offset,
+# length}]}; offsets count from the end of the index.
+
+LOOP_MAGIC = b'SWLP'
+LOOP_VERSION = 1
+
+
+def _loop_compress(data, codec, level):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return zlib.compress(data, level)
+
+
+def _loop_decompress(data, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def encode_animation_loop(frames, timestamps, keyframe_interval=12, codec=None, level=6, **metadata):
+    """
+    Pack uint8 frames (sequence of equally shaped arrays) into one loop container.
+
+    codec is 'zlib' (default) or 'zstd' (needs zstandard). Extra keyword
+    arguments (product, domain, ...) are stored in the index.
+    """
+    codec = codec or 'zlib'
+    if codec == 'zstd' and zstandard is None:
+        raise ValueError("zstd codec needs the zstandard module")
+
+    payloads = []
+    entries = []
+    offset = 0
+    previous = None
+    for i, (frame, timestamp) in enumerate(zip(frames, timestamps)):
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if previous is not None and frame.shape != previous.shape:
+            raise ValueError("All frames in a loop must have the same shape")
+        if i % keyframe_interval == 0:
+            kind, raw = 'key', frame
+        else:
+            kind, raw = 'delta', frame - previous  # uint8 arithmetic wraps mod 256
+        payload = _loop_compress(raw.tobytes(), codec, level)
+        entries.append({'timestamp': timestamp, 'type': kind, 'offset': offset, 'length': len(payload)})
+        payloads.append(payload)
+        offset += len(payload)
+        previous = frame
+
+    header = dict(metadata)
+    header.update({'shape': list(previous.shape), 'dtype': 'uint8', 'codec': codec,
+                   'keyframe_interval': keyframe_interval, 'frames': entries})
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('ascii')
+    return b''.join([BINARY_PREFIX.pack(LOOP_MAGIC, LOOP_VERSION, 0, len(header_bytes)), header_bytes] + payloads)
+
+
+def read_loop_index(data):
+    """(header, payload start) of a loop container."""
+    magic, version, _, header_len = BINARY_PREFIX.unpack_from(data, 0)
+    if magic != LOOP_MAGIC:
+        raise ValueError("Not an animation loop file")
+    if version != LOOP_VERSION:
+        raise ValueError(f"Unsupported animation loop version: {version}")
+    start = BINARY_PREFIX.size + header_len
+    return json.loads(data[BINARY_PREFIX.size:start]), start
+
+
+def decode_loop_frame(data, index, header=None):
+    """Frame index of a loop container, rebuilt from the keyframe before it."""
+    if header is None:
+        header, start = read_loop_index(data)
+    else:
+        start = BINARY_PREFIX.size + BINARY_PREFIX.unpack_from(data, 0)[3]
+    entries = header['frames']
+    key = index - index % header['keyframe_interval']
+
+    frame = None
+    for entry in entries[key:index + 1]:
+        raw = _loop_decompress(data[start + entry['offset']:start + entry['offset'] + entry['length']],
+                               header['codec'])
+        values = np.frombuffer(raw, dtype=np.uint8).reshape(header['shape'])
+        frame = values.copy() if frame is None else frame + values
+    return frame
+
+
+def decode_animation_loop(data):
+    """(header, (frames, ...) uint8 array) of every frame in a loop container."""
+    header, start = read_loop_index(data)
+    frames = np.empty([len(header['frames'])] + header['shape'], dtype=np.uint8)
+    for i, entry in enumerate(header['frames']):
+        raw = _loop_decompress(data[start + entry['offset']:start + entry['offset'] + entry['length']],
+                               header['codec'])
+        values = np.frombuffer(raw, dtype=np.uint8).reshape(header['shape'])
+        frames[i] = values if entry['type'] == 'key' else frames[i - 1] + values
+    return header, frames
+
+
+def write_animation_loop(path, frames, timestamps, **options):
+    """Write encode_animation_loop output atomically; returns the file size."""
+    data = encode_animation_loop(frames, timestamps, **options)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def generate_animation_loops(archive_path, coordinate_data, scene='conus', output_dir='loops', domains=None,
+                             frames=12, products=None, keyframe_interval=12, codec=None):
+    """
+    Loop containers of the last frames scans for every uint8 product / domain
+    in the time-series archive, at {base_path}/{product}/{domain}.{product}.loop.bin.
+
+    Only the domain window of the last frames is read from the archive.
+    """
+    start_time = time.time()
+    projection = projection_params(coordinate_data)
+    domain_names = scene_domain_names(scene, domains)
+
+    results = []
+    with h5py.File(archive_path, 'r') as h5:
+        count = h5['time'].shape[0]
+        first = max(0, count - frames)
+        timestamps = [format_cod_timestamp(t) for t in h5['time'][first:count].astype('datetime64[s]')]
+        for key, dataset in h5['products'].items():
+            if dataset.dtype != np.uint8 or (products and key not in products):
+                continue
+            height, width = dataset.shape[1:3]
+            _, _, windows = domain_windows(height, width, coordinate_data, projection, domain_names)
+            product_name = cod_product_name(key)
+            for name, (row0, row1, col0, col1) in windows.items():
+                domain = GEODATA_DOMAINS[name]
+                loop_frames = dataset[first:count, row0:row1, col0:col1]
+                product_dir = os.path.join(output_dir, cod_base_path(domain), product_name)
+                os.makedirs(product_dir, exist_ok=True)
+                path = os.path.join(product_dir, f"{domain['cod_name']}.{product_name}.loop.bin")
+                size = write_animation_loop(path, loop_frames, timestamps, keyframe_interval=keyframe_interval,
+                                            codec=codec, product=product_name, domain=domain['cod_name'])
+                results.append({'domain': name, 'product': key, 'file': path, 'bytes': size,
+                                'raw_bytes': loop_frames.nbytes})
+                print(f"  {path}: {len(timestamps)} frames, {size / 1024:.0f} KB "
+                      f"({loop_frames.nbytes / size:.0f}x smaller than raw)")
+
+    print(f"Animation loops complete in {time.time() - start_time:.1f}s")
+    return {'success': True, 'results': results, 'files': [r['file'] for r in results]}
+
+
+def benchmark_animation_loop(frames, timestamps, keyframe_interval=12):
+    """Loop container size vs independently compressed frames (same codec), plus decode time."""
+    independent = sum(len(zlib.compress(np.ascontiguousarray(f).tobytes(), 6)) for f in frames)
+    data = encode_animation_loop(frames, timestamps, keyframe_interval)
+    start = time.perf_counter()
+    _, decoded = decode_animation_loop(data)
+    decode_ms = (time.perf_counter() - start) * 1000
+    raw = sum(np.asarray(f).nbytes for f in frames)
+    print(f"{len(frames)} frames: raw {raw / 1024:.0f} KB, per-frame zlib {independent / 1024:.0f} KB, "
+          f"loop {len(data) / 1024:.0f} KB ({independent / len(data):.1f}x), decode {decode_ms:.0f} ms, "
+          f"lossless {all(np.array_equal(a, b) for a, b in zip(frames, decoded))}")
+    return {'raw_bytes': raw, 'independent_bytes': independent, 'loop_bytes': len(data), 'decode_ms': decode_ms}
+
+
+# ============================================================================
+# REGION STATISTICS
+# ============================================================================
+# Summed-area tables per channel (valid count, sum, sum of squares and one
+# count table per threshold) answer mean / std / threshold fractions of any
+# rectangle with four lookups. Polygons are split into one column span per
+# pixel row (pixel centres inside the outline), so they cost O(rows), not
+# O(area). Min / max come from per-row block extremes plus the few edge
+# pixels of each span.
+
+REGION_BLOCK = 32
+# Cold-cloud thresholds (C) for brightness-temperature channels
+COLD_CLOUD_THRESHOLDS_C = (-32.0, -52.0, -70.0)
+
+
+def _summed_area(values, dtype):
+    table = np.zeros((values.shape[0] + 1, values.shape[1] + 1), dtype=dtype)
+    np.cumsum(values, axis=0, dtype=dtype, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+    return table
+
+
+def build_region_tables(values, thresholds=(), block=REGION_BLOCK):
+    """
+    Summed-area tables and row-block extremes of a 2-D channel.
+
+    thresholds are in the channel's units (e.g. K); each adds a table of
+    valid pixels <= threshold. Sums are taken about a rounded offset (the
+    channel mean) to keep the variance well conditioned. The tables keep a
+    reference to values for the edge pixels of min / max queries.
+    """
+    start_time = time.time()
+    values = np.ascontiguousarray(values, dtype=np.float32)
+    height, width = values.shape
+    valid = np.isfinite(values)
+    offset = float(np.round(np.nanmean(values))) if valid.any() else 0.0
+    centred = np.where(valid, values - np.float32(offset), np.float32(0))
+
+    tables = {
+        'shape': (height, width),
+        'offset': offset,
+        'block': block,
+        'values': values,
+        'count': _summed_area(valid, np.int32),
+        'sum': _summed_area(centred, np.float64),
+        'sumsq': _summed_area(centred * centred, np.float64),
+        'below': {float(t): _summed_area(valid & (values <= t), np.int32) for t in thresholds},
+    }
+
+    # Per-row extremes of each block of columns (NaN-free: +/-inf where empty)
+    padded_width = -(-width // block) * block
+    padded = np.full((height, padded_width), np.nan, dtype=np.float32)
+    padded[:, :width] = values
+    padded = padded.reshape(height, -1, block)
+    with np.errstate(invalid='ignore'):
+        tables['row_min'] = np.where(np.isnan(padded), np.inf, padded).min(axis=2)
+        tables['row_max'] = np.where(np.isnan(padded), -np.inf, padded).max(axis=2)
+    tables['build_time'] = time.time() - start_time
+    tables['nbytes'] = sum(a.nbytes for a in (tables['count'], tables['sum'], tables['sumsq'],
+                                              tables['row_min'], tables['row_max'], *tables['below'].values()))
+    return tables
+
+
+def _table_sums(table, rows, col_start, col_stop, row_stop=None):
+    """Sum of a summed-area table over rows[i]:row_stop[i] x col_start[i]:col_stop[i]."""
+    row_stop = rows + 1 if row_stop is None else row_stop
+    return (table[row_stop, col_stop] - table[rows, col_stop] - table[row_stop, col_start]
+            + table[rows, col_start]).sum()
+
+
+def _segment_reduce(ufunc, flat, starts, stops):
+    """ufunc.reduceat over flat[starts[i]:stops[i]] (non-empty, ascending, non-overlapping)."""
+    if not len(starts):
+        return np.zeros(0, dtype=flat.dtype)
+    bounds = np.empty(2 * len(starts), dtype=np.intp)
+    bounds[0::2] = starts
+    bounds[1::2] = stops
+    # Cut at the last stop so the final segment doesn't reduce the rest of the array
+    return ufunc.reduceat(flat[:stops[-1]], bounds[:-1])[0::2]
+
+
+def _span_extremes(tables, rows, col_start, col_stop):
+    """
+    Min / max of values over the spans (rows[i], col_start[i]:col_stop[i]),
+    in row-major order: whole column blocks from row_min / row_max, the
+    partial blocks at each end from the values (fmin / fmax skip NaN).
+    """
+    block = tables['block']
+    height, width = tables['shape']
+    blocks_per_row = tables['row_min'].shape[1]
+    first_block = -(-col_start // block)
+    last_block = col_stop // block
+
+    whole = first_block < last_block
+    block_starts = rows[whole] * blocks_per_row + first_block[whole]
+    block_stops = rows[whole] * blocks_per_row + last_block[whole]
+
+    # Left partial block (or the whole span when it has no full block), then the right one
+    left_stop = np.where(whole, np.minimum(first_block * block, col_stop), col_stop)
+    right_start = np.where(whole, last_block * block, col_stop)
+    edge_starts = np.stack([col_start, right_start], axis=1)
+    edge_stops = np.stack([left_stop, col_stop], axis=1)
+    offsets = (rows * width)[:, None]
+    nonempty = edge_stops > edge_starts
+    edge_starts = (edge_starts + offsets)[nonempty]
+    edge_stops = (edge_stops + offsets)[nonempty]
+
+    flat = tables['values'].reshape(-1)
+    low = np.concatenate([_segment_reduce(np.fmin, tables['row_min'].reshape(-1), block_starts, block_stops),
+                          _segment_reduce(np.fmin, flat, edge_starts, edge_stops)])
+    high = np.concatenate([_segment_reduce(np.fmax, tables['row_max'].reshape(-1), block_starts, block_stops),
+                           _segment_reduce(np.fmax, flat, edge_starts, edge_stops)])
+    low = np.fmin.reduce(low) if low.size else np.inf
+    high = np.fmax.reduce(high) if high.size else -np.inf
+    return low, high
+
+
+def _region_result(tables, pixels, count, total, total_sq, below, low, high, start_time):
+    result = {'pixels': int(pixels), 'count': int(count)}
+    if count:
+        mean = total / count
+        result.update(mean=tables['offset'] + mean, std=float(np.sqrt(max(total_sq / count - mean * mean, 0.0))),
+                      min=float(low), max=float(high))
+    else:
+        result.update(mean=None, std=None, min=None, max=None)
+    result['fractions'] = {t: (int(n) / count if count else None) for t, n in below.items()}
+    result['query_ms'] = (time.time() - start_time) * 1000
+    return result
+
+
+def rect_stats(tables, window):
+    """
+    count / mean / std / min / max / threshold fractions of valid pixels in
+    window = (row_start, row_stop, col_start, col_stop).
+    """
+    start_time = time.time()
+    height, width = tables['shape']
+    row_start, row_stop, col_start, col_stop = window
+    row_start, row_stop = max(0, row_start), min(height, row_stop)
+    col_start, col_stop = max(0, col_start), min(width, col_stop)
+    if row_start >= row_stop or col_start >= col_stop:
+        return _region_result(tables, 0, 0, 0.0, 0.0, {t: 0 for t in tables['below']}, 0, 0, start_time)
+
+    def box(table):
+        return _table_sums(table, row_start, col_start, col_stop, row_stop)
+
+    rows = np.arange(row_start, row_stop)
+    low, high = _span_extremes(tables, rows, np.full_like(rows, col_start), np.full_like(rows, col_stop))
+    return _region_result(tables, (row_stop - row_start) * (col_stop - col_start), box(tables['count']),
+                          box(tables['sum']), box(tables['sumsq']),
+                          {t: box(table) for t, table in tables['below'].items()}, low, high, start_time)
+
+
+def polygon_spans(vertices, height, width):
+    """
+    (rows, col_start, col_stop) of the pixels whose centres lie inside a
+    polygon of (row, col) vertices in pixel units (even-odd rule).
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    y0, x0 = vertices[:, 0], vertices[:, 1]
+    y1, x1 = np.roll(y0, -1), np.roll(x0, -1)
+    rows = np.arange(max(0, int(np.floor(y0.min()))), min(height, int(np.ceil(y0.max())) + 1))
+    if rows.size == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty, empty
+
+    centre = rows[:, None] + 0.5
+    crosses = (np.minimum(y0, y1) <= centre) & (centre < np.maximum(y0, y1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = x0 + (centre - y0) * (x1 - x0) / (y1 - y0)
+    x = np.sort(np.where(crosses, x, np.inf), axis=1)
+    if x.shape[1] % 2:
+        x = np.pad(x, ((0, 0), (0, 1)), constant_values=np.inf)
+    # Crossings pair up left to right; unused slots are +inf and drop out
+    starts, stops = x[:, 0::2], x[:, 1::2]
+    keep = np.isfinite(starts) & np.isfinite(stops)
+    span_rows = np.broadcast_to(rows[:, None], starts.shape)[keep]
+    col_start = np.clip(np.ceil(starts[keep] - 0.5), 0, width).astype(np.intp)
+    col_stop = np.clip(np.ceil(stops[keep] - 0.5), 0, width).astype(np.intp)
+    nonempty = col_stop > col_start
+    return span_rows[nonempty].astype(np.intp), col_start[nonempty], col_stop[nonempty]
+
+
+def polygon_stats(tables, vertices):
+    """rect_stats for a polygon of (row, col) pixel vertices (see polygon_spans)."""
+    start_time = time.time()
+    rows, col_start, col_stop = polygon_spans(vertices, *tables['shape'])
+
+    def spans(table):
+        return _table_sums(table, rows, col_start, col_stop)
+
+    low, high = _span_extremes(tables, rows, col_start, col_stop)
+    return _region_result(tables, int((col_stop - col_start).sum()), spans(tables['count']), spans(tables['sum']),
+                          spans(tables['sumsq']), {t: spans(table) for t, table in tables['below'].items()},
+                          low, high, start_time)
+
+
+def check_fixed_grid_pixels(projection, extent, x_axis, y_axis, jitter=0.45, stride=1, seed=0):
+    """
+    Regression check for fixed_grid_pixels against a nearest-pixel search.
+
+    x_axis / y_axis are the grid's true pixel-centre scan angles (e.g.
+    pixel_axis_coords of the file's x / y). Every centre is moved by up to
+    jitter pixels (per row and per column), so its nearest centre is still
+    that pixel, projected to lat/lon and mapped back through extent; stride
+    checks every stride-th row and column. Returns the fraction of visible
+    points that land on their own pixel.
+    """
+    rng = np.random.default_rng(seed)
+    height, width = len(y_axis), len(x_axis)
+    rows, cols = np.arange(0, height, stride), np.arange(0, width, stride)
+    x = x_axis[cols] + rng.uniform(-jitter, jitter, len(cols)) * (x_axis[1] - x_axis[0])
+    y = y_axis[rows] + rng.uniform(-jitter, jitter, len(rows)) * (y_axis[1] - y_axis[0])
+    lat, lon = goes_fixed_grid_to_latlon(x, y, projection)
+    rows, cols = np.meshgrid(rows, cols, indexing='ij')
+    visible = np.isfinite(lat)
+    found_rows, found_cols = fixed_grid_pixels(lat[visible], lon[visible], projection, extent, height, width)
+    return float(np.mean((found_rows == rows[visible]) & (found_cols == cols[visible])))
+
+
+def check_geotransform_pixels(geotransform, projection, x_axis, y_axis, jitter=0.45, stride=1, seed=0):
+    """
+    Regression check for a COG geotransform against the grid's pixel centres.
+
+    x_axis / y_axis are the product's true pixel-centre scan angles (e.g.
+    pixel_axis_coords of the file's x / y). Every centre is moved by up to
+    jitter pixels, projected to lat/lon and back, and placed through
+    geotransform (metres of scan angle x sat_height); stride checks every
+    stride-th row and column. Returns the fraction of visible points that
+    land on their own COG pixel.
+    """
+    rng = np.random.default_rng(seed)
+    height, width = len(y_axis), len(x_axis)
+    rows, cols = np.arange(0, height, stride), np.arange(0, width, stride)
+    x = x_axis[cols] + rng.uniform(-jitter, jitter, len(cols)) * (x_axis[1] - x_axis[0])
+    y = y_axis[rows] + rng.uniform(-jitter, jitter, len(rows)) * (y_axis[1] - y_axis[0])
+    lat, lon = goes_fixed_grid_to_latlon(x, y, projection)
+    rows, cols = np.meshgrid(rows, cols, indexing='ij')
+    visible = np.isfinite(lat)
+    x_rad, y_rad = latlon_to_goes_fixed_grid(lat[visible], lon[visible], projection)
+    origin_x, pixel_x, _, origin_y, _, pixel_y = geotransform
+    found_cols = np.floor((x_rad * projection['sat_height'] - origin_x) / pixel_x)
+    found_rows = np.floor((y_rad * projection['sat_height'] - origin_y) / pixel_y)
+    return float(np.mean((found_rows == rows[visible]) & (found_cols == cols[visible])))
+
+
+def latlon_polygon_vertices(lat, lon, projection, extent, height, width):
+    """Polygon vertices (row, col) in pixel units of lat/lon points (see fixed_grid_position)."""
+    row, col = fixed_grid_position(lat, lon, projection, extent, height, width)
+    if not (np.isfinite(row).all() and np.isfinite(col).all()):
+        raise ValueError("Polygon has vertices off the Earth's disk")
+    return np.stack([row, col], axis=1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sample product archives and fixed-grid pixel checks")
+    parser.add_argument('--samples', action='store_true',
+                        help="rewrite the sample H5 files with tile-aligned chunks and benchmark window reads")
+    parser.add_argument('--check-pixels', action='store_true',
+                        help="check lat/lon -> pixel lookups and COG geotransforms against the CONUS pixel centres")
+    args = parser.parse_args()
+    if not (args.samples or args.check_pixels):
+        parser.error("nothing to do: pass --samples and/or --check-pixels")
+
+    if args.check_pixels:
+        # GOES-East CONUS pixel centres at 2 km and 0.5 km
+        conus = {'sat_lon': -75.0, 'sat_height': 35786023.0, 'semi_major': 6378137.0, 'semi_minor': 6356752.31414}
+        x_coords = np.linspace(-0.101332, 0.038612, 2500)
+        y_coords = np.linspace(0.128212, 0.044268, 1500)
+        extent = pixel_edge_extent(x_coords[0], x_coords[-1], y_coords[0], y_coords[-1], 2500, 1500)
+        for width, height in ((2500, 1500), (10000, 6000)):
+            matched = check_fixed_grid_pixels(conus, extent, pixel_axis_coords(x_coords, width),
+                                              pixel_axis_coords(y_coords, height), stride=width // 1000)
+            print(f"Pixel lookup {width}x{height}: {matched:.2%} of points on their nearest pixel")
+            if matched < 1.0:
+                raise SystemExit("fixed_grid_pixels disagrees with the nearest-pixel search")
+
+        # COG georeferencing: the same centres placed through the authority's geotransform
+        GOESProjectionAuthority.verbose = False
+        authority = GOESProjectionAuthority.from_params(conus, x_coords, y_coords)
+        for width, height in ((2500, 1500), (10000, 6000)):
+            matched = check_geotransform_pixels(authority.get_geotransform(width, height), conus,
+                                                pixel_axis_coords(x_coords, width),
+                                                pixel_axis_coords(y_coords, height), stride=width // 1000)
+            print(f"COG geotransform {width}x{height}: {matched:.2%} of points on their own pixel")
+            if matched < 1.0:
+                raise SystemExit("get_geotransform disagrees with the pixel centres")
+
+    if args.samples:
+        for domain in SAMPLE_SOURCES:
+            archive_path = write_sample_archive(domain, tile=64)
+            for path in (SAMPLE_SOURCES[domain]['h5'], archive_path):
+                benchmark_archive_reads(path, 'rgb_values', window=64)
@@ -40,152 +40,10 @@ print(f"   - Channel selection: {'✅' if HAS_CHANNELS_TO_PROCESS else '❌ (wil
 # ULTRA-FAST IR PROCESSOR (COMMON TO ALL PATHS)
 # ============================================================================
 
-class GOESProjectionAuthority:
-    """
-    Read GOES projection from NetCDF once.
-    Provide geotransforms for any resolution based on data dimensions.
-    """
-
-    # Known GOES resolutions (in radians per pixel at native resolution)
-    RESOLUTION_MAP = {
-        0.5: 0.000014,  # C02, C04, and upscaled RGBs
-        1.0: 0.000028,  # C01, C03, C05, C06
-        2.0: 0.000056   # C07-C16
-    }
-
-    def __init__(self, netcdf_dataset):
-        """Initialize from first NetCDF file - read what's there"""
-        proj_info = netcdf_dataset['goes_imager_projection']
-
-        # Read parameters from file (these never change)
-        self.sat_lon = float(proj_info.longitude_of_projection_origin)
-        self.sat_height = float(proj_info.perspective_point_height)
-        self.semi_major = float(proj_info.semi_major_axis)
-        self.semi_minor = float(proj_info.semi_minor_axis)
-        self.inv_flattening = float(proj_info.inverse_flattening)
-        self.sweep_axis = str(proj_info.sweep_angle_axis)
-
-        # Read coordinate arrays to determine geographic extent
-        x_coords = netcdf_dataset['x'].values
-        y_coords = netcdf_dataset['y'].values
-
-        # Store geographic extent (in radians) - this is constant
-        self.x_min = float(x_coords.min())
-        self.x_max = float(x_coords.max())
-        self.y_min = float(y_coords.min())
-        self.y_max = float(y_coords.max())
-
-        # Store extent dimensions
-        self.x_extent_rad = self.x_max - self.x_min
-        self.y_extent_rad = self.y_max - self.y_min
-
-        # Detect resolution of THIS channel (for info)
-        dx = float(x_coords[1] - x_coords[0])
-        pixel_size_rad = abs(dx)
-        if pixel_size_rad < 0.000021:
-            self.source_resolution_km = 0.5
-        elif pixel_size_rad < 0.000042:
-            self.source_resolution_km = 1.0
-        else:
-            self.source_resolution_km = 2.0
-
-        # Compute WKT and PROJ once
-        self._wkt = self._create_wkt()
-        self._proj = self._create_proj()
-
-        print(f"✅ GOES Projection Authority initialized")
-        print(f"   Satellite: {self.sat_lon}° at {self.sat_height/1e6:.1f}M m")
-        print(f"   Geographic extent: {self.x_extent_rad:.6f} x {self.y_extent_rad:.6f} rad")
-        print(f"   Source channel resolution: {self.source_resolution_km} km")
-        print(f"   (Will auto-detect resolution for RGBs/other channels)")
-
-    def _create_wkt(self):
-        """Create WKT using SetGEOS - sweep handled in PROJ string"""
-        from osgeo import osr
-
-        srs = osr.SpatialReference()
-        srs.SetGeogCS("GRS 1980", "GRS 1980", "GRS80",
-                      self.semi_major, self.inv_flattening)
-        srs.SetGEOS(self.sat_lon, self.sat_height, 0.0, 0.0)
-
-        return srs.ExportToWkt()
-
-    def _create_proj(self):
-        """Create PROJ string with sweep parameter"""
-        proj_str = (f"+proj=geos +lon_0={self.sat_lon} "
-                    f"+h={self.sat_height} "
-                    f"+x_0=0 +y_0=0 "
-                    f"+ellps=GRS80 "
-                    f"+sweep={self.sweep_axis} "
-                    f"+units=m +no_defs")
-        return proj_str
-
-    def get_proj(self):
-        """Return the PROJ string with sweep parameter"""
-        return self._proj
-
-    def get_wkt(self):
-        """Return the WKT - same every time"""
-        return self._wkt
-
-    def detect_resolution_from_dimensions(self, data_width, data_height):
-        """
-        Detect what resolution the data is at based on dimensions.
-        Works for channels at native resolution AND upscaled RGBs.
-        """
-        # Calculate pixel spacing from dimensions and known extent
-        pixel_spacing_x_rad = self.x_extent_rad / data_width
-        pixel_spacing_y_rad = self.y_extent_rad / data_height
-
-        # Use X spacing to determine resolution
-        pixel_size_rad = abs(pixel_spacing_x_rad)
-
-        # Determine which standard resolution this matches
-        if pixel_size_rad < 0.000021:
-            detected_km = 0.5
-        elif pixel_size_rad < 0.000042:
-            detected_km = 1.0
-        else:
-            detected_km = 2.0
-
-        return detected_km, pixel_spacing_x_rad, pixel_spacing_y_rad
-
-    def get_geotransform(self, data_width, data_height):
-        """
-        Return geotransform for data of ANY resolution.
-        Auto-detects resolution from dimensions.
-        """
-        # Detect resolution from dimensions
-        detected_km, dx_rad, dy_rad = self.detect_resolution_from_dimensions(data_width, data_height)
-
-        # Convert to meters
-        upper_left_x = self.x_min * self.sat_height
-        upper_left_y = self.y_max * self.sat_height
-        pixel_size_x = dx_rad * self.sat_height
-        pixel_size_y = abs(dy_rad * self.sat_height)
-
-        if not OPERATIONAL_MODE:
-            print(f"    🔍 Detected resolution: {detected_km} km from dims {data_width}x{data_height}")
-            print(f"    📏 Pixel size: {pixel_size_x:.1f} x {pixel_size_y:.1f} meters")
-
-        return [
-            upper_left_x,
-            pixel_size_x,
-            0.0,
-            upper_left_y,
-            0.0,
-            -pixel_size_y
-        ]
-
-    def get_info_dict(self):
-        """Return info for display"""
-        return {
-            'sat_lon': self.sat_lon,
-            'sat_height': self.sat_height,
-            'source_resolution_km': self.source_resolution_km,
-            'geographic_extent_rad': (self.x_extent_rad, self.y_extent_rad),
-            'supported_resolutions': '0.5, 1.0, 2.0 km (auto-detected)'
-        }
+# The authority (projection parameters, geotransforms and the fixed-grid
+# lat/lon transforms) lives in goes_projection, shared with the export modules
+from goes_projection import GOESProjectionAuthority
+GOESProjectionAuthority.verbose = not globals().get('OPERATIONAL_MODE', False)
 
 # Global singleton - initialized once in Cell 4
 _GOES_PROJECTION_AUTHORITY = None
@@ -384,9 +242,9 @@ class EnhancedIRChannelProcessor:
 
         # Use Numba version if available
         if NUMBA_AVAILABLE:
-            bt = np.zeros_like(radiance, dtype=np.float32)
+            bt = np.zeros(radiance.shape, dtype=np.float32)
             numba_radiance_to_brightness_temp(
-                radiance.astype(np.float32),
+                np.ascontiguousarray(radiance, dtype=np.float32),
                 np.float32(fk1), np.float32(fk2),
                 np.float32(bc1), np.float32(bc2),
                 bt
@@ -429,7 +287,7 @@ class EnhancedIRChannelProcessor:
 
                 # Use ultra-fast Numba LUT function
                 ultra_fast_temperature_to_rgb_lut(
-                    bt_celsius.astype(np.float32),
+                    np.ascontiguousarray(bt_celsius, dtype=np.float32),
                     combined_lut['temp_range'].astype(np.float32),
                     combined_lut['rgb_lut'],
                     rgb_output
@@ -454,17 +312,17 @@ class EnhancedIRChannelProcessor:
 
             if channel_code == 'C07':
                 # Shortwave IR with exact CIRA mapping
-                numba_ir_enhancement_c07_corrected(bt_celsius.astype(np.float32), enhanced_data)
+                numba_ir_enhancement_c07_corrected(np.ascontiguousarray(bt_celsius, dtype=np.float32), enhanced_data)
                 print(f"    ⚡ Used Numba C07 enhancement (10-25x speedup)")
 
             elif channel_code in ['C08', 'C09', 'C10']:
                 # Water vapor channels with exact breakpoints
-                numba_ir_enhancement_water_vapor_corrected(bt_celsius.astype(np.float32), enhanced_data)
+                numba_ir_enhancement_water_vapor_corrected(np.ascontiguousarray(bt_celsius, dtype=np.float32), enhanced_data)
                 print(f"    ⚡ Used Numba water vapor enhancement (10-25x speedup)")
 
             elif channel_code in ['C11', 'C12', 'C13', 'C14', 'C15', 'C16']:
                 # IR window channels with exact CIRA rainbow
-                numba_ir_enhancement_window_corrected(bt_celsius.astype(np.float32), enhanced_data)
+                numba_ir_enhancement_window_corrected(np.ascontiguousarray(bt_celsius, dtype=np.float32), enhanced_data)
                 print(f"    ⚡ Used Numba IR window enhancement (10-25x speedup)")
 
             else:
@@ -484,7 +342,7 @@ class EnhancedIRChannelProcessor:
         """Enhanced visible channel processing"""
         if NUMBA_AVAILABLE:
             enhanced_data = np.zeros_like(calibrated_data, dtype=np.uint8)
-            numba_visible_enhancement(calibrated_data.astype(np.float32), enhanced_data)
+            numba_visible_enhancement(np.ascontiguousarray(calibrated_data, dtype=np.float32), enhanced_data)
             print(f"    ⚡ Used Numba visible enhancement")
             return enhanced_data
         else:
@@ -496,7 +354,13 @@ class EnhancedIRChannelProcessor:
 # ============================================================================
 
 class ChannelDataStore:
-    """Storage for processed channel data"""
+    """
+    Storage for processed channel data.
+
+    Dtype contract: 'calibrated' is always C-contiguous float32 and 'enhanced'
+    is uint8, so RGB workers can hand them straight to Numba kernels without
+    another astype() copy. The store takes ownership of the arrays it is given.
+    """
 
     def __init__(self):
         self.channels = {}
@@ -504,10 +368,14 @@ class ChannelDataStore:
         self.coordinate_data = None
         self.solar_angles = None
         self.processing_times = {}
+        self.region_tables = {}
+        self.channel_cube = None
 
     def store_channel(self, channel_code, calibrated_data, enhanced_data,
                      channel_type, metadata, processing_time=None):
-        """Store processed channel data"""
+        """Store processed channel data (no copy if already float32/uint8)"""
+        calibrated_data = np.ascontiguousarray(calibrated_data, dtype=np.float32)
+        enhanced_data = np.asarray(enhanced_data, dtype=np.uint8)
         self.channels[channel_code] = {
             'calibrated': calibrated_data,
             'enhanced': enhanced_data,
@@ -534,17 +402,86 @@ class ChannelDataStore:
             'cos_sza': cos_sza
         }
 
+    # Channels users draw statistics regions on (cold-cloud fraction needs BT)
+    REGION_STAT_BANDS = ['C13']
+
+    def build_region_tables(self, channel_codes=None, thresholds_c=None):
+        """
+        Summed-area tables for region statistics (archive.rect_stats /
+        polygon_stats): count, sum and sum of squares, plus one count table
+        per cold-cloud threshold for IR channels. About 36 bytes per pixel per
+        channel, and the tables keep the calibrated array alive after
+        cleanup_channel_data_after_rgb() - enable with ENABLE_REGION_STATS.
+        """
+        from archive import COLD_CLOUD_THRESHOLDS_C, build_region_tables
+
+        codes = channel_codes or self.REGION_STAT_BANDS
+        thresholds_c = COLD_CLOUD_THRESHOLDS_C if thresholds_c is None else thresholds_c
+        for ch in codes:
+            if ch not in self.channels or self.channels[ch]['calibrated'] is None:
+                continue
+            is_ir = self.channels[ch]['channel_type'] == 'ir'
+            thresholds = [t + 273.15 for t in thresholds_c] if is_ir else []
+            self.region_tables[ch] = build_region_tables(self.channels[ch]['calibrated'], thresholds)
+        return self.region_tables
+
+    # Same-resolution IR bands read together by the multi-channel IR kernels
+    # (airmass: C08/C10/C12/C13, dust: C11/C13/C14/C15)
+    CUBE_BANDS = ['C08', 'C10', 'C11', 'C12', 'C13', 'C14', 'C15']
+
+    def build_channel_cube(self, channel_codes=None):
+        """
+        Pack same-shape IR channels into one contiguous (H, W, C) float32 cube.
+
+        The airmass / dust workers hand the production kernels the cube's
+        per-band views (cube[:, :, i]), so all bands of a pixel are read from
+        one cache line instead of one stream per band, with the kernels' math
+        unchanged. The planar 'calibrated' arrays are kept for every other
+        consumer, so the cube is an extra copy of the packed bands - enable it
+        with ENABLE_CHANNEL_CUBE only when the IR products are requested.
+        """
+        codes = channel_codes or self.CUBE_BANDS
+        available = [ch for ch in codes
+                     if ch in self.channels and self.channels[ch]['channel_type'] == 'ir']
+
+        if not available:
+            self.channel_cube = None
+            return None
+
+        # Pack the most common shape so one odd-resolution band (e.g. a native
+        # 2 km channel next to upscaled ones) doesn't block the rest
+        shapes = [self.channels[ch]['shape'] for ch in available]
+        cube_shape = max(set(shapes), key=shapes.count)
+        bands = [ch for ch in available if self.channels[ch]['shape'] == cube_shape]
+
+        cube = np.empty(cube_shape + (len(bands),), dtype=np.float32)
+        for i, ch in enumerate(bands):
+            cube[:, :, i] = self.channels[ch]['calibrated']
+
+        self.channel_cube = {
+            'data': cube,
+            'bands': bands,
+            'index': {ch: i for i, ch in enumerate(bands)},
+            'shape': cube_shape
+        }
+        return self.channel_cube
+
     def get_summary(self):
         """Get processing summary"""
         total_size_mb = 0
         for ch_data in self.channels.values():
             total_size_mb += (ch_data['calibrated'].nbytes + ch_data['enhanced'].nbytes) / (1024 * 1024)
+        total_size_mb += sum(tables['nbytes'] for tables in self.region_tables.values()) / (1024 * 1024)
+        if self.channel_cube is not None:
+            total_size_mb += self.channel_cube['data'].nbytes / (1024 * 1024)
 
         return {
             'total_channels': len(self.channels),
             'total_size_mb': total_size_mb,
             'has_coordinates': self.coordinate_data is not None,
             'has_solar_angles': self.solar_angles is not None,
+            'region_tables': list(self.region_tables),
+            'cube_bands': self.channel_cube['bands'] if self.channel_cube is not None else [],
             'channel_types': {ch: data['channel_type'] for ch, data in self.channels.items()},
             'avg_processing_time': np.mean(list(self.processing_times.values())) if self.processing_times else 0
         }
@@ -623,8 +560,30 @@ def get_level2_channel_requirements(domain_type):
             'C10': 'upscale_4x', 'C13': 'upscale_4x',
         }
 
-def load_level2_data(channels_to_process):
-    """Load Level 2 multi-channel data"""
+def load_subset_slices(ds, window=None):
+    """
+    (y slice, x slice) hyperslab of a channel file for a load window.
+
+    window is a GEODATA_DOMAINS name (e.g. 'oklahoma') or a fixed-grid extent
+    (x_min, x_max, y_min, y_max) in radians; None loads the whole scene.
+    Every band's slices cover the same ground (convert_geodata.fixed_grid_hyperslab),
+    so 1 and 2 km subsets still upscale onto the 0.5 km subset.
+    """
+    if window is None:
+        return slice(None), slice(None)
+    from convert_geodata import domain_scan_extent, fixed_grid_hyperslab
+
+    extent = window
+    if isinstance(window, str):
+        extent = domain_scan_extent(window, GOESProjectionAuthority.read_params(ds['goes_imager_projection']))
+    hyperslab = extent and fixed_grid_hyperslab(ds['x'].values, ds['y'].values, extent)
+    if hyperslab is None:
+        raise ValueError(f"Load window {window} is outside this scene")
+    row0, row1, col0, col1 = hyperslab
+    return slice(row0, row1), slice(col0, col1)
+
+def load_level2_data(channels_to_process, window=None):
+    """Load Level 2 multi-channel data (only the window's hyperslab, see load_subset_slices)"""
     print(f"📖 Loading Level 2 multi-channel file...")
 
     raw_data_store = {}
@@ -635,6 +594,9 @@ def load_level2_data(channels_to_process):
         with xr.open_dataset(level2_file) as ds:
             print(f"  📊 File: {level2_file.split('/')[-1]}")
             print(f"  📐 Resolution: {ds.dims['y']}x{ds.dims['x']}")
+            rows, cols = load_subset_slices(ds, window)
+            if window is not None:
+                print(f"  ✂️  Subset {window}: rows {rows.start}-{rows.stop}, cols {cols.start}-{cols.stop}")
 
             for i, channel in enumerate(channels_to_process, 1):
                 print(f"    [{i:2d}/{len(channels_to_process)}] Extracting {channel}...")
@@ -646,7 +608,9 @@ def load_level2_data(channels_to_process):
                     print(f"      ❌ {cmi_var} not found")
                     continue
 
-                calibrated_data = ds[cmi_var].values.copy()
+                # .values already materializes a private array once the
+                # dataset closes, so take it as float32 without a second copy
+                calibrated_data = np.ascontiguousarray(ds[cmi_var][rows, cols].values, dtype=np.float32)
                 band_id = ds[band_id_var].values[0] if band_id_var in ds else int(channel[1:])
 
                 units = ds[cmi_var].attrs.get('units', '')
@@ -667,8 +631,8 @@ def load_level2_data(channels_to_process):
 
                 if channel == channels_to_process[0]:
                     raw_data_store[channel]['coordinate_data'] = {
-                        'x_coords': ds['x'].values.copy(),
-                        'y_coords': ds['y'].values.copy(),
+                        'x_coords': ds['x'].values[cols].copy(),
+                        'y_coords': ds['y'].values[rows].copy(),
                         'projection_info': ds['goes_imager_projection'],
                         'primary_channel': channel
                     }
@@ -684,8 +648,13 @@ def load_level2_data(channels_to_process):
 
 # In Cell 4, modify load_level1b_data function:
 
-def load_level1b_data(channels_to_process):
-    """Load Level 1b individual channel files WITH PROJECTION AUTHORITY"""
+def load_level1b_data(channels_to_process, window=None):
+    """Load Level 1b individual channel files WITH PROJECTION AUTHORITY
+
+    With a window only that hyperslab of each Rad variable is read and
+    calibrated (see load_subset_slices); coordinates and the projection
+    authority then describe the subset.
+    """
     global _GOES_PROJECTION_AUTHORITY
 
     print(f"📖 Loading Level 1b individual channel files...")
@@ -699,14 +668,26 @@ def load_level1b_data(channels_to_process):
             file_path = DOWNLOAD_RESULTS[channel]['local_path']
 
             with xr.open_dataset(file_path) as ds:
+                rows, cols = load_subset_slices(ds, window)
+
                 # Initialize projection authority from first channel
                 if _GOES_PROJECTION_AUTHORITY is None:
                     print(f"    🔧 Initializing projection authority from {channel}...")
-                    _GOES_PROJECTION_AUTHORITY = GOESProjectionAuthority(ds)
-
+                    _GOES_PROJECTION_AUTHORITY = GOESProjectionAuthority(ds, None if window is None else (rows, cols))
+
+                # Ownership of 'radiance' passes to the worker, which pops it
+                # and frees it as soon as the channel is calibrated. Indexing
+                # before .values reads only the hyperslab from the file
+                if globals().get('USE_DIRECT_CHUNK_READER', False):
+                    # Chunks decoded across threads straight into the output
+                    from abi_reader import read_direct
+                    radiance = read_direct(file_path, 'Rad', rows, cols,
+                                           max_workers=globals().get('MAX_PARALLEL_WORKERS', 4))
+                else:
+                    radiance = np.ascontiguousarray(ds['Rad'][rows, cols].values, dtype=np.float32)
                 raw_data_store[channel] = {
-                    'radiance': ds['Rad'].values.copy(),
-                    'native_shape': ds['Rad'].shape,
+                    'radiance': radiance,
+                    'native_shape': radiance.shape,
                     'band_id': ds.band_id.values[0] if 'band_id' in ds else None,
                     'channel_type': 'ir' if ds.band_id.values[0] >= 7 else 'visible',
                     'data_level': 'level1b',
@@ -729,14 +710,15 @@ def load_level1b_data(channels_to_process):
                 # Store coordinate data from first suitable channel (C02 or first channel)
                 if channel == 'C02' or (channel == channels_to_process[0] and 'C02' not in channels_to_process):
                     raw_data_store[channel]['coordinate_data'] = {
-                        'x_coords': ds['x'].values.copy(),
-                        'y_coords': ds['y'].values.copy(),
+                        'x_coords': ds['x'].values[cols].copy(),
+                        'y_coords': ds['y'].values[rows].copy(),
                         'projection_info': ds['goes_imager_projection'],
                         'primary_channel': channel
                     }
 
             data_size_mb = raw_data_store[channel]['radiance'].nbytes / (1024 * 1024)
-            print(f"    ✅ {channel}: {data_size_mb:.1f} MB loaded")
+            subset_note = f" ({radiance.shape[0]}x{radiance.shape[1]} subset)" if window is not None else ""
+            print(f"    ✅ {channel}: {data_size_mb:.1f} MB loaded{subset_note}")
 
         except Exception as e:
             print(f"    ❌ {channel}: Failed to load - {e}")
@@ -754,20 +736,19 @@ def fast_upscale_array(data, zoom_factor):
     target_shape = (int(data.shape[0] * zoom_factor[0]), int(data.shape[1] * zoom_factor[1]))
 
     if NUMBA_AVAILABLE:
+        # Kernels read float32 directly; both conversions are no-ops for the
+        # float32 arrays the loaders now hand over
+        source = np.ascontiguousarray(data, dtype=np.float32)
+        output = np.zeros(target_shape, dtype=np.float32)
         if zoom_factor == (2.0, 2.0):
-            output = np.zeros(target_shape, dtype=np.float32)
-            numba_fast_upscale_2x(data.astype(np.float32), output)
-            return output.astype(data.dtype)
+            numba_fast_upscale_2x(source, output)
         elif zoom_factor == (4.0, 4.0):
-            output = np.zeros(target_shape, dtype=np.float32)
-            numba_fast_upscale_4x(data.astype(np.float32), output)
-            return output.astype(data.dtype)
+            numba_fast_upscale_4x(source, output)
         else:
             y_ratio = data.shape[0] / target_shape[0]
             x_ratio = data.shape[1] / target_shape[1]
-            output = np.zeros(target_shape, dtype=np.float32)
-            numba_bilinear_upscale(data.astype(np.float32), output, y_ratio, x_ratio)
-            return output.astype(data.dtype)
+            numba_bilinear_upscale(source, output, y_ratio, x_ratio)
+        return output.astype(data.dtype, copy=False)
     else:
         return zoom(data, zoom_factor, order=1, prefilter=False)
 
@@ -802,10 +783,12 @@ def level2_aware_worker(task_data):
         requirement = requirements.get(channel_code, 'native')
         print(f"    Native: {current_shape}, Target: {target_shape}, Rule: {requirement}")
 
+        # Take ownership of the loaded array: popping it from raw_data means the
+        # only reference lives in this worker and is released once calibrated
         if data_level == 'level2':
-            calibrated_data = raw_data['calibrated_data'].copy()
+            calibrated_data = raw_data.pop('calibrated_data')
         else:
-            radiance = raw_data['radiance'].copy()
+            radiance = raw_data.pop('radiance')
 
             if channel_type == 'ir':
                 class SimpleMockDataset:
@@ -823,8 +806,8 @@ def level2_aware_worker(task_data):
             else:
                 if raw_data.get('kappa0') is not None:
                     if NUMBA_AVAILABLE:
-                        calibrated_data = np.zeros_like(radiance, dtype=np.float32)
-                        numba_visible_calibration(radiance.astype(np.float32),
+                        calibrated_data = np.zeros(radiance.shape, dtype=np.float32)
+                        numba_visible_calibration(np.ascontiguousarray(radiance, dtype=np.float32),
                                                 np.float32(raw_data['kappa0']),
                                                 calibrated_data)
                     else:
@@ -865,8 +848,8 @@ def level2_aware_worker(task_data):
 
         # Ensure proper data types
         if globals().get('COMPRESS_STORED_DATA', True):
-            calibrated_data = calibrated_data.astype(np.float32)
-            enhanced_data = enhanced_data.astype(np.uint8)
+            calibrated_data = calibrated_data.astype(np.float32, copy=False)
+            enhanced_data = enhanced_data.astype(np.uint8, copy=False)
 
         processing_time = time.time() - start_time
         data_size_mb = (calibrated_data.nbytes + enhanced_data.nbytes) / (1024 * 1024)
@@ -1188,9 +1171,9 @@ def process_level2_aware():
     phase1_start = time.time()
 
     if DATA_LEVEL == 'level2':
-        raw_data_store = load_level2_data(channels_to_process)
+        raw_data_store = load_level2_data(channels_to_process, globals().get('LOAD_WINDOW'))
     else:
-        raw_data_store = load_level1b_data(channels_to_process)
+        raw_data_store = load_level1b_data(channels_to_process, globals().get('LOAD_WINDOW'))
 
     phase1_time = time.time() - phase1_start
 
@@ -1233,6 +1216,10 @@ def process_level2_aware():
         task = (channel_code, raw_data, target_shape, reference_shape, DOMAIN_TYPE)
         tasks.append(task)
 
+    # Each task now owns its channel's raw arrays; drop the store so a channel's
+    # radiance is freed as soon as its worker has calibrated it
+    raw_data_store.clear()
+
     print(f"🚀 Processing {len(tasks)} channels...")
 
     successful = 0
@@ -1366,7 +1353,8 @@ def standard_conus_worker(task_data):
     try:
         print(f"  🔄 Worker processing {channel_code} (standard CONUS)...")
 
-        radiance = raw_data['radiance'].copy()
+        # Take ownership of the loaded radiance (see load_level1b_data)
+        radiance = raw_data.pop('radiance')
         channel_type = raw_data['channel_type']
         band_id = raw_data['band_id']
         current_shape = raw_data['native_shape']
@@ -1399,15 +1387,13 @@ def standard_conus_worker(task_data):
             simple_mock_ds = SimpleMockDataset(raw_data) if raw_data['planck_fk1'] is not None else None
             calibrated_data = EnhancedIRChannelProcessor.radiance_to_brightness_temp(radiance, channel_code, simple_mock_ds)
 
-            enhanced_data = EnhancedIRChannelProcessor.enhance_ir_channel(calibrated_data, channel_code, simple_mock_ds)
-
         else:
             print(f"    ☀️  Processing visible channel {channel_code}...")
 
             if raw_data['kappa0'] is not None:
                 if NUMBA_AVAILABLE:
-                    calibrated_data = np.zeros_like(radiance, dtype=np.float32)
-                    numba_visible_calibration(radiance.astype(np.float32),
+                    calibrated_data = np.zeros(radiance.shape, dtype=np.float32)
+                    numba_visible_calibration(np.ascontiguousarray(radiance, dtype=np.float32),
                                             np.float32(raw_data['kappa0']),
                                             calibrated_data)
                 else:
@@ -1416,10 +1402,15 @@ def standard_conus_worker(task_data):
                 max_val = np.nanmax(radiance)
                 calibrated_data = radiance / max_val if max_val > 0 else radiance
 
-            enhanced_data = EnhancedIRChannelProcessor.enhance_visible_channel(calibrated_data)
-
+        # Raw radiance is no longer needed once calibrated - free it before
+        # the enhancement step allocates its outputs
         del radiance
 
+        if channel_type == 'ir':
+            enhanced_data = EnhancedIRChannelProcessor.enhance_ir_channel(calibrated_data, channel_code, simple_mock_ds)
+        else:
+            enhanced_data = EnhancedIRChannelProcessor.enhance_visible_channel(calibrated_data)
+
         metadata = {
             'file_path': raw_data['file_path'],
             'shape': target_shape,
@@ -1430,8 +1421,8 @@ def standard_conus_worker(task_data):
         }
 
         if globals().get('COMPRESS_STORED_DATA', True):
-            calibrated_data = calibrated_data.astype(np.float32)
-            enhanced_data = enhanced_data.astype(np.uint8)
+            calibrated_data = calibrated_data.astype(np.float32, copy=False)
+            enhanced_data = enhanced_data.astype(np.uint8, copy=False)
 
         processing_time = time.time() - start_time
         data_size_mb = (calibrated_data.nbytes + enhanced_data.nbytes) / (1024 * 1024)
@@ -1610,7 +1601,7 @@ def process_standard_conus():
     # PHASE 1: Sequential file loading
     print(f"\n📖 PHASE 1: Sequential Data Loading")
     phase1_start = time.time()
-    raw_data_store = load_level1b_data(channels_to_process)
+    raw_data_store = load_level1b_data(channels_to_process, globals().get('LOAD_WINDOW'))
     phase1_time = time.time() - phase1_start
 
     if not raw_data_store:
@@ -1643,6 +1634,10 @@ def process_standard_conus():
         task = (channel_code, raw_data, target_shape, reference_shape)
         tasks.append(task)
 
+    # Each task now owns its channel's raw arrays; drop the store so a channel's
+    # radiance is freed as soon as its worker has calibrated it
+    raw_data_store.clear()
+
     print(f"🚀 Processing {len(tasks)} channels...")
 
     successful = 0
@@ -1763,7 +1758,7 @@ def process_enhanced_full_disk():
     # PHASE 1: Sequential file loading
     print(f"\n📖 PHASE 1: Sequential Data Loading")
     phase1_start = time.time()
-    raw_data_store = load_level1b_data(channels_to_process)
+    raw_data_store = load_level1b_data(channels_to_process, globals().get('LOAD_WINDOW'))
     phase1_time = time.time() - phase1_start
 
     if not raw_data_store:
@@ -1798,6 +1793,10 @@ def process_enhanced_full_disk():
         task = (channel_code, raw_data, target_shape, reference_shape)
         tasks.append(task)
 
+    # Each task now owns its channel's raw arrays; drop the store so a channel's
+    # radiance is freed as soon as its worker has calibrated it
+    raw_data_store.clear()
+
     print(f"🚀 Processing {len(tasks)} channels at native resolution...")
 
     successful = 0
@@ -1932,6 +1931,19 @@ try:
 except:
     pass
 
+# Optional summed-area tables for drawn-region statistics
+if globals().get('ENABLE_REGION_STATS', False):
+    region_tables = PROCESSED_CHANNELS.build_region_tables(globals().get('REGION_STAT_CHANNELS'))
+    for ch, tables in region_tables.items():
+        print(f"📐 Region tables {ch}: {tables['nbytes'] / (1024 * 1024):.1f} MB in {tables['build_time']:.2f}s")
+
+# Optional band-interleaved IR cube for the airmass / dust kernels
+if globals().get('ENABLE_CHANNEL_CUBE', False):
+    cube = PROCESSED_CHANNELS.build_channel_cube()
+    if cube is not None:
+        print(f"🧊 Channel cube: {cube['bands']} {cube['data'].shape} "
+              f"({cube['data'].nbytes / (1024 * 1024):.1f} MB)")
+
 # Clean up
 gc.collect()
 
@@ -1940,12 +1952,16 @@ CHANNELS = PROCESSED_CHANNELS.channels
 METADATA = PROCESSED_CHANNELS.metadata
 COORDINATE_DATA = PROCESSED_CHANNELS.coordinate_data
 SOLAR_ANGLES = PROCESSED_CHANNELS.solar_angles
+REGION_TABLES = PROCESSED_CHANNELS.region_tables
+CHANNEL_CUBE = PROCESSED_CHANNELS.channel_cube
 
 print(f"\n🔗 VARIABLES CREATED FOR NEXT CELLS:")
 print(f"   PROCESSED_CHANNELS: Complete data store object")
 print(f"   CHANNELS: Direct access to channel data")
 print(f"   COORDINATE_DATA: Projection and coordinate info")
 print(f"   SOLAR_ANGLES: Solar zenith angle data")
+print(f"   REGION_TABLES: Region statistics tables (empty unless ENABLE_REGION_STATS)")
+print(f"   CHANNEL_CUBE: Band-interleaved IR cube (None unless ENABLE_CHANNEL_CUBE)")
 
 # Show final summary
 summary = PROCESSED_CHANNELS.get_summary()
@@ -2336,15 +2352,15 @@ def rgb_worker_geocolor(channels_data, solar_angles_data):
             prepare_mesoscale_nightlights()
 
         # Rest of geocolor processing unchanged...
-        blue_ref = np.ascontiguousarray(channels_data['C01']['calibrated'].astype(np.float32))
-        red_ref = np.ascontiguousarray(channels_data['C02']['calibrated'].astype(np.float32))
-        nir_ref = np.ascontiguousarray(channels_data['C03']['calibrated'].astype(np.float32))
-        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'].astype(np.float32))
-        c07_bt = np.ascontiguousarray(channels_data['C07']['calibrated'].astype(np.float32))
+        blue_ref = np.ascontiguousarray(channels_data['C01']['calibrated'], dtype=np.float32)
+        red_ref = np.ascontiguousarray(channels_data['C02']['calibrated'], dtype=np.float32)
+        nir_ref = np.ascontiguousarray(channels_data['C03']['calibrated'], dtype=np.float32)
+        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'], dtype=np.float32)
+        c07_bt = np.ascontiguousarray(channels_data['C07']['calibrated'], dtype=np.float32)
 
         if solar_angles_data:
-            cos_sza = np.ascontiguousarray(solar_angles_data['cos_sza'].astype(np.float32))
-            sza = np.ascontiguousarray(solar_angles_data['sza'].astype(np.float32))
+            cos_sza = np.ascontiguousarray(solar_angles_data['cos_sza'], dtype=np.float32)
+            sza = np.ascontiguousarray(solar_angles_data['sza'], dtype=np.float32)
             print(f"    ☀️  Using computed solar angles for day/night blending")
         else:
             print(f"    ☀️  No solar angles available, using default values")
@@ -2393,16 +2409,16 @@ def rgb_worker_geocolor2(channels_data, solar_angles_data):
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
         # Get calibrated data as contiguous float32 arrays
-        blue_ref = np.ascontiguousarray(channels_data['C01']['calibrated'].astype(np.float32))
-        red_ref = np.ascontiguousarray(channels_data['C02']['calibrated'].astype(np.float32))
-        nir_ref = np.ascontiguousarray(channels_data['C03']['calibrated'].astype(np.float32))
-        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'].astype(np.float32))
-        c07_bt = np.ascontiguousarray(channels_data['C07']['calibrated'].astype(np.float32))
+        blue_ref = np.ascontiguousarray(channels_data['C01']['calibrated'], dtype=np.float32)
+        red_ref = np.ascontiguousarray(channels_data['C02']['calibrated'], dtype=np.float32)
+        nir_ref = np.ascontiguousarray(channels_data['C03']['calibrated'], dtype=np.float32)
+        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'], dtype=np.float32)
+        c07_bt = np.ascontiguousarray(channels_data['C07']['calibrated'], dtype=np.float32)
 
         # Get solar angles
         if solar_angles_data:
-            cos_sza = np.ascontiguousarray(solar_angles_data['cos_sza'].astype(np.float32))
-            sza = np.ascontiguousarray(solar_angles_data['sza'].astype(np.float32))
+            cos_sza = np.ascontiguousarray(solar_angles_data['cos_sza'], dtype=np.float32)
+            sza = np.ascontiguousarray(solar_angles_data['sza'], dtype=np.float32)
             print(f"    ☀️  Using computed solar angles for day/night blending")
         else:
             print(f"    ☀️  No solar angles available, using default values")
@@ -2450,13 +2466,13 @@ def rgb_worker_true_color(channels_data, solar_angles_data):
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
         # Get data as contiguous arrays
-        blue_ref = np.ascontiguousarray(channels_data['C01']['calibrated'].astype(np.float32))
-        red_ref = np.ascontiguousarray(channels_data['C02']['calibrated'].astype(np.float32))
-        nir_ref = np.ascontiguousarray(channels_data['C03']['calibrated'].astype(np.float32))
+        blue_ref = np.ascontiguousarray(channels_data['C01']['calibrated'], dtype=np.float32)
+        red_ref = np.ascontiguousarray(channels_data['C02']['calibrated'], dtype=np.float32)
+        nir_ref = np.ascontiguousarray(channels_data['C03']['calibrated'], dtype=np.float32)
 
         # Get solar angles
         if solar_angles_data:
-            cos_sza = np.ascontiguousarray(solar_angles_data['cos_sza'].astype(np.float32))
+            cos_sza = np.ascontiguousarray(solar_angles_data['cos_sza'], dtype=np.float32)
         else:
             cos_sza = np.full(blue_ref.shape, 0.707, dtype=np.float32)
 
@@ -2483,9 +2499,9 @@ def rgb_worker_day_cloud_phase(channels_data, solar_angles_data):
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
         # Get data
-        red_ref = np.ascontiguousarray(channels_data['C02']['calibrated'].astype(np.float32))
-        snow_ice_ref = np.ascontiguousarray(channels_data['C05']['calibrated'].astype(np.float32))
-        clean_ir_bt = np.ascontiguousarray(channels_data['C13']['calibrated'].astype(np.float32))
+        red_ref = np.ascontiguousarray(channels_data['C02']['calibrated'], dtype=np.float32)
+        snow_ice_ref = np.ascontiguousarray(channels_data['C05']['calibrated'], dtype=np.float32)
+        clean_ir_bt = np.ascontiguousarray(channels_data['C13']['calibrated'], dtype=np.float32)
 
         # Convert to Celsius
         clean_ir_celsius = clean_ir_bt - 273.15
@@ -2521,19 +2537,19 @@ def create_sophisticated_geocolor(channels_data, solar_angles_data, coordinate_d
         return None
 
     # Get calibrated data
-    blue_ref = np.ascontiguousarray(channels_data['C01']['calibrated'].astype(np.float32))
-    red_ref = np.ascontiguousarray(channels_data['C02']['calibrated'].astype(np.float32))
-    nir_ref = np.ascontiguousarray(channels_data['C03']['calibrated'].astype(np.float32))
-    c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'].astype(np.float32))
-    c07_bt = np.ascontiguousarray(channels_data['C07']['calibrated'].astype(np.float32))
+    blue_ref = np.ascontiguousarray(channels_data['C01']['calibrated'], dtype=np.float32)
+    red_ref = np.ascontiguousarray(channels_data['C02']['calibrated'], dtype=np.float32)
+    nir_ref = np.ascontiguousarray(channels_data['C03']['calibrated'], dtype=np.float32)
+    c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'], dtype=np.float32)
+    c07_bt = np.ascontiguousarray(channels_data['C07']['calibrated'], dtype=np.float32)
 
     #print(f"   📊 Data shapes: Blue {blue_ref.shape}, Red {red_ref.shape}")
     #print(f"   🌡️  Temperature ranges: C13 {np.nanmin(c13_bt):.1f}-{np.nanmax(c13_bt):.1f}K")
 
     # Get solar angles
     if solar_angles_data:
-        cos_sza = np.ascontiguousarray(solar_angles_data['cos_sza'].astype(np.float32))
-        sza = np.ascontiguousarray(solar_angles_data['sza'].astype(np.float32))
+        cos_sza = np.ascontiguousarray(solar_angles_data['cos_sza'], dtype=np.float32)
+        sza = np.ascontiguousarray(solar_angles_data['sza'], dtype=np.float32)
 
         # Check if solar angles look reasonable
         valid_sza = sza[~np.isnan(sza)]
@@ -2630,14 +2646,14 @@ def rgb_worker_cloud_microphysics(channels_data, solar_angles_data):
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
         # Get calibrated data as Kelvin for BT, reflectance for vis/nir
-        red_ref = np.ascontiguousarray(channels_data['C02']['calibrated'].astype(np.float32))
-        snow_ice_ref = np.ascontiguousarray(channels_data['C05']['calibrated'].astype(np.float32))
-        swir_bt = np.ascontiguousarray(channels_data['C07']['calibrated'].astype(np.float32))      # Kelvin
-        clean_ir_bt = np.ascontiguousarray(channels_data['C13']['calibrated'].astype(np.float32))  # Kelvin
-        dirty_ir_bt = np.ascontiguousarray(channels_data['C15']['calibrated'].astype(np.float32))  # Kelvin
+        red_ref = np.ascontiguousarray(channels_data['C02']['calibrated'], dtype=np.float32)
+        snow_ice_ref = np.ascontiguousarray(channels_data['C05']['calibrated'], dtype=np.float32)
+        swir_bt = np.ascontiguousarray(channels_data['C07']['calibrated'], dtype=np.float32)      # Kelvin
+        clean_ir_bt = np.ascontiguousarray(channels_data['C13']['calibrated'], dtype=np.float32)  # Kelvin
+        dirty_ir_bt = np.ascontiguousarray(channels_data['C15']['calibrated'], dtype=np.float32)  # Kelvin
 
         if solar_angles_data:
-            sza = np.ascontiguousarray(solar_angles_data['sza'].astype(np.float32))
+            sza = np.ascontiguousarray(solar_angles_data['sza'], dtype=np.float32)
         else:
             sza = np.full(red_ref.shape, 60.0, dtype=np.float32)
 
@@ -2663,8 +2679,8 @@ def rgb_worker_split_window_optimized(channels_data, solar_angles_data):
         if missing:
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
-        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'].astype(np.float32))
-        c15_bt = np.ascontiguousarray(channels_data['C15']['calibrated'].astype(np.float32))
+        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'], dtype=np.float32)
+        c15_bt = np.ascontiguousarray(channels_data['C15']['calibrated'], dtype=np.float32)
         output = np.zeros((c13_bt.shape[0], c13_bt.shape[1], 3), dtype=np.uint8)
 
         if NUMBA_AVAILABLE:
@@ -2695,13 +2711,13 @@ def rgb_worker_day_snow_fog_night_fog_core(channels_data, solar_angles_data):
         if missing:
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
-        c03_ref = np.ascontiguousarray(channels_data['C03']['calibrated'].astype(np.float32))
-        c05_ref = np.ascontiguousarray(channels_data['C05']['calibrated'].astype(np.float32))
-        c07_bt = np.ascontiguousarray(channels_data['C07']['calibrated'].astype(np.float32))
-        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'].astype(np.float32))
+        c03_ref = np.ascontiguousarray(channels_data['C03']['calibrated'], dtype=np.float32)
+        c05_ref = np.ascontiguousarray(channels_data['C05']['calibrated'], dtype=np.float32)
+        c07_bt = np.ascontiguousarray(channels_data['C07']['calibrated'], dtype=np.float32)
+        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'], dtype=np.float32)
 
         if solar_angles_data:
-            sza = np.ascontiguousarray(solar_angles_data['sza'].astype(np.float32))
+            sza = np.ascontiguousarray(solar_angles_data['sza'], dtype=np.float32)
             print(f"         Using solar angles for day/night fog detection blend")
         else:
             sza = np.full(c03_ref.shape, 80.0, dtype=np.float32)
@@ -2742,13 +2758,13 @@ def rgb_worker_sandwich_optimized(channels_data, solar_angles_data):
         if missing:
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
-        vis_ref = np.ascontiguousarray(channels_data['C02']['calibrated'].astype(np.float32))
-        ir_bt = np.ascontiguousarray(channels_data['C13']['calibrated'].astype(np.float32))
+        vis_ref = np.ascontiguousarray(channels_data['C02']['calibrated'], dtype=np.float32)
+        ir_bt = np.ascontiguousarray(channels_data['C13']['calibrated'], dtype=np.float32)
         ir_bt_celsius = ir_bt - 273.15
 
         # Get solar angles (CRITICAL for proper day/night blending)
         if solar_angles_data:
-            sza = np.ascontiguousarray(solar_angles_data['sza'].astype(np.float32))
+            sza = np.ascontiguousarray(solar_angles_data['sza'], dtype=np.float32)
             print(f"        Using solar angles for day/night sandwich blend")
         else:
             sza = np.full(vis_ref.shape, 80.0, dtype=np.float32)  # Default to twilight
@@ -2776,11 +2792,19 @@ def rgb_worker_airmass(channels_data, solar_angles_data):
         if missing:
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
+        # Band-interleaved path when the IR cube was built (ENABLE_CHANNEL_CUBE)
+        cube_bands = get_cube_band_views(required, channels_data['C08']['shape'])
+        if cube_bands is not None:
+            output = np.zeros(tuple(CHANNEL_CUBE['shape']) + (3,), dtype=np.uint8)
+            if run_cube_kernel(numba_airmass_optimized_core, cube_bands, output):
+                print(f"    ⚡ Ultra-fast corrected airmass complete (channel cube)")
+                return {'success': True, 'rgb_data': output, 'method': 'airmass_corrected_normalization_cube'}
+
         # Get data as contiguous arrays
-        c08_bt = np.ascontiguousarray(channels_data['C08']['calibrated'].astype(np.float32))
-        c10_bt = np.ascontiguousarray(channels_data['C10']['calibrated'].astype(np.float32))
-        c12_bt = np.ascontiguousarray(channels_data['C12']['calibrated'].astype(np.float32))
-        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'].astype(np.float32))
+        c08_bt = np.ascontiguousarray(channels_data['C08']['calibrated'], dtype=np.float32)
+        c10_bt = np.ascontiguousarray(channels_data['C10']['calibrated'], dtype=np.float32)
+        c12_bt = np.ascontiguousarray(channels_data['C12']['calibrated'], dtype=np.float32)
+        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'], dtype=np.float32)
 
         # Pre-allocate output
         output = np.zeros((c08_bt.shape[0], c08_bt.shape[1], 3), dtype=np.uint8)
@@ -2805,11 +2829,19 @@ def rgb_worker_dust(channels_data, solar_angles_data):
         if missing:
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
+        # Band-interleaved path when the IR cube was built (ENABLE_CHANNEL_CUBE)
+        cube_bands = get_cube_band_views(required, channels_data['C11']['shape'])
+        if cube_bands is not None:
+            output = np.zeros(tuple(CHANNEL_CUBE['shape']) + (3,), dtype=np.uint8)
+            if run_cube_kernel(numba_dust_optimized_core, cube_bands, output):
+                print(f"    ⚡ Ultra-fast corrected dust complete (channel cube)")
+                return {'success': True, 'rgb_data': output, 'method': 'dust_corrected_C14_gamma_cube'}
+
         # Get data as contiguous arrays
-        c11_bt = np.ascontiguousarray(channels_data['C11']['calibrated'].astype(np.float32))
-        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'].astype(np.float32))
-        c14_bt = np.ascontiguousarray(channels_data['C14']['calibrated'].astype(np.float32))  # NEW!
-        c15_bt = np.ascontiguousarray(channels_data['C15']['calibrated'].astype(np.float32))
+        c11_bt = np.ascontiguousarray(channels_data['C11']['calibrated'], dtype=np.float32)
+        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'], dtype=np.float32)
+        c14_bt = np.ascontiguousarray(channels_data['C14']['calibrated'], dtype=np.float32)  # NEW!
+        c15_bt = np.ascontiguousarray(channels_data['C15']['calibrated'], dtype=np.float32)
 
         # Pre-allocate output
         output = np.zeros((c11_bt.shape[0], c11_bt.shape[1], 3), dtype=np.uint8)
@@ -2837,9 +2869,9 @@ def rgb_worker_fire_temperature(channels_data, solar_angles_data):
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
         # Get data as contiguous arrays
-        c07_bt = np.ascontiguousarray(channels_data['C07']['calibrated'].astype(np.float32))  # Temperature
-        c06_ref = np.ascontiguousarray(channels_data['C06']['calibrated'].astype(np.float32))  # Reflectance
-        c05_ref = np.ascontiguousarray(channels_data['C05']['calibrated'].astype(np.float32))  # Reflectance
+        c07_bt = np.ascontiguousarray(channels_data['C07']['calibrated'], dtype=np.float32)  # Temperature
+        c06_ref = np.ascontiguousarray(channels_data['C06']['calibrated'], dtype=np.float32)  # Reflectance
+        c05_ref = np.ascontiguousarray(channels_data['C05']['calibrated'], dtype=np.float32)  # Reflectance
 
         # Pre-allocate output
         output = np.zeros((c07_bt.shape[0], c07_bt.shape[1], 3), dtype=np.uint8)
@@ -2865,9 +2897,9 @@ def rgb_worker_night_microphysics(channels_data, solar_angles_data):
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
         # Get data as contiguous arrays
-        c07_bt = np.ascontiguousarray(channels_data['C07']['calibrated'].astype(np.float32))
-        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'].astype(np.float32))
-        c15_bt = np.ascontiguousarray(channels_data['C15']['calibrated'].astype(np.float32))
+        c07_bt = np.ascontiguousarray(channels_data['C07']['calibrated'], dtype=np.float32)
+        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'], dtype=np.float32)
+        c15_bt = np.ascontiguousarray(channels_data['C15']['calibrated'], dtype=np.float32)
 
         # Pre-allocate output
         output = np.zeros((c07_bt.shape[0], c07_bt.shape[1], 3), dtype=np.uint8)
@@ -2925,10 +2957,10 @@ def rgb_worker_day_snow_fog(channels_data, solar_angles_data):
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
         # Get data as contiguous arrays
-        c03_ref = np.ascontiguousarray(channels_data['C03']['calibrated'].astype(np.float32))  # Reflectance
-        c05_ref = np.ascontiguousarray(channels_data['C05']['calibrated'].astype(np.float32))  # Reflectance
-        c07_bt = np.ascontiguousarray(channels_data['C07']['calibrated'].astype(np.float32))   # Temperature (K)
-        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'].astype(np.float32))   # Temperature (K)
+        c03_ref = np.ascontiguousarray(channels_data['C03']['calibrated'], dtype=np.float32)  # Reflectance
+        c05_ref = np.ascontiguousarray(channels_data['C05']['calibrated'], dtype=np.float32)  # Reflectance
+        c07_bt = np.ascontiguousarray(channels_data['C07']['calibrated'], dtype=np.float32)   # Temperature (K)
+        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'], dtype=np.float32)   # Temperature (K)
 
         # Pre-allocate output
         output = np.zeros((c03_ref.shape[0], c03_ref.shape[1], 3), dtype=np.uint8)
@@ -2966,8 +2998,8 @@ def rgb_worker_differential_water_vapor(channels_data, solar_angles_data):
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
         # Get data as contiguous arrays
-        c08_bt = np.ascontiguousarray(channels_data['C08']['calibrated'].astype(np.float32))
-        c10_bt = np.ascontiguousarray(channels_data['C10']['calibrated'].astype(np.float32))
+        c08_bt = np.ascontiguousarray(channels_data['C08']['calibrated'], dtype=np.float32)
+        c10_bt = np.ascontiguousarray(channels_data['C10']['calibrated'], dtype=np.float32)
 
         # Pre-allocate output
         output = np.zeros((c08_bt.shape[0], c08_bt.shape[1], 3), dtype=np.uint8)
@@ -3000,8 +3032,8 @@ def rgb_worker_split_window_difference(channels_data, solar_angles_data):
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
         # Get data as contiguous arrays
-        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'].astype(np.float32))
-        c15_bt = np.ascontiguousarray(channels_data['C15']['calibrated'].astype(np.float32))
+        c13_bt = np.ascontiguousarray(channels_data['C13']['calibrated'], dtype=np.float32)
+        c15_bt = np.ascontiguousarray(channels_data['C15']['calibrated'], dtype=np.float32)
 
         # Pre-allocate output
         output = np.zeros((c13_bt.shape[0], c13_bt.shape[1], 3), dtype=np.uint8)
@@ -3034,9 +3066,9 @@ def rgb_worker_simple_water_vapor(channels_data, solar_angles_data):
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
         # Get data as contiguous arrays
-        c08_bt = np.ascontiguousarray(channels_data['C08']['calibrated'].astype(np.float32))
-        c09_bt = np.ascontiguousarray(channels_data['C09']['calibrated'].astype(np.float32))
-        c10_bt = np.ascontiguousarray(channels_data['C10']['calibrated'].astype(np.float32))
+        c08_bt = np.ascontiguousarray(channels_data['C08']['calibrated'], dtype=np.float32)
+        c09_bt = np.ascontiguousarray(channels_data['C09']['calibrated'], dtype=np.float32)
+        c10_bt = np.ascontiguousarray(channels_data['C10']['calibrated'], dtype=np.float32)
 
         # Pre-allocate output
         output = np.zeros((c08_bt.shape[0], c08_bt.shape[1], 3), dtype=np.uint8)
@@ -3080,9 +3112,9 @@ def rgb_worker_day_land_cloud_fire(channels_data, solar_angles_data):
             return {'success': False, 'error': f'Missing channels: {missing}'}
 
         # Get data as contiguous arrays (all reflectances)
-        c06_ref = np.ascontiguousarray(channels_data['C06']['calibrated'].astype(np.float32))
-        c03_ref = np.ascontiguousarray(channels_data['C03']['calibrated'].astype(np.float32))
-        c02_ref = np.ascontiguousarray(channels_data['C02']['calibrated'].astype(np.float32))
+        c06_ref = np.ascontiguousarray(channels_data['C06']['calibrated'], dtype=np.float32)
+        c03_ref = np.ascontiguousarray(channels_data['C03']['calibrated'], dtype=np.float32)
+        c02_ref = np.ascontiguousarray(channels_data['C02']['calibrated'], dtype=np.float32)
 
         # Pre-allocate output
         output = np.zeros((c06_ref.shape[0], c06_ref.shape[1], 3), dtype=np.uint8)
@@ -3107,6 +3139,118 @@ def rgb_worker_day_land_cloud_fire(channels_data, solar_angles_data):
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
+# ============================================================================
+# BAND-INTERLEAVED IR CHANNEL CUBE
+# ============================================================================
+# The cube path runs the production airmass / dust kernels unchanged on
+# strided per-band views of CHANNEL_CUBE; Numba compiles a non-contiguous
+# specialisation of the same kernel, so outputs are identical to the planar
+# path and only the memory layout differs.
+
+# Products with a cube path: required bands in kernel argument order
+CUBE_PRODUCTS = {
+    'airmass': ['C08', 'C10', 'C12', 'C13'],
+    'dust': ['C11', 'C13', 'C14', 'C15'],
+}
+
+def get_cube_kernel(product):
+    """Production kernel of a CUBE_PRODUCTS entry (defined in Cell 0.5)"""
+    return {'airmass': numba_airmass_optimized_core, 'dust': numba_dust_optimized_core}[product]
+
+def get_cube_band_views(bands, expected_shape, cube=None):
+    """Per-band (H, W) views of the cube if it holds all bands at expected_shape, else None"""
+    cube = globals().get('CHANNEL_CUBE') if cube is None else cube
+    if cube is None or tuple(cube['shape']) != tuple(expected_shape):
+        return None
+    if not all(ch in cube['index'] for ch in bands):
+        return None
+    return [cube['data'][:, :, cube['index'][ch]] for ch in bands]
+
+def run_cube_kernel(kernel, band_views, output):
+    """
+    Run a planar kernel on cube band views. Returns False (the caller falls
+    back to the planar arrays) if the kernel was compiled for C-contiguous
+    input only and rejects the strided views.
+    """
+    try:
+        kernel(*band_views, output)
+    except TypeError as e:
+        print(f"    ⚠️  Kernel does not accept strided cube views ({e}); using planar arrays")
+        return False
+    return True
+
+def benchmark_channel_cube_layout(channels, repeats=5, synthetic_shape=(1500, 2500)):
+    """
+    Time the production airmass / dust kernels on planar arrays against the
+    same kernels on cube band views, and check the outputs are identical.
+
+    Uses the calibrated channels when all bands are present at one shape,
+    otherwise a synthetic brightness-temperature field of synthetic_shape.
+    Reports the one-off packing cost separately from per-product kernel time.
+    """
+    print(f"\n🧊 CHANNEL CUBE LAYOUT BENCHMARK")
+    print("-" * 60)
+
+    all_bands = sorted({ch for bands in CUBE_PRODUCTS.values() for ch in bands})
+    planar = None
+    if all(ch in channels for ch in all_bands):
+        shapes = {channels[ch]['shape'] for ch in all_bands}
+        if len(shapes) == 1:
+            planar = {ch: np.ascontiguousarray(channels[ch]['calibrated'], dtype=np.float32)
+                      for ch in all_bands}
+        else:
+            print(f"⚠️  IR bands have mixed shapes {shapes} - using synthetic data")
+
+    if planar is None:
+        rng = np.random.default_rng(0)
+        planar = {ch: (rng.standard_normal(synthetic_shape, dtype=np.float32) * 15.0 + 250.0)
+                  for ch in all_bands}
+
+    shape = next(iter(planar.values())).shape
+    print(f"📐 Shape: {shape}, bands: {all_bands}, repeats: {repeats}")
+
+    pack_start = time.perf_counter()
+    data = np.empty(shape + (len(all_bands),), dtype=np.float32)
+    for i, ch in enumerate(all_bands):
+        data[:, :, i] = planar[ch]
+    pack_time = time.perf_counter() - pack_start
+    cube = {'data': data, 'bands': all_bands, 'index': {ch: i for i, ch in enumerate(all_bands)}, 'shape': shape}
+    print(f"📦 Packing cube: {pack_time * 1000:.1f} ms ({data.nbytes / (1024 * 1024):.1f} MB)")
+
+    results = {'shape': shape, 'pack_ms': pack_time * 1000, 'products': {}}
+    for product, bands in CUBE_PRODUCTS.items():
+        kernel = get_cube_kernel(product)
+        planar_args = [planar[ch] for ch in bands]
+        cube_args = get_cube_band_views(bands, shape, cube)
+        planar_out = np.zeros(shape + (3,), dtype=np.uint8)
+        cube_out = np.zeros(shape + (3,), dtype=np.uint8)
+
+        # Warm up (JIT compile both layouts) before timing
+        kernel(*planar_args, planar_out)
+        if not run_cube_kernel(kernel, cube_args, cube_out):
+            results['products'][product] = {'error': 'kernel rejects strided cube views'}
+            continue
+
+        planar_times, cube_times = [], []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            kernel(*planar_args, planar_out)
+            planar_times.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            kernel(*cube_args, cube_out)
+            cube_times.append(time.perf_counter() - t0)
+
+        planar_ms = min(planar_times) * 1000
+        cube_ms = min(cube_times) * 1000
+        identical = np.array_equal(planar_out, cube_out)
+        results['products'][product] = {'planar_ms': planar_ms, 'cube_ms': cube_ms,
+                                        'speedup': planar_ms / cube_ms if cube_ms else 0.0,
+                                        'identical': identical}
+        print(f"   {product:<10} planar {planar_ms:8.1f} ms | cube {cube_ms:8.1f} ms | "
+              f"{planar_ms / cube_ms:5.2f}x | outputs {'match' if identical else 'DIFFER'}")
+
+    return results
+
 # ============================================================================
 # ORIGINAL RGB CREATION FUNCTION (ENHANCED BUT STRUCTURE PRESERVED)
 # ============================================================================
@@ -3327,6 +3471,13 @@ print(f"   ☀️  Solar angles: {'available' if SOLAR_ANGLES else 'using defaul
 print(f"   🚀 Processing: Unified System")
 print(f"   ⚡ Ultra-fast Numba JIT: ✅ Active")
 
+# Domains for the export stages below: GEODATA_DOMAINS_TO_EXPORT when set, else just
+# the domain named by LOAD_WINDOW (a subset load covers nothing else), else all of them
+EXPORT_DOMAINS = globals().get('GEODATA_DOMAINS_TO_EXPORT')
+if EXPORT_DOMAINS is None and isinstance(globals().get('LOAD_WINDOW'), str):
+    EXPORT_DOMAINS = [LOAD_WINDOW]
+print(f"   🗺️  Export domains: {EXPORT_DOMAINS or 'all registered'}")
+
 # Get initial memory
 try:
     initial_memory = psutil.Process().memory_info().rss / 1024 / 1024
@@ -3337,6 +3488,99 @@ except:
 # Generate RGB products using unified system
 RGB_DATA_STORE = generate_all_rgb_products()
 
+# Optional: compare band-interleaved vs planar IR kernels (before channel cleanup)
+if globals().get('BENCHMARK_CHANNEL_CUBE', False):
+    CHANNEL_CUBE_BENCHMARK = benchmark_channel_cube_layout(CHANNELS)
+
+# Optional geodata for the app, built from this scan for every registered domain
+# (before channel cleanup so channel values are still in memory)
+if globals().get('ENABLE_GEODATA_EXPORT', False):
+    from convert_geodata import generate_pipeline_geodata
+    GEODATA_EXPORT = generate_pipeline_geodata(
+        CHANNELS, RGB_DATA_STORE.get_all_products(), COORDINATE_DATA, METADATA,
+        scene=DOMAIN_CHOICE,
+        output_dir=globals().get('GEODATA_OUTPUT_DIR', 'geodata'),
+        domains=EXPORT_DOMAINS,
+        output_format=globals().get('GEODATA_FORMAT', 'json'),
+        lookup=globals().get('GEODATA_LOOKUP', False),
+        adaptive_tolerance=globals().get('GEODATA_ADAPTIVE_TOLERANCE'),
+        precompress=globals().get('GEODATA_PRECOMPRESS', False),
+        # Loop length of each product's multi-frame values bundle (None: no bundle)
+        bundle_frames=globals().get('GEODATA_BUNDLE_FRAMES'),
+        # Grids line up with the padded images of the image encode stage
+        layout=globals().get('IMAGE_LAYOUT') if globals().get('ENABLE_IMAGE_EXPORT', False) else None,
+        max_workers=globals().get('MAX_PARALLEL_WORKERS', 4),
+    )
+
+# Optional chunked HDF5 archive of this scan (calibrated channels, RGB products,
+# lat/lon) for window reads by the converter or a tile server
+if globals().get('ENABLE_PRODUCT_ARCHIVE', False):
+    from archive import write_product_archive
+    PRODUCT_ARCHIVE = write_product_archive(
+        globals().get('PRODUCT_ARCHIVE_PATH', f"products_{DOMAIN_CHOICE}.h5"),
+        CHANNELS, RGB_DATA_STORE.get_all_products(), COORDINATE_DATA, METADATA,
+        compression=globals().get('PRODUCT_ARCHIVE_COMPRESSION', 'gzip'),
+    )
+    if not PRODUCT_ARCHIVE['success']:
+        print(f"⚠️ Product archive failed: {PRODUCT_ARCHIVE['error']}")
+
+# Optional append of this scan to the per-scene time-series archive
+if globals().get('ENABLE_TIMESERIES_ARCHIVE', False):
+    from archive import append_timeseries_frame
+    TIMESERIES_ARCHIVE = append_timeseries_frame(
+        globals().get('TIMESERIES_ARCHIVE_PATH', f"timeseries_{DOMAIN_CHOICE}.h5"),
+        CHANNELS, RGB_DATA_STORE.get_all_products(), METADATA,
+        products=globals().get('TIMESERIES_PRODUCTS'),
+        authority=get_projection_authority(),
+    )
+    if not TIMESERIES_ARCHIVE['success']:
+        print(f"⚠️ Time-series archive failed: {TIMESERIES_ARCHIVE['error']}")
+    elif globals().get('ENABLE_ANIMATION_LOOPS', False):
+        from archive import generate_animation_loops
+        ANIMATION_LOOPS = generate_animation_loops(
+            TIMESERIES_ARCHIVE['path'], COORDINATE_DATA,
+            scene=DOMAIN_CHOICE,
+            output_dir=globals().get('LOOP_OUTPUT_DIR', 'loops'),
+            domains=EXPORT_DOMAINS,
+            frames=globals().get('LOOP_FRAMES', 12),
+        )
+
+# Optional Cloud-Optimized GeoTIFFs (calibrated channels + RGB products)
+if globals().get('ENABLE_COG_EXPORT', False):
+    from tiles import generate_cogs
+    COG_EXPORT = generate_cogs(
+        CHANNELS, RGB_DATA_STORE.get_all_products(), get_projection_authority(), METADATA,
+        scene=DOMAIN_CHOICE,
+        output_dir=globals().get('COG_OUTPUT_DIR', 'cog'),
+        compression=globals().get('COG_COMPRESSION', 'DEFLATE'),
+        rgb_compression=globals().get('COG_RGB_COMPRESSION'),
+        max_workers=globals().get('MAX_PARALLEL_WORKERS', 4),
+    )
+
+# Optional palette-indexed IR delivery: uint8 enhancement index as 8-bit palette
+# PNG / raw tile plus the channel's colour table as a sidecar
+if globals().get('ENABLE_INDEXED_IR_EXPORT', False):
+    from imagery import generate_indexed_products
+    indexed_processor = ULTRA_FAST_IR or UltraFastIRProcessor()
+    IR_PALETTES = {
+        code: {'palette': indexed_processor._create_color_lut(code),
+               **indexed_processor._create_temperature_enhancement_lut(code)}
+        for code, ch_data in CHANNELS.items() if ch_data.get('channel_type') == 'ir'
+    }
+    INDEXED_EXPORT = generate_indexed_products(
+        CHANNELS, COORDINATE_DATA, METADATA, IR_PALETTES,
+        scene=DOMAIN_CHOICE,
+        output_dir=globals().get('INDEXED_OUTPUT_DIR', 'indexed'),
+        domains=EXPORT_DOMAINS,
+        formats=globals().get('INDEXED_FORMATS', ('png',)),
+        precompress=globals().get('INDEXED_PRECOMPRESS', False),
+        max_workers=globals().get('MAX_PARALLEL_WORKERS', 4),
+    )
+
+# The cube is only read by the RGB workers
+PROCESSED_CHANNELS.channel_cube = None
+CHANNEL_CUBE = None
+
 try:
     memory_freed = cleanup_channel_data_after_rgb()
     print(f"🧠 Memory cleanup: {memory_freed:.1f}MB calibrated channel data freed")
@@ -3354,6 +3598,64 @@ except:
 # Create access variables for next cells (same interface)
 RGB_PRODUCTS = RGB_DATA_STORE.get_all_products()
 
+# Optional image encode stage: JPEG/WebP/PNG per registered domain in the app's
+# naming; each image's .json geodata comes from the geodata export above
+if globals().get('ENABLE_IMAGE_EXPORT', False):
+    from imagery import encode_pipeline_images
+    IMAGE_EXPORT = encode_pipeline_images(
+        RGB_PRODUCTS, COORDINATE_DATA, METADATA,
+        scene=DOMAIN_CHOICE,
+        output_dir=globals().get('IMAGE_OUTPUT_DIR', 'images'),
+        domains=EXPORT_DOMAINS,
+        formats=globals().get('IMAGE_FORMATS', ('jpg',)),
+        quality=globals().get('IMAGE_QUALITY', 85),
+        target_kb=globals().get('IMAGE_TARGET_KB'),
+        layout=globals().get('IMAGE_LAYOUT'),
+        reduced=globals().get('IMAGE_REDUCED_FACTOR'),
+        # Each image's .json sidecar is the geodata export's frame file (ENABLE_GEODATA_EXPORT)
+        geodata_dir=globals().get('GEODATA_OUTPUT_DIR', 'geodata'),
+        max_workers=globals().get('MAX_PARALLEL_WORKERS', 4),
+    )
+
+# Optional per-domain datasets: Oklahoma, Texas and the regionals cut from this
+# one scan through the domain registry, padded to each domain's app size
+if globals().get('ENABLE_DOMAIN_DATASETS', False):
+    from imagery import generate_domain_datasets
+    DOMAIN_DATASETS = generate_domain_datasets(
+        RGB_PRODUCTS, COORDINATE_DATA, METADATA,
+        scene=DOMAIN_CHOICE,
+        output_dir=globals().get('DOMAIN_DATASET_DIR', 'domains'),
+        domains=EXPORT_DOMAINS,
+        layout=globals().get('DOMAIN_DATASET_LAYOUT', 'app'),
+        reduced=globals().get('DOMAIN_DATASET_REDUCED', 4),
+        max_workers=globals().get('MAX_PARALLEL_WORKERS', 4),
+    )
+
+# Optional XYZ tile pyramids (native GEOS pixels) for pinch-zoom
+if globals().get('ENABLE_TILE_PYRAMID', False):
+    from tiles import generate_tile_pyramids
+    TILE_PYRAMIDS = generate_tile_pyramids(
+        RGB_PRODUCTS, COORDINATE_DATA, METADATA,
+        scene=DOMAIN_CHOICE,
+        output_dir=globals().get('TILE_OUTPUT_DIR', 'tiles'),
+        domains=EXPORT_DOMAINS,
+        fmt=globals().get('TILE_FORMAT', 'jpg'),
+        max_workers=globals().get('MAX_PARALLEL_WORKERS', 4),
+    )
+
+# Optional Web Mercator tiles (cached GEOS index maps per domain and zoom)
+if globals().get('ENABLE_MERCATOR_TILES', False):
+    from tiles import generate_mercator_tiles
+    MERCATOR_TILES = generate_mercator_tiles(
+        RGB_PRODUCTS, get_projection_authority(), METADATA,
+        scene=DOMAIN_CHOICE,
+        output_dir=globals().get('MERCATOR_OUTPUT_DIR', 'mercator'),
+        domains=EXPORT_DOMAINS,
+        zooms=globals().get('MERCATOR_ZOOMS', (4, 5, 6, 7)),
+        cache_dir=globals().get('MERCATOR_CACHE_DIR', 'mercator_cache'),
+        max_workers=globals().get('MAX_PARALLEL_WORKERS', 4),
+    )
+
 print(f"\n🔗 VARIABLES CREATED FOR NEXT CELLS:")
 print(f"   RGB_DATA_STORE: Unified RGB data store object")
 print(f"   RGB_PRODUCTS: Direct access to RGB arrays")
@@ -1,17 +1,77 @@
 #!/usr/bin/env python3
 """
-Convert NPZ and H5 geospatial data files to JSON format for React Native app testing.
+Convert NPZ and H5 geospatial data files to JSON format for React Native app testing,
+and build the same geodata from a processed scan (generate_pipeline_geodata).
 
 Usage:
-    python convert_geodata.py
+    python convert_geodata.py                      # JSON + binary (.bin) outputs
+    python convert_geodata.py --format binary --encoding int16
+    python convert_geodata.py --benchmark          # size / parse-time comparison
+    python convert_geodata.py --split              # shared geometry + per-frame values
+    python convert_geodata.py --adaptive-tolerance 0.01   # lat/lon as adaptive control points
+    python convert_geodata.py --precompress        # .gz/.br/.zst variants + manifest
 
-Creates JSON files that can be loaded by the app's geoDataService.
+Creates JSON files that can be loaded by the app's geoDataService, and compact
+binary files (see encode_binary_geodata) that geoDataService can decode with
+decodeBinaryGeoData(). The other pipeline export stages build on the domain
+registry and projection helpers here: imagery (images, domain datasets,
+palette-indexed IR), tiles (XYZ / Web Mercator tiles, COGs) and archive
+(HDF5 product / time-series archives, animation loops, region statistics).
 """
 
+import argparse
+import gzip
+import hashlib
+import io
 import json
+import os
+import re
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import h5py
 
+from goes_projection import GOESProjectionAuthority
+from precompress import precompress_outputs
+
+
+# Binary geodata layout (all little-endian):
+#   0   4s  magic b'SWGD'
+#   4   H   format version
+#   6   H   reserved (0)
+#   8   I   header length in bytes
+#   12  ... ASCII JSON header: every non-grid field of the JSON format plus a
+#           "blocks" table {name: {dtype, shape, offset, scale, add_offset, fill}}
+#   ... grid blocks, each starting on an 8-byte boundary so the app can wrap
+#       them in Float32Array / Int16Array views without copying
+BINARY_MAGIC = b'SWGD'
+BINARY_VERSION = 1
+BINARY_PREFIX = struct.Struct('<4sHHI')
+BINARY_ALIGNMENT = 8
+INT16_FILL = -32768
+
+# Fixed int16 encodings for physical values (value = code * scale + add_offset).
+# Fixed rather than per-frame so every frame of a loop decodes the same way;
+# 0.01 steps cover -127..527 K and 0..327 % reflectance
+PHYSICAL_ENCODINGS = {
+    'K': {'scale': 0.01, 'add_offset': 200.0},
+    '%': {'scale': 0.01, 'add_offset': 0.0},
+}
+
+# Arrays carried as typed blocks instead of nested JSON lists
+GRID_FIELDS = ('lat_grid', 'lon_grid', 'data_values')
+
+# Fields that only change with the domain; split outputs keep these in one
+# geometry file per domain and reference it from every per-frame values file
+GEOMETRY_FIELDS = ('bounds', 'projection', 'resolution', 'core_dimensions', 'padding', 'grid_dimensions',
+                   'grid_index', 'lookup')
+GEOMETRY_GRIDS = ('lat_grid', 'lon_grid')
+
+# Optional inverse lookup raster (regular lat/lon -> fractional grid row/col),
+# derived from the geometry so it travels with the geometry file
+LOOKUP_GRIDS = ('lookup_row', 'lookup_col')
+
 
 def convert_to_json_friendly(obj):
     """Convert numpy types to JSON-serializable Python types."""
@@ -35,59 +95,533 @@ def sample_grid(arr, sample_rate=4):
     return arr
 
 
-def create_conus_json():
-    """Create CONUS geospatial data JSON from NPZ and H5 files."""
-    print("Processing CONUS data...")
+def _select_control_indices(grids, axis, tolerance):
+    """
+    Indices along axis that linear interpolation needs to stay within tolerance.
 
-    # Load NPZ file (lat/lon grids and metadata)
-    npz_data = np.load('conus_1840x865_reduced4.npz', allow_pickle=True)
+    Recursive split at the worst point (Douglas-Peucker on every line of every
+    grid at once); the endpoints are always kept.
+    """
+    lines = np.concatenate([np.moveaxis(g, axis, -1).reshape(-1, g.shape[axis]) for g in grids])
+    n = lines.shape[1]
+    keep = {0, n - 1}
+    stack = [(0, n - 1)]
+    while stack:
+        start, stop = stack.pop()
+        if stop - start < 2:
+            continue
+        t = (np.arange(start + 1, stop) - start) / (stop - start)
+        interp = lines[:, start:start + 1] * (1 - t) + lines[:, stop:stop + 1] * t
+        error = np.abs(lines[:, start + 1:stop] - interp).max(axis=0)
+        worst = int(np.argmax(error))
+        if error[worst] > tolerance:
+            split = start + 1 + worst
+            keep.add(split)
+            stack += [(start, split), (split, stop)]
+    return np.array(sorted(keep))
 
-    # Load H5 file (contains lat/lon and RGB values)
-    with h5py.File('channel_c13_data_conus.h5', 'r') as h5:
-        lat_grid = h5['latitude'][:]
-        lon_grid = h5['longitude'][:]
-        rgb_values = h5['rgb_values'][:]
 
-    # Extract metadata
-    core_width = int(npz_data['core_width'])
-    core_height = int(npz_data['core_height'])
-    padding = convert_to_json_friendly(npz_data['padding'].item())
-    resolution_factor = int(npz_data['resolution_factor'])
+def expand_control_grid(control, row_index, col_index, shape):
+    """Rebuild a full grid from control points by separable linear interpolation."""
+    rows, cols = shape
+    control = np.asarray(control, dtype=np.float64)
+    by_cols = np.stack([np.interp(np.arange(cols), col_index, line) for line in control])
+    return np.stack([np.interp(np.arange(rows), row_index, line) for line in by_cols.T], axis=1)
 
-    # Calculate actual image dimensions
-    total_width = core_width + padding['left'] + padding['right']
-    total_height = core_height + padding['top'] + padding['bottom']
 
-    # Get bounds from lat/lon grids
-    min_lat = float(lat_grid.min())
-    max_lat = float(lat_grid.max())
-    min_lon = float(lon_grid.min())
-    max_lon = float(lon_grid.max())
+def adaptive_decimate(lat_grid, lon_grid, tolerance=0.01):
+    """
+    Keep only the grid rows/cols needed to rebuild lat/lon within tolerance (degrees).
 
-    # Sample the data to reduce JSON size (keep every 2nd point from already reduced grid)
-    sample_rate = 2
-    sampled_lat = sample_grid(lat_grid, sample_rate).tolist()
-    sampled_lon = sample_grid(lon_grid, sample_rate).tolist()
+    Returns (row_index, col_index, lat_control, lon_control, max_error), where
+    max_error is the achieved worst-case error of expand_control_grid. Each
+    axis gets half the budget; if the combined error still exceeds tolerance
+    the budget is tightened and the selection repeated.
+    """
+    grids = (np.asarray(lat_grid, dtype=np.float64), np.asarray(lon_grid, dtype=np.float64))
+    budget = tolerance / 2.0
+    while True:
+        row_index = _select_control_indices(grids, 0, budget)
+        col_index = _select_control_indices(grids, 1, budget)
+        controls = [g[np.ix_(row_index, col_index)] for g in grids]
+        max_error = max(float(np.abs(expand_control_grid(c, row_index, col_index, g.shape) - g).max())
+                        for c, g in zip(controls, grids))
+        if max_error <= tolerance or budget < tolerance / 64:
+            break
+        budget /= 2.0
+    return (row_index, col_index, controls[0].astype(np.float32), controls[1].astype(np.float32),
+            max_error)
 
-    # Convert RGB to grayscale for brightness temp approximation
-    # Or just store RGB for visible channel data
-    sampled_rgb = sample_grid(rgb_values, sample_rate)
 
-    # Create grayscale (brightness) values from RGB
-    # Simple average - actual brightness temp would need calibration
-    brightness = np.mean(sampled_rgb, axis=2).astype(float).tolist()
+def add_adaptive_geometry(geo_data, grids, tolerance=0.01):
+    """
+    Replace lat/lon grids with adaptive control points (see adaptive_decimate).
+
+    geo_data['grid_index'] records the kept row/col indices so readers can
+    expand back to grid_dimensions. Grids containing NaN (off-disk) are left
+    as they are. Returns the achieved max error, or None if skipped.
+    """
+    lat_grid, lon_grid = grids['lat_grid'], grids['lon_grid']
+    if not (np.isfinite(lat_grid).all() and np.isfinite(lon_grid).all()):
+        return None
+
+    row_index, col_index, lat_control, lon_control, max_error = adaptive_decimate(
+        lat_grid, lon_grid, tolerance)
+    geo_data['grid_index'] = {
+        'rows': row_index.tolist(),
+        'cols': col_index.tolist(),
+        'tolerance': tolerance,
+        'max_error': max_error,
+    }
+    grids['lat_grid'] = lat_control
+    grids['lon_grid'] = lon_control
+    return max_error
+
+
+def quantize_int16(arr):
+    """
+    Quantize a float array to int16 with scale/offset.
+
+    Returns (values, scale, add_offset); decode with values * scale + add_offset.
+    NaNs become INT16_FILL.
+    """
+    arr = np.asarray(arr, dtype=np.float32)
+    finite = np.isfinite(arr)
+    if not finite.any():
+        return np.full(arr.shape, INT16_FILL, dtype=np.int16), 1.0, 0.0
+
+    lo = float(arr[finite].min())
+    hi = float(arr[finite].max())
+    add_offset = (hi + lo) / 2.0
+    # 65532 steps keeps every rounded value inside [-32766, 32766], clear of the fill
+    scale = (hi - lo) / 65532.0 if hi > lo else 1.0
+
+    quantized = np.full(arr.shape, INT16_FILL, dtype=np.int16)
+    quantized[finite] = np.round((arr[finite] - add_offset) / scale).astype(np.int16)
+    return quantized, scale, add_offset
+
+
+def quantize_physical(values, data_unit):
+    """
+    Quantize Kelvin / percent values with the fixed PHYSICAL_ENCODINGS entry.
+
+    Returns (int16 codes, data_encoding dict); NaNs become INT16_FILL.
+    """
+    encoding = PHYSICAL_ENCODINGS[data_unit]
+    values = np.asarray(values, dtype=np.float32)
+    finite = np.isfinite(values)
+
+    codes = np.full(values.shape, INT16_FILL, dtype=np.int16)
+    scaled = np.round((values[finite] - encoding['add_offset']) / encoding['scale'])
+    codes[finite] = np.clip(scaled, -32767, 32767).astype(np.int16)
+
+    data_encoding = {'dtype': 'int16', 'scale': encoding['scale'],
+                     'add_offset': encoding['add_offset'], 'fill': INT16_FILL}
+    return codes, data_encoding
+
+
+def _binary_layout(geo_data, grids, encoding='float32'):
+    """
+    Encode geodata as a JSON header plus little-endian typed-array blocks.
+
+    geo_data holds the scalar fields (bounds, resolution, padding, ...);
+    grids maps GRID_FIELDS names to 2D numpy arrays. encoding is 'float32'
+    or 'int16' (quantized with per-block scale/add_offset). data_values that
+    are already quantized (geo_data['data_encoding']) are stored as-is and
+    their encoding moves into the block table.
+    """
+    if encoding not in ('float32', 'int16'):
+        raise ValueError(f"Unknown binary encoding: {encoding}")
+
+    data_encoding = geo_data.get('data_encoding')
+    payloads = []
+    blocks = {}
+    for name, arr in grids.items():
+        if name == 'data_values' and data_encoding:
+            values = np.asarray(arr, dtype=np.int16)
+            block = {key: value for key, value in data_encoding.items() if key != 'dtype'}
+            block['dtype'] = 'int16'
+        elif encoding == 'int16':
+            values, scale, add_offset = quantize_int16(arr)
+            block = {'dtype': 'int16', 'scale': scale, 'add_offset': add_offset, 'fill': INT16_FILL}
+        else:
+            values = np.asarray(arr, dtype=np.float32)
+            block = {'dtype': 'float32'}
+        values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder('<'))
+        block['shape'] = list(values.shape)
+        blocks[name] = block
+        payloads.append((name, values))
+
+    header = {key: value for key, value in geo_data.items() if key != 'data_encoding'}
+    header['blocks'] = blocks
+
+    # Offsets depend on the header length, which depends on the offsets;
+    # iterate until the header size is stable (converges in one or two passes)
+    header_bytes = b''
+    while True:
+        offset = BINARY_PREFIX.size + len(header_bytes)
+        for name, values in payloads:
+            offset += -offset % BINARY_ALIGNMENT
+            blocks[name]['offset'] = offset
+            offset += values.nbytes
+        encoded = json.dumps(header, separators=(',', ':')).encode('ascii')
+        if len(encoded) == len(header_bytes):
+            header_bytes = encoded
+            break
+        header_bytes = encoded
+
+    prefix = BINARY_PREFIX.pack(BINARY_MAGIC, BINARY_VERSION, 0, len(header_bytes)) + header_bytes
+    return prefix, [(blocks[name]['offset'], values) for name, values in payloads]
+
+
+def write_binary_geodata(f, geo_data, grids, encoding='float32'):
+    """Stream the binary format (see _binary_layout) to an open file, block by block."""
+    prefix, payloads = _binary_layout(geo_data, grids, encoding)
+    f.write(prefix)
+    position = len(prefix)
+    for offset, values in payloads:
+        f.write(b'\0' * (offset - position))
+        f.write(memoryview(values).cast('B'))
+        position = offset + values.nbytes
+
+
+def encode_binary_geodata(geo_data, grids, encoding='float32'):
+    """The binary format (see _binary_layout) as one bytes object."""
+    out = io.BytesIO()
+    write_binary_geodata(out, geo_data, grids, encoding)
+    return out.getvalue()
+
+
+def decode_binary_geodata(data):
+    """Decode bytes from encode_binary_geodata into (header, {name: float32 array})."""
+    magic, version, _, header_len = BINARY_PREFIX.unpack_from(data, 0)
+    if magic != BINARY_MAGIC:
+        raise ValueError("Not a binary geodata file")
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported binary geodata version: {version}")
+
+    header = json.loads(data[BINARY_PREFIX.size:BINARY_PREFIX.size + header_len])
+    grids = {}
+    for name, block in header['blocks'].items():
+        count = int(np.prod(block['shape']))
+        values = np.frombuffer(data, dtype='<' + ('i2' if block['dtype'] == 'int16' else 'f4'),
+                               count=count, offset=block['offset']).reshape(block['shape'])
+        if block['dtype'] == 'int16':
+            decoded = values.astype(np.float32) * np.float32(block['scale']) + np.float32(block['add_offset'])
+            decoded[values == block['fill']] = np.nan
+            values = decoded
+        grids[name] = values
+    return header, grids
+
+
+def grid_to_list(arr):
+    """Nested lists for JSON; NaN becomes null (NaN is not valid JSON)."""
+    if np.issubdtype(arr.dtype, np.floating):
+        missing = np.isnan(arr)
+        if missing.any():
+            arr = arr.astype(object)
+            arr[missing] = None
+    return arr.tolist()
+
+
+def _json_geodata_items(geo_data, grids):
+    """(key, value, is_grid) in output order: grids go right after grid_dimensions."""
+    for key, value in geo_data.items():
+        yield key, value, False
+        if key == 'grid_dimensions':
+            for name, arr in grids.items():
+                yield name, arr, True
+    if 'grid_dimensions' not in geo_data:
+        for name, arr in grids.items():
+            yield name, arr, True
+
+
+def to_json_geodata(geo_data, grids):
+    """Merge grids back into geo_data as nested lists, right after grid_dimensions."""
+    return {key: grid_to_list(value) if is_grid else value
+            for key, value, is_grid in _json_geodata_items(geo_data, grids)}
+
+
+def _write_json_grid(f, arr, level, indent):
+    """
+    Write one array in json.dump(indent=...) layout, a single row at a time.
+
+    Rows go through the C encoder (separators carry the newline + indent), so
+    only one row is ever boxed into Python floats.
+    """
+    if arr.shape[0] == 0:
+        f.write('[]')
+        return
+    pad = '\n' + ' ' * (indent * (level + 1))
+    close = '\n' + ' ' * (indent * level)
+    if arr.ndim == 1:
+        f.write('[' + pad)
+        f.write(json.dumps(grid_to_list(arr), separators=(',' + pad, ': '))[1:-1])
+        f.write(close + ']')
+        return
+    f.write('[')
+    for i, sub in enumerate(arr):
+        f.write((',' if i else '') + pad)
+        _write_json_grid(f, sub, level + 1, indent)
+    f.write(close + ']')
+
+
+def write_json_geodata(f, geo_data, grids, indent=2):
+    """
+    Stream geodata JSON to an open text file straight from the NumPy grids.
+
+    Output is byte-identical to json.dump(to_json_geodata(...), f, indent=indent)
+    without materializing the grids as nested Python lists.
+    """
+    pad = '\n' + ' ' * indent
+    count = 0
+    f.write('{')
+    for key, value, is_grid in _json_geodata_items(geo_data, grids):
+        f.write((',' if count else '') + pad + json.dumps(key) + ': ')
+        if is_grid:
+            _write_json_grid(f, np.asarray(value), 1, indent)
+        else:
+            f.write(json.dumps(value, indent=indent).replace('\n', pad))
+        count += 1
+    f.write('\n}' if count else '}')
+
+
+def write_geodata_outputs(geo_data, grids, json_path, output_format='both', encoding='float32'):
+    """
+    Write geodata as pretty JSON, compact binary, or both.
+
+    The binary file sits next to the JSON with a .bin extension.
+    Returns the list of files written.
+    """
+    written = []
+    if output_format in ('json', 'both'):
+        with open(json_path, 'w') as f:
+            write_json_geodata(f, geo_data, grids)
+        written.append(json_path)
+
+    if output_format in ('binary', 'both'):
+        bin_path = os.path.splitext(json_path)[0] + '.bin'
+        with open(bin_path, 'wb') as f:
+            write_binary_geodata(f, geo_data, grids, encoding)
+        written.append(bin_path)
+
+    return written
+
+
+def geometry_id(geo_data, grids):
+    """Content hash of the static geometry (GEOMETRY_FIELDS + lat/lon grids)."""
+    digest = hashlib.sha256()
+    static = {key: geo_data[key] for key in GEOMETRY_FIELDS if key in geo_data}
+    digest.update(json.dumps(static, sort_keys=True).encode('ascii'))
+    for name in GEOMETRY_GRIDS:
+        arr = np.ascontiguousarray(grids[name], dtype='<f4')
+        digest.update(name.encode('ascii'))
+        digest.update(str(arr.shape).encode('ascii'))
+        digest.update(arr.tobytes())
+    return digest.hexdigest()[:16]
+
 
+def split_geodata(geo_data, grids):
+    """
+    Split geodata into (geometry, geometry_grids, values, value_grids).
+
+    The values part carries a 'geometry' reference {id, file_stem} instead
+    of the lat/lon grids and domain fields.
+    """
+    geom_id = geometry_id(geo_data, grids)
+    geometry = {key: geo_data[key] for key in GEOMETRY_FIELDS if key in geo_data}
+    geometry['geometry_id'] = geom_id
+    geometry_grids = {name: arr for name, arr in grids.items() if name in GEOMETRY_GRIDS + LOOKUP_GRIDS}
+
+    values = {'geometry': {'id': geom_id}}
+    values.update({key: value for key, value in geo_data.items() if key not in GEOMETRY_FIELDS})
+    value_grids = {name: arr for name, arr in grids.items() if name not in geometry_grids}
+    return geometry, geometry_grids, values, value_grids
+
+
+def write_geometry_file(geometry, geometry_grids, geometry_dir, domain_name, output_format='both',
+                        encoding='float32'):
+    """
+    Write {domain_name}.geometry.{id} into geometry_dir unless every output_format
+    file exists; returns (path without extension, files written).
+    """
+    geometry_stem = os.path.join(geometry_dir, f"{domain_name}.geometry.{geometry['geometry_id']}")
+    extensions = {'json': ['.json'], 'binary': ['.bin'], 'both': ['.json', '.bin']}[output_format]
+    if all(os.path.exists(geometry_stem + ext) for ext in extensions):
+        return geometry_stem, []
+    return geometry_stem, write_geodata_outputs(geometry, geometry_grids, geometry_stem + '.json',
+                                                output_format, encoding)
+
+
+def geometry_file_stem(geometry_stem, output_dir):
+    """The 'file_stem' reference to a geometry file: its path relative to output_dir, '/'-separated."""
+    return os.path.relpath(geometry_stem, output_dir).replace(os.sep, '/')
+
+
+def write_split_geodata(geo_data, grids, output_dir, prefix, output_format='both', encoding='float32',
+                        geometry_dir=None, domain_name=None):
+    """
+    Write one content-addressed geometry file plus a small per-frame values file.
+
+    Files are {domain_name}.geometry.{id}.{json,bin} in geometry_dir and
+    {prefix}.{timestamp}.{json,bin} in output_dir ('values' when there is no
+    timestamp); geometry_dir / domain_name default to output_dir / prefix. The
+    geometry file is keyed by domain and content hash only and is written once,
+    so every product and frame of a domain on one grid shares it. Returns the
+    list of files written.
+    """
+    geometry, geometry_grids, values, value_grids = split_geodata(geo_data, grids)
+    geometry_stem, written = write_geometry_file(geometry, geometry_grids, geometry_dir or output_dir,
+                                                 domain_name or prefix, output_format, encoding)
+    values['geometry']['file_stem'] = geometry_file_stem(geometry_stem, output_dir)
+
+    frame_name = (geo_data.get('timestamp') or 'values').replace(':', '')
+    values_path = os.path.join(output_dir, f"{prefix}.{frame_name}.json")
+    written += write_geodata_outputs(values, value_grids, values_path, output_format, encoding)
+    return written
+
+
+def write_values_bundle(frames, output_dir, prefix, output_format='both', encoding='float32'):
+    """
+    Write the values for a whole animation loop as {prefix}.bundle.{json,bin}.
+
+    frames is a list of (values, value_grids) pairs from split_geodata (or
+    read_values_file) that reference one geometry. The bundle holds a
+    (frames, rows, cols) data_values block and a parallel 'timestamps' list;
+    per-frame scalar fields come from the first frame. Returns the list of
+    files written.
+    """
+    if not frames:
+        return []
+    values = dict(frames[0][0])
+    if any(frame['geometry']['id'] != values['geometry']['id'] for frame, _ in frames[1:]):
+        raise ValueError("All frames in a bundle must share the same geometry")
+
+    values['timestamp'] = None
+    values['timestamps'] = [frame.get('timestamp') for frame, _ in frames]
+    bundle_grids = {'data_values': np.stack([grids['data_values'] for _, grids in frames])}
+
+    bundle_path = os.path.join(output_dir, f"{prefix}.bundle.json")
+    return write_geodata_outputs(values, bundle_grids, bundle_path, output_format, encoding)
+
+
+def write_geodata_bundle(frames, output_dir, prefix, output_format='both', encoding='float32',
+                         geometry_dir=None, domain_name=None):
+    """
+    Bundle in-memory (geo_data, grids) frames sharing one geometry: the geometry
+    file as in write_split_geodata plus write_values_bundle. Returns the files written.
+    """
+    if not frames:
+        return []
+
+    split = [split_geodata(geo_data, grids) for geo_data, grids in frames]
+    geometry, geometry_grids = split[0][:2]
+    geometry_stem, written = write_geometry_file(geometry, geometry_grids, geometry_dir or output_dir,
+                                                 domain_name or prefix, output_format, encoding)
+    for _, _, values, _ in split:
+        values['geometry']['file_stem'] = geometry_file_stem(geometry_stem, output_dir)
+    written += write_values_bundle([(values, value_grids) for _, _, values, value_grids in split],
+                                   output_dir, prefix, output_format, encoding)
+    return written
+
+
+def read_values_file(path):
+    """
+    (values, value_grids) of a split values file (.json or .bin).
+
+    data_values come back as they were written by the pipeline: int16 codes
+    plus data_encoding for PHYSICAL_ENCODINGS units, float32 otherwise.
+    """
+    if path.endswith('.bin'):
+        with open(path, 'rb') as f:
+            values, grids = decode_binary_geodata(f.read())
+        values.pop('blocks')
+        data_values = grids['data_values']
+    else:
+        with open(path) as f:
+            values = json.load(f)
+        if values.get('data_encoding'):
+            return values, {'data_values': np.array(values.pop('data_values'), dtype=np.int16)}
+        data_values = np.array(values.pop('data_values'), dtype=np.float32)
+
+    values.pop('data_encoding', None)
+    if values.get('data_unit') in PHYSICAL_ENCODINGS:
+        data_values, values['data_encoding'] = quantize_physical(data_values, values['data_unit'])
+    return values, {'data_values': data_values}
+
+
+# Values files named {prefix}.{YYYYMMDD.HHMMSS}.{json,bin} (format_cod_timestamp)
+FRAME_TIMESTAMP = re.compile(r'\d{8}\.\d{6}')
+
+
+def bundle_recent_frames(output_dir, prefix, frame_count, output_format='both', encoding='float32'):
+    """
+    Rebuild {prefix}.bundle from the newest frame_count values files in output_dir.
+
+    Frames whose geometry differs from the newest frame's (the domain's grid
+    changed) are left out. Returns the list of files written.
+    """
+    paths = {}
+    for name in os.listdir(output_dir):
+        stem, ext = os.path.splitext(name)
+        timestamp = stem[len(prefix) + 1:]
+        if (ext in ('.json', '.bin') and stem.startswith(prefix + '.')
+                and FRAME_TIMESTAMP.fullmatch(timestamp)):
+            # Prefer the JSON: it holds the values exactly as written
+            if ext == '.json' or timestamp not in paths:
+                paths[timestamp] = os.path.join(output_dir, name)
+
+    frames = [read_values_file(paths[timestamp]) for timestamp in sorted(paths)[-frame_count:]]
+    frames = [frame for frame in frames if frame[0]['geometry']['id'] == frames[-1][0]['geometry']['id']]
+    return write_values_bundle(frames, output_dir, prefix, output_format, encoding)
+
+
+# Sample inputs shipped with the repo (reduced-resolution C13 imagery)
+SAMPLE_SOURCES = {
+    'conus': {
+        'npz': 'conus_1840x865_reduced4.npz',
+        'h5': 'channel_c13_data_conus.h5',
+        'output': 'SatWeatherApp/src/data/samples/conus_geodata.json',
+    },
+    'oklahoma': {
+        'npz': 'oklahoma_1840x1200_reduced4.npz',
+        'h5': 'channel_c13_data_oklahoma.h5',
+        'output': 'SatWeatherApp/src/data/samples/oklahoma_geodata.json',
+    },
+}
+
+
+def dataset_range(dataset, block_rows=256):
+    """(min, max) of a 2D h5py dataset, reading block_rows rows at a time."""
+    lo, hi = np.inf, -np.inf
+    for start in range(0, dataset.shape[0], block_rows):
+        block = dataset[start:start + block_rows]
+        lo, hi = min(lo, block.min()), max(hi, block.max())
+    return lo, hi
+
+
+def build_geodata(lat_grid, lon_grid, values, bounds, core_width, core_height, padding,
+                  sample_rate, data_unit, data_name, timestamp=None, channel='C13', source='GOES-16',
+                  data_encoding=None):
+    """
+    Assemble (geo_data, grids) for one domain from already-sampled grids.
+
+    bounds is (min_lat, max_lat, min_lon, max_lon); sample_rate is the total
+    stride from full-resolution pixels to grid points. data_encoding describes
+    int16 values from quantize_physical.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounds
     geo_data = {
         "bounds": {
-            "min_lat": min_lat,
-            "max_lat": max_lat,
-            "min_lon": min_lon,
-            "max_lon": max_lon
+            "min_lat": float(min_lat),
+            "max_lat": float(max_lat),
+            "min_lon": float(min_lon),
+            "max_lon": float(max_lon)
         },
         "projection": "geostationary",  # NOT plate_carree - this is key!
         "resolution": {
-            "width": total_width,
-            "height": total_height
+            "width": core_width + padding['left'] + padding['right'],
+            "height": core_height + padding['top'] + padding['bottom']
         },
         "core_dimensions": {
             "width": core_width,
@@ -95,48 +629,53 @@ def create_conus_json():
         },
         "padding": padding,
         "grid_dimensions": {
-            "rows": len(sampled_lat),
-            "cols": len(sampled_lat[0]) if sampled_lat else 0
+            "rows": lat_grid.shape[0],
+            "cols": lat_grid.shape[1]
         },
-        "lat_grid": sampled_lat,
-        "lon_grid": sampled_lon,
-        "data_values": brightness,
-        "data_unit": "brightness",
-        "data_name": "Pixel Brightness",
-        "timestamp": None,
+        "data_unit": data_unit,
+        "data_name": data_name,
+        "timestamp": timestamp,
         "polygons": [],
         "metadata": {
-            "source": "GOES-16",
-            "channel": "C13",
-            "sample_rate": resolution_factor * sample_rate
+            "source": source,
+            "channel": channel,
+            "sample_rate": sample_rate
         }
     }
+    if data_encoding:
+        geo_data["data_encoding"] = data_encoding
 
-    # Save to JSON
-    output_file = 'SatWeatherApp/src/data/samples/conus_geodata.json'
-    with open(output_file, 'w') as f:
-        json.dump(geo_data, f, indent=2)
+    grids = {
+        "lat_grid": lat_grid,
+        "lon_grid": lon_grid,
+        "data_values": values
+    }
+    return geo_data, grids
 
-    print(f"Created {output_file}")
-    print(f"  Bounds: lat [{min_lat:.2f}, {max_lat:.2f}], lon [{min_lon:.2f}, {max_lon:.2f}]")
-    print(f"  Image size: {total_width}x{total_height}")
-    print(f"  Grid size: {len(sampled_lat)}x{len(sampled_lat[0])}")
 
-    return geo_data
+def create_sample_geodata(domain, output_format='json', encoding='float32', lookup=False, lookup_step=None,
+                          adaptive_tolerance=None, written=None):
+    """
+    Create geodata JSON (and/or binary) for a SAMPLE_SOURCES domain from its NPZ and H5 files.
 
+    written, if given, is extended with the paths of the files written.
+    """
+    source = SAMPLE_SOURCES[domain]
+    print(f"Processing {domain} data...")
 
-def create_oklahoma_json():
-    """Create Oklahoma geospatial data JSON from NPZ and H5 files."""
-    print("Processing Oklahoma data...")
+    # Load NPZ file (lat/lon grids and metadata)
+    npz_data = np.load(source['npz'], allow_pickle=True)
 
-    # Load NPZ file
-    npz_data = np.load('oklahoma_1840x1200_reduced4.npz', allow_pickle=True)
+    # Sample the data to reduce size (keep every 2nd point from already reduced grid)
+    sample_rate = 2
 
-    # Load H5 file
-    with h5py.File('channel_c13_data_oklahoma.h5', 'r') as h5:
-        lat_grid = h5['latitude'][:]
-        lon_grid = h5['longitude'][:]
-        rgb_values = h5['rgb_values'][:]
+    # Load H5 file (contains lat/lon and RGB values); only the sampled points
+    # are read, bounds come from the full grids one row block at a time
+    with h5py.File(source['h5'], 'r') as h5:
+        bounds = (*dataset_range(h5['latitude']), *dataset_range(h5['longitude']))
+        sampled_lat = h5['latitude'][::sample_rate, ::sample_rate]
+        sampled_lon = h5['longitude'][::sample_rate, ::sample_rate]
+        sampled_rgb = h5['rgb_values'][::sample_rate, ::sample_rate]
 
     # Extract metadata
     core_width = int(npz_data['core_width'])
@@ -144,81 +683,869 @@ def create_oklahoma_json():
     padding = convert_to_json_friendly(npz_data['padding'].item())
     resolution_factor = int(npz_data['resolution_factor'])
 
-    # Calculate actual image dimensions
-    total_width = core_width + padding['left'] + padding['right']
-    total_height = core_height + padding['top'] + padding['bottom']
+    # Create grayscale (brightness) values from RGB
+    # Simple average - actual brightness temp would need calibration
+    brightness = np.mean(sampled_rgb, axis=2)
 
-    # Get bounds from lat/lon grids
-    min_lat = float(lat_grid.min())
-    max_lat = float(lat_grid.max())
-    min_lon = float(lon_grid.min())
-    max_lon = float(lon_grid.max())
+    geo_data, grids = build_geodata(sampled_lat, sampled_lon, brightness, bounds,
+                                    core_width, core_height, padding,
+                                    resolution_factor * sample_rate,
+                                    "brightness", "Pixel Brightness")
+    if lookup:
+        max_error = add_inverse_lookup(geo_data, grids, lookup_step)
+        print(f"  Inverse lookup: {geo_data['lookup']['rows']}x{geo_data['lookup']['cols']} "
+              f"at {geo_data['lookup']['step']} deg (max error {max_error:.2e} deg)")
+    if adaptive_tolerance:
+        full_kb = (sampled_lat.nbytes + sampled_lon.nbytes) / 1024
+        max_error = add_adaptive_geometry(geo_data, grids, adaptive_tolerance)
+        if max_error is None:
+            print("  Adaptive geometry: skipped (grid has off-disk points)")
+        else:
+            control_kb = (grids['lat_grid'].nbytes + grids['lon_grid'].nbytes) / 1024
+            print(f"  Adaptive geometry: {sampled_lat.shape[0]}x{sampled_lat.shape[1]} -> "
+                  f"{grids['lat_grid'].shape[0]}x{grids['lat_grid'].shape[1]} control points, "
+                  f"max error {max_error:.4f} deg (tolerance {adaptive_tolerance}), "
+                  f"lat/lon {full_kb:.1f} KB -> {control_kb:.1f} KB")
 
-    # Sample the data
-    sample_rate = 2
-    sampled_lat = sample_grid(lat_grid, sample_rate).tolist()
-    sampled_lon = sample_grid(lon_grid, sample_rate).tolist()
-    sampled_rgb = sample_grid(rgb_values, sample_rate)
+    # Save to JSON and/or binary
+    outputs = write_geodata_outputs(geo_data, grids, source['output'], output_format, encoding)
+    for output in outputs:
+        print(f"Created {output} ({os.path.getsize(output) / 1024:.1f} KB)")
+    if written is not None:
+        written.extend(outputs)
+    print(f"  Bounds: lat [{bounds[0]:.2f}, {bounds[1]:.2f}], lon [{bounds[2]:.2f}, {bounds[3]:.2f}]")
+    print(f"  Image size: {geo_data['resolution']['width']}x{geo_data['resolution']['height']}")
+    print(f"  Grid size: {sampled_lat.shape[0]}x{sampled_lat.shape[1]}")
 
-    # Create brightness values
-    brightness = np.mean(sampled_rgb, axis=2).astype(float).tolist()
+    return geo_data, grids
 
-    geo_data = {
-        "bounds": {
-            "min_lat": min_lat,
-            "max_lat": max_lat,
-            "min_lon": min_lon,
-            "max_lon": max_lon
-        },
-        "projection": "geostationary",
-        "resolution": {
-            "width": total_width,
-            "height": total_height
-        },
-        "core_dimensions": {
-            "width": core_width,
-            "height": core_height
-        },
-        "padding": padding,
-        "grid_dimensions": {
-            "rows": len(sampled_lat),
-            "cols": len(sampled_lat[0]) if sampled_lat else 0
-        },
-        "lat_grid": sampled_lat,
-        "lon_grid": sampled_lon,
-        "data_values": brightness,
-        "data_unit": "brightness",
-        "data_name": "Pixel Brightness",
-        "timestamp": None,
-        "polygons": [],
-        "metadata": {
-            "source": "GOES-16",
-            "channel": "C13",
-            "sample_rate": resolution_factor * sample_rate
+
+def create_conus_json(output_format='json', encoding='float32', **options):
+    """Create CONUS geospatial data JSON (and/or binary) from NPZ and H5 files."""
+    return create_sample_geodata('conus', output_format, encoding, **options)
+
+
+def create_oklahoma_json(output_format='json', encoding='float32', **options):
+    """Create Oklahoma geospatial data JSON (and/or binary) from NPZ and H5 files."""
+    return create_sample_geodata('oklahoma', output_format, encoding, **options)
+
+
+# ============================================================================
+# PIPELINE GEODATA STAGE
+# ============================================================================
+# Builds geodata straight from the in-memory CHANNELS / RGB_PRODUCTS of a
+# processed scan, for every registered domain inside that scan.
+
+# Domain registry - mirrors SatWeatherApp/src/constants/domains.js.
+# bounds is (min_lat, max_lat, min_lon, max_lon); None means "the whole scene".
+GEODATA_DOMAINS = {
+    'full_disk': {'cod_name': 'full_disk', 'type': 'full_disk', 'bounds': None},
+    'conus': {'cod_name': 'conus', 'type': 'conus', 'bounds': None},
+    'northwest': {'cod_name': 'northwest', 'type': 'regional', 'bounds': (42.0, 49.0, -125.0, -111.0)},
+    'northeast': {'cod_name': 'northeast', 'type': 'regional', 'bounds': (38.0, 47.0, -85.0, -67.0)},
+    'southwest': {'cod_name': 'southwest', 'type': 'regional', 'bounds': (31.0, 42.0, -124.0, -109.0)},
+    'southeast': {'cod_name': 'southeast', 'type': 'regional', 'bounds': (25.0, 38.0, -92.0, -75.0)},
+    'north_central': {'cod_name': 'north_central', 'type': 'regional', 'bounds': (41.0, 49.0, -104.0, -90.0)},
+    'west_central': {'cod_name': 'west_central', 'type': 'regional', 'bounds': (35.0, 44.0, -117.0, -103.0)},
+    'central': {'cod_name': 'central', 'type': 'regional', 'bounds': (35.0, 44.0, -103.0, -89.0)},
+    'east_central': {'cod_name': 'east_central', 'type': 'regional', 'bounds': (35.0, 44.0, -89.0, -75.0)},
+    'south_central': {'cod_name': 'south_central', 'type': 'regional', 'bounds': (28.0, 37.0, -103.0, -89.0)},
+    'oklahoma': {'cod_name': 'Oklahoma', 'type': 'local', 'bounds': (33.5, 37.0, -103.0, -94.5)},
+    'texas': {'cod_name': 'Texas', 'type': 'local', 'bounds': (26.0, 36.5, -106.5, -93.5)},
+    'meso1': {'cod_name': 'meso1', 'type': 'mesoscale', 'bounds': None},
+    'meso2': {'cod_name': 'meso2', 'type': 'mesoscale', 'bounds': None},
+}
+
+# Pipeline DOMAIN_CHOICE -> registry domain covering the whole scan
+SCENE_DOMAINS = {
+    'full_disk': 'full_disk',
+    'conus': 'conus',
+    'mesoscale1': 'meso1',
+    'mesoscale2': 'meso2',
+}
+
+# Padded output sizes (width, height) of the app's domain images, from the
+# sample {domain}_{W}x{H}_reduced{N}.npz files; other domains keep their
+# window's aspect ratio at the layout's core width
+DOMAIN_OUTPUT_SIZES = {
+    'conus': (1840, 865),
+    'oklahoma': (1840, 1200),
+}
+
+# RGB_PRODUCTS keys whose COD product name differs (see constants/products.js)
+PRODUCT_COD_NAMES = {
+    'geocolor': 'truecolor',
+}
+
+
+def cod_base_path(domain):
+    """Directory layout used by imageService.generateCODImageUrl."""
+    if domain['type'] == 'full_disk':
+        return 'full_disk'
+    if domain['type'] == 'conus':
+        return 'continental/conus'
+    return f"{domain['type']}/{domain['cod_name']}"
+
+
+def cod_product_name(product_key):
+    """Map a CHANNELS / RGB_PRODUCTS key to the app's product name ('C13' -> '13')."""
+    if product_key.startswith('C') and product_key[1:].isdigit():
+        return f"{int(product_key[1:]):02d}"
+    return PRODUCT_COD_NAMES.get(product_key, product_key)
+
+
+def format_cod_timestamp(value):
+    """Format a scan time (ISO string, datetime or datetime64) as YYYYMMDD.HHMMSS."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, bytes):
+        value = value.decode('ascii')
+    if isinstance(value, str):
+        value = np.datetime64(value.rstrip('Z'))
+    if isinstance(value, np.datetime64):
+        value = value.astype('datetime64[s]').item()
+    return value.strftime('%Y%m%d.%H%M%S')
+
+
+def projection_authority(projection):
+    """projection as a GOESProjectionAuthority: authorities pass through, params() dicts are wrapped."""
+    if isinstance(projection, GOESProjectionAuthority):
+        return projection
+    return GOESProjectionAuthority.from_params(projection)
+
+
+def goes_fixed_grid_to_latlon(x_rad, y_rad, projection):
+    """
+    GOES fixed-grid scan angles (radians) to lat/lon degrees, via
+    GOESProjectionAuthority.latlon.
+
+    projection is an authority or its params() dict (sat_lon, sat_height
+    above the ellipsoid, semi_major, semi_minor). Points off the Earth's disk
+    come back as NaN.
+    """
+    return projection_authority(projection).latlon(x_rad, y_rad)
+
+
+def latlon_to_goes_fixed_grid(lat, lon, projection):
+    """
+    Lat/lon degrees to GOES fixed-grid scan angles x, y (radians), via
+    GOESProjectionAuthority.fixed_grid.
+
+    Points not visible from the satellite come back as NaN.
+    """
+    return projection_authority(projection).fixed_grid(lat, lon)
+
+
+def _bilinear_latlon(lat_grid, lon_grid, row, col):
+    """Bilinear lat/lon at fractional (row, col) plus the 2x2 Jacobian terms."""
+    rows, cols = lat_grid.shape
+    r0 = np.clip(np.floor(row), 0, rows - 2).astype(np.intp)
+    c0 = np.clip(np.floor(col), 0, cols - 2).astype(np.intp)
+    fr = row - r0
+    fc = col - c0
+
+    out = []
+    for grid in (lat_grid, lon_grid):
+        a00 = grid[r0, c0]
+        a01 = grid[r0, c0 + 1]
+        a10 = grid[r0 + 1, c0]
+        a11 = grid[r0 + 1, c0 + 1]
+        value = (1 - fr) * ((1 - fc) * a00 + fc * a01) + fr * ((1 - fc) * a10 + fc * a11)
+        d_row = (1 - fc) * (a10 - a00) + fc * (a11 - a01)
+        d_col = (1 - fr) * (a01 - a00) + fr * (a11 - a10)
+        out.append((value, d_row, d_col))
+    return out
+
+
+def build_inverse_lookup(lat_grid, lon_grid, step=None, bounds=None, projection=None, iterations=8):
+    """
+    Regular lat/lon raster of fractional (row, col) indices into lat_grid/lon_grid.
+
+    The first guess comes from an affine fit in GOES scan-angle space when a
+    projection is given (exact for fixed-grid data) or a quadratic fit in
+    lat/lon otherwise; Newton steps on the bilinear grid then refine every
+    raster point. step defaults to the mean grid spacing.
+
+    Returns (lookup, lookup_row, lookup_col, max_error) where lookup =
+    {min_lat, max_lat, min_lon, max_lon, step, rows, cols} (row 0 is max_lat),
+    points outside the grid are NaN, and max_error is the largest lat/lon
+    residual (degrees) of the points kept.
+    """
+    lat_grid = np.asarray(lat_grid, dtype=np.float64)
+    lon_grid = np.asarray(lon_grid, dtype=np.float64)
+    rows, cols = lat_grid.shape
+
+    if bounds is None:
+        bounds = (np.nanmin(lat_grid), np.nanmax(lat_grid), np.nanmin(lon_grid), np.nanmax(lon_grid))
+    min_lat, max_lat, min_lon, max_lon = (float(b) for b in bounds)
+    if step is None:
+        spacing = max((max_lat - min_lat) / rows, (max_lon - min_lon) / cols)
+        step = float(f"{spacing:.2g}")
+    lut_rows = int(np.ceil((max_lat - min_lat) / step)) + 1
+    lut_cols = int(np.ceil((max_lon - min_lon) / step)) + 1
+    lats = np.repeat((max_lat - np.arange(lut_rows) * step)[:, None], lut_cols, axis=1)
+    lons = np.repeat((min_lon + np.arange(lut_cols) * step)[None, :], lut_rows, axis=0)
+
+    # First guess: least-squares fit of (row, col) against the grid's coordinates
+    row_idx, col_idx = np.mgrid[0:rows, 0:cols]
+    if projection is not None:
+        grid_u, grid_v = latlon_to_goes_fixed_grid(lat_grid, lon_grid, projection)
+        lut_u, lut_v = latlon_to_goes_fixed_grid(lats, lons, projection)
+        terms = lambda u, v: [np.ones_like(u), u, v]
+    else:
+        grid_u, grid_v = lat_grid, lon_grid
+        lut_u, lut_v = lats, lons
+        terms = lambda u, v: [np.ones_like(u), u, v, u * u, u * v, v * v]
+    valid = np.isfinite(grid_u) & np.isfinite(grid_v)
+    design = np.column_stack(terms(grid_u[valid], grid_v[valid]))
+    coef_row = np.linalg.lstsq(design, row_idx[valid], rcond=None)[0]
+    coef_col = np.linalg.lstsq(design, col_idx[valid], rcond=None)[0]
+    lut_terms = terms(lut_u, lut_v)
+    row = sum(c * t for c, t in zip(coef_row, lut_terms))
+    col = sum(c * t for c, t in zip(coef_col, lut_terms))
+
+    # Newton refinement on the bilinear interpolation of the grid itself
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(iterations):
+            row = np.clip(np.nan_to_num(row, nan=-1.0), -1.0, rows)
+            col = np.clip(np.nan_to_num(col, nan=-1.0), -1.0, cols)
+            (lat_v, lat_r, lat_c), (lon_v, lon_r, lon_c) = _bilinear_latlon(lat_grid, lon_grid, row, col)
+            d_lat = lats - lat_v
+            d_lon = lons - lon_v
+            det = lat_r * lon_c - lat_c * lon_r
+            row = row + (d_lat * lon_c - lat_c * d_lon) / det
+            col = col + (lat_r * d_lon - d_lat * lon_r) / det
+
+        (lat_v, _, _), (lon_v, _, _) = _bilinear_latlon(lat_grid, lon_grid, np.nan_to_num(row), np.nan_to_num(col))
+        error = np.maximum(np.abs(lats - lat_v), np.abs(lons - lon_v))
+        inside = (row >= 0) & (row <= rows - 1) & (col >= 0) & (col <= cols - 1) & (error <= step)
+
+    lookup_row = np.where(inside, row, np.nan).astype(np.float32)
+    lookup_col = np.where(inside, col, np.nan).astype(np.float32)
+    max_error = float(error[inside].max()) if inside.any() else 0.0
+
+    lookup = {
+        'min_lat': min_lat,
+        'max_lat': max_lat,
+        'min_lon': min_lon,
+        'max_lon': max_lon,
+        'step': step,
+        'rows': lut_rows,
+        'cols': lut_cols,
+    }
+    return lookup, lookup_row, lookup_col, max_error
+
+
+def add_inverse_lookup(geo_data, grids, step=None, projection=None):
+    """Attach a build_inverse_lookup raster to (geo_data, grids); returns the max error (deg)."""
+    bounds = geo_data['bounds']
+    lookup, lookup_row, lookup_col, max_error = build_inverse_lookup(
+        grids['lat_grid'], grids['lon_grid'], step,
+        (bounds['min_lat'], bounds['max_lat'], bounds['min_lon'], bounds['max_lon']), projection)
+    geo_data['lookup'] = lookup
+    grids['lookup_row'] = lookup_row
+    grids['lookup_col'] = lookup_col
+    return max_error
+
+
+def pixel_axis_coords(coords, n):
+    """Scan-angle coordinates of the pixel centres of an n-pixel axis spanning coords."""
+    coords = np.asarray(coords, dtype=np.float64)
+    if len(coords) == n:
+        return coords
+    step = (coords[-1] - coords[0]) / (len(coords) - 1)
+    positions = (np.arange(n) + 0.5) * (len(coords) / n) - 0.5
+    return coords[0] + positions * step
+
+
+def find_domain_window(lat, lon, bounds):
+    """
+    Row/col slice (on the given grid) of the pixels inside bounds.
+
+    Returns (row_start, row_stop, col_start, col_stop) or None when the domain
+    is not in the scene.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounds
+    with np.errstate(invalid='ignore'):
+        inside = (lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)
+    rows = np.flatnonzero(inside.any(axis=1))
+    cols = np.flatnonzero(inside.any(axis=0))
+    if rows.size == 0 or cols.size == 0:
+        return None
+    return int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1
+
+
+def product_values(product_key, product):
+    """
+    (values, data_unit, data_name, channel) for one CHANNELS / RGB_PRODUCTS entry.
+
+    Channels report calibrated brightness temperature (K) or reflectance (%);
+    RGB arrays, and channels whose calibrated data was already freed, fall
+    back to brightness.
+    """
+    if not isinstance(product, dict):
+        return product, 'brightness', 'Pixel Brightness', product_key
+
+    calibrated = product.get('calibrated')
+    if calibrated is None:
+        return product['enhanced'], 'brightness', f"{product_key} Brightness", product_key
+    if product.get('channel_type') == 'ir':
+        return calibrated, 'K', f"{product_key} Brightness Temperature", product_key
+    # Visible reflectance factor (0-1) as percent, scaled when quantized
+    return calibrated, '%', f"{product_key} Reflectance", product_key
+
+
+def geodata_frame_path(output_dir, domain, product, timestamp):
+    """
+    The {base_path}/{product}/{domain}.{product}.{timestamp}.json geodata file
+    the app fetches for one frame (split layouts write their values file here).
+    """
+    product_name = cod_product_name(product)
+    return os.path.join(output_dir, cod_base_path(domain), product_name,
+                        f"{domain['cod_name']}.{product_name}.{timestamp or 'latest'}.json")
+
+
+def shared_geometry(lat, lon, bounds, projection, lookup=False, lookup_step=None,
+                    adaptive_tolerance=None):
+    """
+    Inverse lookup / adaptive control points for one lat/lon grid, computed
+    once and merged into every product's geodata on that grid.
+
+    Returns (geo_data fields, grids) to update each product's pair with;
+    both are empty when neither option is on.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounds
+    geo_data = {'bounds': {'min_lat': float(min_lat), 'max_lat': float(max_lat),
+                           'min_lon': float(min_lon), 'max_lon': float(max_lon)}}
+    grids = {'lat_grid': lat, 'lon_grid': lon}
+    if lookup:
+        add_inverse_lookup(geo_data, grids, lookup_step, projection)
+    if adaptive_tolerance:
+        add_adaptive_geometry(geo_data, grids, adaptive_tolerance)
+    del geo_data['bounds']
+    if 'grid_index' not in geo_data:
+        del grids['lat_grid'], grids['lon_grid']
+    return geo_data, grids
+
+
+def _geodata_domain_task(task):
+    """Process-pool worker: write every product's geodata for one domain."""
+    start_time = time.time()
+    try:
+        domain = task['domain']
+        written = []
+        for item in task['products']:
+            values = item['values']
+            data_encoding = None
+            if values.ndim == 3:
+                values = values.mean(axis=2)
+            if item['data_unit'] == '%':
+                values = values * np.float32(100.0)
+            if item['data_unit'] in PHYSICAL_ENCODINGS:
+                values, data_encoding = quantize_physical(values, item['data_unit'])
+            else:
+                values = values.astype(np.float32, copy=False)
+
+            geo_data, grids = build_geodata(
+                item['lat'], item['lon'], values, item['bounds'],
+                item['core_width'], item['core_height'], item['padding'], item['sample_rate'],
+                item['data_unit'], item['data_name'],
+                timestamp=task['timestamp'], channel=item['channel'], source=task['source'],
+                data_encoding=data_encoding)
+            geometry_fields, geometry_grids = item['geometry']
+            geo_data.update(geometry_fields)
+            grids.update(geometry_grids)
+
+            json_path = geodata_frame_path(task['output_dir'], domain, item['product'],
+                                           task['timestamp'])
+            output_dir = os.path.dirname(json_path)
+            os.makedirs(output_dir, exist_ok=True)
+
+            if task['split']:
+                # One geometry file per domain, at the domain root next to the product dirs
+                prefix = f"{domain['cod_name']}.{cod_product_name(item['product'])}"
+                written += write_split_geodata(geo_data, grids, output_dir, prefix,
+                                               task['output_format'], task['encoding'],
+                                               geometry_dir=os.path.dirname(output_dir),
+                                               domain_name=domain['cod_name'])
+                if task['bundle_frames']:
+                    written += bundle_recent_frames(output_dir, prefix, task['bundle_frames'],
+                                                    task['output_format'], task['encoding'])
+            else:
+                written += write_geodata_outputs(geo_data, grids, json_path,
+                                                 task['output_format'], task['encoding'])
+
+        return {'success': True, 'domain': task['name'], 'files': written,
+                'time': time.time() - start_time}
+    except Exception as e:
+        return {'success': False, 'domain': task['name'], 'error': str(e),
+                'time': time.time() - start_time}
+
+
+def scene_domain_names(scene, domains=None):
+    """Domains to produce for a scene: the scene itself plus every bounded domain inside CONUS / full disk."""
+    if domains is not None:
+        return list(domains)
+    names = [SCENE_DOMAINS.get(scene, scene)]
+    if scene in ('conus', 'full_disk'):
+        names += [name for name, cfg in GEODATA_DOMAINS.items() if cfg['bounds'] is not None]
+    return names
+
+
+# Fixed-grid scan-angle extents of bounded domains, keyed by (name, projection)
+_domain_extents = {}
+
+
+def domain_scan_extent(name, projection, samples=256):
+    """
+    Fixed-grid extent (x_min, x_max, y_min, y_max) in radians of a bounded
+    domain, or None when the domain is not visible from the satellite.
+
+    The lat/lon box's outline is densified and projected; the projection is
+    continuous, so the box's scan-angle bounding box is the outline's.
+    """
+    cache_key = (name, tuple(sorted(projection.items())))
+    if cache_key not in _domain_extents:
+        min_lat, max_lat, min_lon, max_lon = GEODATA_DOMAINS[name]['bounds']
+        lats = np.linspace(min_lat, max_lat, samples)
+        lons = np.linspace(min_lon, max_lon, samples)
+        outline_lat = np.concatenate([lats, lats, np.full(samples, min_lat), np.full(samples, max_lat)])
+        outline_lon = np.concatenate([np.full(samples, min_lon), np.full(samples, max_lon), lons, lons])
+        x, y = latlon_to_goes_fixed_grid(outline_lat, outline_lon, projection)
+        visible = np.isfinite(x)
+        _domain_extents[cache_key] = None if not visible.any() else (
+            float(x[visible].min()), float(x[visible].max()),
+            float(y[visible].min()), float(y[visible].max()))
+    return _domain_extents[cache_key]
+
+
+def axis_window(axis, low, high):
+    """(start, stop) of the pixels of a uniform scan-angle axis whose centres lie in [low, high], or None."""
+    step = axis[1] - axis[0]
+    positions = sorted(((low - axis[0]) / step, (high - axis[0]) / step))
+    start = max(0, int(np.ceil(positions[0] - 1e-9)))
+    stop = min(len(axis), int(np.floor(positions[1] + 1e-9)) + 1)
+    return (start, stop) if start < stop else None
+
+
+def extent_window(extent, x_axis, y_axis):
+    """(row_start, row_stop, col_start, col_stop) of a fixed-grid extent on the given axes, or None."""
+    x_min, x_max, y_min, y_max = extent
+    cols = axis_window(x_axis, x_min, x_max)
+    rows = axis_window(y_axis, y_min, y_max)
+    if cols is None or rows is None:
+        return None
+    return rows[0], rows[1], cols[0], cols[1]
+
+
+# Scan-angle pixel size of the coarsest ABI bands (2 km, C07-C16)
+ABI_COARSEST_PIXEL_RAD = 0.000056
+
+
+def fixed_grid_hyperslab(x_coords, y_coords, extent, coarsest=ABI_COARSEST_PIXEL_RAD):
+    """
+    (row_start, row_stop, col_start, col_stop) of one band's x/y grid covering
+    a fixed-grid extent, or None when the extent is outside the scene.
+
+    The window is located on the 2 km grid and scaled to the band, so the
+    0.5 / 1 / 2 km hyperslabs of a scan cover the same ground and upscale
+    onto each other exactly.
+    """
+    x_coords = np.asarray(x_coords, dtype=np.float64)
+    y_coords = np.asarray(y_coords, dtype=np.float64)
+    block = max(1, int(round(coarsest / abs(x_coords[1] - x_coords[0]))))
+    height, width = len(y_coords) // block, len(x_coords) // block
+    coarse_x = x_coords[:width * block].reshape(width, block).mean(axis=1)
+    coarse_y = y_coords[:height * block].reshape(height, block).mean(axis=1)
+    window = extent_window(extent, coarse_x, coarse_y)
+    if window is None:
+        return None
+    return tuple(index * block for index in window)
+
+
+def domain_windows(height, width, coordinate_data, projection, domains):
+    """
+    Pixel windows of domains on a height x width product grid of the scan.
+
+    Each bounded domain's fixed-grid extent (domain_scan_extent) is mapped
+    onto the grid's axes, so every resolution of the scan gets the same
+    ground window. Returns (x_axis, y_axis, windows) with windows mapping
+    name -> (row_start, row_stop, col_start, col_stop); domains not in the
+    scene are left out.
+    """
+    x_axis = pixel_axis_coords(coordinate_data['x_coords'], width)
+    y_axis = pixel_axis_coords(coordinate_data['y_coords'], height)
+
+    windows = {}
+    for name in domains:
+        if GEODATA_DOMAINS[name]['bounds'] is None:
+            windows[name] = (0, height, 0, width)
+            continue
+        extent = domain_scan_extent(name, projection)
+        window = extent and extent_window(extent, x_axis, y_axis)
+        if window is not None:
+            windows[name] = window
+    return x_axis, y_axis, windows
+
+
+def build_domain_registry(coordinate_data, shapes, scene='conus', domains=None, layout='app'):
+    """
+    Precomputed windows of every domain of a scene, for each product grid shape.
+
+    shapes is an iterable of (height, width). Returns a JSON-friendly dict
+    name -> {'cod_name', 'type', 'bounds', 'extent' (fixed-grid radians),
+    'output_size' ([width, height] under layout), 'windows' {'HxW': window}}.
+    """
+    if isinstance(layout, str):
+        layout = IMAGE_LAYOUTS[layout]
+    projection = projection_params(coordinate_data)
+    domains = scene_domain_names(scene, domains)
+    registry = {}
+    for name in domains:
+        domain = GEODATA_DOMAINS[name]
+        registry[name] = {
+            'cod_name': domain['cod_name'],
+            'type': domain['type'],
+            'bounds': domain['bounds'],
+            'extent': domain_scan_extent(name, projection) if domain['bounds'] else None,
+            'output_size': DOMAIN_OUTPUT_SIZES.get(name),
+            'windows': {},
         }
+    for height, width in sorted(set(shapes)):
+        _, _, windows = domain_windows(height, width, coordinate_data, projection, domains)
+        for name, window in windows.items():
+            registry[name]['windows'][f"{height}x{width}"] = list(window)
+    return {name: entry for name, entry in registry.items() if entry['windows']}
+
+
+def plan_geodata_tasks(products, coordinate_data, projection, scene='conus', domains=None,
+                       target_cols=230, layout=None, lookup=False, lookup_step=None,
+                       adaptive_tolerance=None):
+    """
+    Work out per-domain pixel windows and sampled lat/lon for every product.
+
+    products maps product key -> (values, data_unit, data_name, channel).
+    Windows come from domain_windows, then each domain is sampled so its grid
+    is about target_cols wide. With a layout (see IMAGE_LAYOUTS) the grid
+    spans the padded image encode_pipeline_images writes, padding values NaN.
+    The inverse lookup / adaptive geometry (see shared_geometry) is computed
+    once per domain and grid shape and shared by its products. Returns one
+    task dict per domain.
+    """
+    domains = scene_domain_names(scene, domains)
+    tasks = {name: {'name': name, 'domain': GEODATA_DOMAINS[name], 'products': []}
+             for name in domains}
+
+    # Products at the same resolution share windows and lat/lon samples
+    by_shape = {}
+    for key, entry in products.items():
+        by_shape.setdefault(entry[0].shape[:2], []).append(key)
+
+    for (height, width), keys in by_shape.items():
+        x_axis, y_axis, windows = domain_windows(height, width, coordinate_data, projection, domains)
+
+        for name, (row0, row1, col0, col1) in windows.items():
+            bounds = GEODATA_DOMAINS[name]['bounds']
+            domain_shape = domain_layout(name, layout)
+            if domain_shape:
+                core_width, core_height, padding = layout_core_size(domain_shape, row1 - row0, col1 - col0)
+                image_width = core_width + padding['left'] + padding['right']
+                stride = max(1, -(-image_width // target_cols))
+                col_args = (col0, col1, core_width, padding['left'], padding['right'], stride)
+                row_args = (row0, row1, core_height, padding['top'], padding['bottom'], stride)
+                cols, rows = layout_axis_pixels(*col_args), layout_axis_pixels(*row_args)
+                x_coords = layout_axis_coords(x_axis, *col_args)
+                y_coords = layout_axis_coords(y_axis, *row_args)
+                sample_rate = stride * (col1 - col0) / core_width
+            else:
+                core_width, core_height = col1 - col0, row1 - row0
+                padding = {'left': 0, 'right': 0, 'top': 0, 'bottom': 0}
+                stride = sample_rate = max(1, -(-(col1 - col0) // target_cols))
+                rows = cols = None
+                x_coords, y_coords = x_axis[col0:col1:stride], y_axis[row0:row1:stride]
+            lat, lon = goes_fixed_grid_to_latlon(x_coords, y_coords, projection)
+            if bounds is None:
+                grid_bounds = (np.nanmin(lat), np.nanmax(lat), np.nanmin(lon), np.nanmax(lon))
+            else:
+                grid_bounds = bounds
+            geometry = shared_geometry(lat, lon, grid_bounds, projection, lookup, lookup_step,
+                                       adaptive_tolerance)
+
+            for key in keys:
+                values, data_unit, data_name, channel = products[key]
+                if rows is None:
+                    values = np.ascontiguousarray(values[row0:row1:stride, col0:col1:stride])
+                else:
+                    values = layout_sample(values, rows, cols)
+                tasks[name]['products'].append({
+                    'product': key,
+                    'values': values,
+                    'lat': lat,
+                    'lon': lon,
+                    'bounds': grid_bounds,
+                    'core_width': core_width,
+                    'core_height': core_height,
+                    'padding': padding,
+                    'sample_rate': sample_rate,
+                    'geometry': geometry,
+                    'data_unit': data_unit,
+                    'data_name': data_name,
+                    'channel': channel,
+                })
+
+    return [task for task in tasks.values() if task['products']]
+
+
+def projection_params(coordinate_data):
+    """GOES fixed-grid projection parameters from COORDINATE_DATA['projection_info']."""
+    return GOESProjectionAuthority.read_params(coordinate_data['projection_info'])
+
+
+def scan_start_time(metadata):
+    """First time_coverage_start found in the per-channel METADATA, or None."""
+    for channel_metadata in (metadata or {}).values():
+        scan_time = channel_metadata.get('time_coverage_start')
+        if scan_time:
+            return scan_time
+    return None
+
+
+def generate_pipeline_geodata(channels, rgb_products, coordinate_data, metadata, scene='conus',
+                              output_dir='geodata', domains=None, output_format='json',
+                              encoding='float32', split=True, target_cols=230, max_workers=None,
+                              source='GOES-16', lookup=False, lookup_step=None,
+                              adaptive_tolerance=None, precompress=False, layout=None, bundle_frames=None):
+    """
+    Geodata for every registered domain of one processed scan.
+
+    channels / rgb_products / coordinate_data / metadata are the Cell 4-5
+    CHANNELS, RGB_PRODUCTS, COORDINATE_DATA and METADATA. Files land in the
+    app's layout ({base_path}/{product}/{domain}.{product}.{timestamp}.json)
+    and are written exactly once by a process pool, one task per domain.
+    lookup adds an inverse lat/lon -> grid lookup raster (lookup_step degrees);
+    adaptive_tolerance (degrees) ships lat/lon as adaptive control points.
+    precompress writes gzip/brotli/zstd variants and output_dir's manifest.
+    layout describes the padded images of encode_pipeline_images (same
+    IMAGE_LAYOUTS name or dict), so the grids line up with those images.
+    split writes one {domain}.geometry.{id} file per domain under its base path;
+    bundle_frames (split only) also rebuilds each product's {domain}.{product}.bundle
+    from its newest bundle_frames values files, this scan's included.
+    """
+    if bundle_frames and not split:
+        raise ValueError("bundle_frames needs split=True")
+    start_time = time.time()
+    if isinstance(layout, str):
+        layout = IMAGE_LAYOUTS[layout]
+    projection = projection_params(coordinate_data)
+    timestamp = format_cod_timestamp(scan_start_time(metadata))
+
+    products = {}
+    for key, channel in (channels or {}).items():
+        if channel.get('enhanced') is not None:
+            products[key] = product_values(key, channel)
+    for key, rgb in (rgb_products or {}).items():
+        products[key] = product_values(key, rgb)
+
+    tasks = plan_geodata_tasks(products, coordinate_data, projection, scene, domains, target_cols, layout,
+                               lookup, lookup_step, adaptive_tolerance)
+    for task in tasks:
+        task.update({'timestamp': timestamp, 'output_dir': output_dir, 'output_format': output_format,
+                     'encoding': encoding, 'split': split, 'bundle_frames': bundle_frames,
+                     'source': source})
+
+    print(f"Generating geodata: {len(tasks)} domains x {len(products)} products, timestamp {timestamp}")
+
+    results = []
+    if max_workers == 1 or len(tasks) <= 1:
+        results = [_geodata_domain_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_geodata_domain_task, task) for task in tasks]
+            for future in as_completed(futures):
+                results.append(future.result())
+
+    for result in sorted(results, key=lambda r: r['domain']):
+        if result['success']:
+            print(f"  {result['domain']}: {len(result['files'])} files in {result['time']:.2f}s")
+        else:
+            print(f"  {result['domain']}: FAILED - {result['error']}")
+
+    files = [f for r in results for f in r.get('files', [])]
+    print(f"Geodata complete: {len(files)} files in {time.time() - start_time:.1f}s")
+
+    if precompress and files:
+        precompress_outputs(files, output_dir, max_workers=max_workers)
+
+    return {
+        'success': all(r['success'] for r in results),
+        'timestamp': timestamp,
+        'results': results,
+        'files': files,
     }
 
-    # Save to JSON
-    output_file = 'SatWeatherApp/src/data/samples/oklahoma_geodata.json'
-    with open(output_file, 'w') as f:
-        json.dump(geo_data, f, indent=2)
 
-    print(f"Created {output_file}")
-    print(f"  Bounds: lat [{min_lat:.2f}, {max_lat:.2f}], lon [{min_lon:.2f}, {max_lon:.2f}]")
-    print(f"  Image size: {total_width}x{total_height}")
-    print(f"  Grid size: {len(sampled_lat)}x{len(sampled_lat[0])}")
+def benchmark_geodata_formats(domains, repeats=20):
+    """
+    Compare JSON against the binary encodings for size and parse time.
+
+    domains maps a name to the (geo_data, grids) pair returned by the
+    create_*_json functions. Parse time is measured in Python (json.loads vs
+    decode_binary_geodata) as a proxy for response.json() vs typed-array
+    views in the app.
+    """
+    print("\n" + "=" * 72)
+    print("GEODATA FORMAT BENCHMARK")
+    print("=" * 72)
+    print(f"{'domain':<10} {'format':<16} {'size KB':>9} {'gzip KB':>9} {'parse ms':>9} {'max err':>10}")
+
+    results = {}
+    for name, (geo_data, grids) in domains.items():
+        json_data = to_json_geodata(geo_data, grids)
+
+        payloads = {
+            'json (indent=2)': json.dumps(json_data, indent=2).encode('ascii'),
+            'json (compact)': json.dumps(json_data, separators=(',', ':')).encode('ascii'),
+            'binary float32': encode_binary_geodata(geo_data, grids, 'float32'),
+            'binary int16': encode_binary_geodata(geo_data, grids, 'int16'),
+        }
+
+        results[name] = {}
+        for label, payload in payloads.items():
+            is_binary = label.startswith('binary')
+            parse = decode_binary_geodata if is_binary else json.loads
+
+            start = time.perf_counter()
+            for _ in range(repeats):
+                parsed = parse(payload)
+            parse_ms = (time.perf_counter() - start) / repeats * 1000
+
+            decoded = parsed[1] if is_binary else {f: np.asarray(parsed[f], dtype=np.float32) for f in grids}
+            max_err = max(float(np.nanmax(np.abs(decoded[f] - grids[f]))) for f in grids)
+
+            gzip_kb = len(gzip.compress(payload, compresslevel=6)) / 1024
+            results[name][label] = {
+                'bytes': len(payload),
+                'gzip_bytes': int(gzip_kb * 1024),
+                'parse_ms': parse_ms,
+                'max_error': max_err,
+            }
+            print(f"{name:<10} {label:<16} {len(payload) / 1024:>9.1f} {gzip_kb:>9.1f} "
+                  f"{parse_ms:>9.2f} {max_err:>10.2e}")
+
+        # Split layout: what each additional frame costs once the geometry is cached
+        _, _, values, value_grids = split_geodata(geo_data, grids)
+        values_bytes = len(encode_binary_geodata(values, value_grids, 'float32'))
+        print(f"{name:<10} {'values-only bin':<16} {values_bytes / 1024:>9.1f}   (per frame with split geometry)")
+
+    return results
+
+# ============================================================================
+# APP IMAGE LAYOUTS
+# ============================================================================
+# Padded image geometry shared by the geodata stage and the image stages
+# (imagery): which scan pixel / scan angle each padded image pixel shows.
+
+# Padded app layouts: the core image is resized to core_width (aspect kept)
+# and padded for the header / legend bars, e.g. CONUS 1800x745 -> 1840x865
+IMAGE_LAYOUTS = {
+    'app': {'core_width': 1800, 'padding': {'left': 20, 'right': 20, 'top': 80, 'bottom': 40}},
+}
 
-    return geo_data
+
+def domain_layout(name, layout):
+    """layout with the core size pinned to the domain's DOMAIN_OUTPUT_SIZES entry, if it has one."""
+    if not layout or name not in DOMAIN_OUTPUT_SIZES:
+        return layout
+    width, height = DOMAIN_OUTPUT_SIZES[name]
+    padding = layout['padding']
+    return dict(layout, core_width=width - padding['left'] - padding['right'],
+                core_height=height - padding['top'] - padding['bottom'])
+
+
+def layout_core_size(layout, height, width):
+    """(core_width, core_height, padding) of a height x width window drawn into layout."""
+    core_width = layout['core_width']
+    core_height = layout.get('core_height') or max(1, round(height * core_width / width))
+    return core_width, core_height, dict(layout['padding'])
+
+
+def _layout_source_positions(start, stop, core_n, pad_before, pad_after, stride=1):
+    """Source pixel positions (fractional) of every stride-th pixel of a padded image axis."""
+    pixels = np.arange(0, core_n + pad_before + pad_after, stride)
+    return start + (pixels - pad_before + 0.5) * ((stop - start) / core_n) - 0.5
+
+
+def layout_axis_coords(axis, start, stop, core_n, pad_before, pad_after, stride=1):
+    """
+    Scan angles of every stride-th pixel of a padded image axis that shows
+    axis[start:stop] over core_n pixels; padding extrapolates the fixed grid.
+    """
+    source = _layout_source_positions(start, stop, core_n, pad_before, pad_after, stride)
+    return axis[0] + source * (axis[1] - axis[0])
+
+
+def layout_axis_pixels(start, stop, core_n, pad_before, pad_after, stride=1):
+    """Nearest source pixel for each layout_axis_coords sample; -1 in the padding."""
+    source = np.rint(_layout_source_positions(start, stop, core_n, pad_before, pad_after, stride))
+    return np.where((source >= start) & (source < stop), source, -1).astype(np.intp)
+
+
+def layout_sample(values, rows, cols):
+    """values at layout_axis_pixels rows x cols as float32, NaN where either falls in the padding."""
+    sampled = values[np.maximum(rows, 0)[:, None], np.maximum(cols, 0)[None, :]].astype(np.float32)
+    sampled[(rows < 0)[:, None] | (cols < 0)[None, :]] = np.nan
+    return sampled
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert sample geodata to JSON and/or compact binary")
+    parser.add_argument('--format', choices=['json', 'binary', 'both'], default='both',
+                        help="output format(s) to write (default: both)")
+    parser.add_argument('--encoding', choices=['float32', 'int16'], default='float32',
+                        help="binary grid encoding (default: float32)")
+    parser.add_argument('--split', action='store_true',
+                        help="also write a shared geometry file plus a per-frame values file per domain")
+    parser.add_argument('--lookup', action='store_true',
+                        help="add an inverse lat/lon -> grid index lookup raster")
+    parser.add_argument('--lookup-step', type=float, default=None,
+                        help="lookup raster spacing in degrees (default: grid spacing)")
+    parser.add_argument('--adaptive-tolerance', type=float, default=None,
+                        help="keep only the lat/lon control points needed for this error (degrees, e.g. 0.01)")
+    parser.add_argument('--precompress', action='store_true',
+                        help="write gzip/brotli/zstd variants and a precompressed.json manifest")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="compare JSON and binary size / parse time for both domains")
+    args = parser.parse_args()
+
     print("Converting geospatial data to JSON format...\n")
 
-    conus_data = create_conus_json()
+    # Files written by this run (the only ones --precompress touches)
+    outputs = []
+    conus_data = create_conus_json(args.format, args.encoding, lookup=args.lookup,
+                                   lookup_step=args.lookup_step,
+                                   adaptive_tolerance=args.adaptive_tolerance, written=outputs)
     print()
-    oklahoma_data = create_oklahoma_json()
+    oklahoma_data = create_oklahoma_json(args.format, args.encoding, lookup=args.lookup,
+                                         lookup_step=args.lookup_step,
+                                         adaptive_tolerance=args.adaptive_tolerance, written=outputs)
+
+    sample_dir = os.path.dirname(SAMPLE_SOURCES['conus']['output'])
+    if args.split:
+        print()
+        for prefix, (geo_data, grids) in (('conus', conus_data), ('oklahoma', oklahoma_data)):
+            for written in write_split_geodata(geo_data, grids, sample_dir, prefix,
+                                               args.format, args.encoding):
+                print(f"Created {written} ({os.path.getsize(written) / 1024:.1f} KB)")
+                outputs.append(written)
+
+    if args.precompress:
+        print()
+        precompress_outputs(outputs, sample_dir)
+
+    if args.benchmark:
+        benchmark_geodata_formats({'conus': conus_data, 'oklahoma': oklahoma_data})
 
     print("\nDone! JSON files ready for app testing.")
     print("\nIMPORTANT: These files use 'geostationary' projection.")
-    print("The app's projection utilities need to be updated to support")
-    print("lat/lon grid lookup instead of linear interpolation.")
+    print("The app maps lat/lon to pixels through the lat/lon grids;")
+    print("run with --lookup to ship an O(1) inverse lookup raster as well.")
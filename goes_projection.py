@@ -0,0 +1,283 @@
+"""
+GOES ABI fixed-grid projection, shared by the Cell 4 pipeline (color_plus)
+and the export / serving modules (convert_geodata, render_service).
+
+GOESProjectionAuthority reads the projection from the first NetCDF file once
+and answers every projection question from it: geotransforms for any
+product resolution, and the forward / inverse scan angle <-> lat/lon
+transforms of GOES-R PUG 4.2.8.
+"""
+
+import numpy as np
+
+
+class GOESProjectionAuthority:
+    """
+    Read GOES projection from NetCDF once.
+    Provide geotransforms for any resolution based on data dimensions.
+    """
+
+    # Known GOES resolutions (in radians per pixel at native resolution)
+    RESOLUTION_MAP = {
+        0.5: 0.000014,  # C02, C04, and upscaled RGBs
+        1.0: 0.000028,  # C01, C03, C05, C06
+        2.0: 0.000056   # C07-C16
+    }
+
+    # Geotransform diagnostics; Cell 4 turns them off in OPERATIONAL_MODE
+    verbose = True
+
+    def __init__(self, netcdf_dataset, subset=None):
+        """Initialize from first NetCDF file - read what's there
+
+        subset is the (y slice, x slice) hyperslab actually loaded, so
+        geotransforms describe the subset rather than the whole scene.
+        """
+        proj_info = netcdf_dataset['goes_imager_projection']
+
+        # Read parameters from file (these never change)
+        self._set_params(self.read_params(proj_info))
+        self.inv_flattening = float(proj_info.inverse_flattening)
+        self.sweep_axis = str(proj_info.sweep_angle_axis)
+
+        # Read coordinate arrays to determine geographic extent
+        x_coords = netcdf_dataset['x'].values
+        y_coords = netcdf_dataset['y'].values
+        if subset is not None:
+            y_coords, x_coords = y_coords[subset[0]], x_coords[subset[1]]
+        self._set_grid(x_coords, y_coords)
+
+        # Compute WKT and PROJ once
+        self._wkt = self._create_wkt()
+        self._proj = self._create_proj()
+
+        print(f"✅ GOES Projection Authority initialized")
+        print(f"   Satellite: {self.sat_lon}° at {self.sat_height/1e6:.1f}M m")
+        print(f"   Geographic extent: {self.x_extent_rad:.6f} x {self.y_extent_rad:.6f} rad")
+        print(f"   Source channel resolution: {self.source_resolution_km} km")
+        print(f"   (Will auto-detect resolution for RGBs/other channels)")
+
+    @classmethod
+    def from_params(cls, projection, x_coords=None, y_coords=None):
+        """
+        Authority from a params() dict (e.g. archive attributes) instead of
+        a NetCDF file, optionally with the grid's x / y pixel-centre axes.
+        """
+        authority = cls.__new__(cls)
+        authority._set_params(projection)
+        authority.inv_flattening = (authority.semi_major / (authority.semi_major - authority.semi_minor)
+                                    if authority.semi_major != authority.semi_minor else 0.0)
+        authority.sweep_axis = 'x'
+        if x_coords is not None and y_coords is not None:
+            authority._set_grid(np.asarray(x_coords), np.asarray(y_coords))
+        authority._wkt = None
+        authority._proj = authority._create_proj()
+        return authority
+
+    @staticmethod
+    def read_params(proj_info):
+        """{'sat_lon', 'sat_height', 'semi_major', 'semi_minor'} of a goes_imager_projection variable."""
+        return {
+            'sat_lon': float(proj_info.longitude_of_projection_origin),
+            'sat_height': float(proj_info.perspective_point_height),
+            'semi_major': float(proj_info.semi_major_axis),
+            'semi_minor': float(proj_info.semi_minor_axis),
+        }
+
+    def _set_params(self, projection):
+        self.sat_lon = float(projection['sat_lon'])
+        self.sat_height = float(projection['sat_height'])
+        self.semi_major = float(projection['semi_major'])
+        self.semi_minor = float(projection['semi_minor'])
+
+    def _set_grid(self, x_coords, y_coords):
+        # Store geographic extent (in radians) - this is constant
+        self.x_min = float(x_coords.min())
+        self.x_max = float(x_coords.max())
+        self.y_min = float(y_coords.min())
+        self.y_max = float(y_coords.max())
+
+        # Store extent dimensions
+        self.x_extent_rad = self.x_max - self.x_min
+        self.y_extent_rad = self.y_max - self.y_min
+
+        # x_min ... y_max are the first / last pixel centres of this grid
+        self.source_shape = (len(y_coords), len(x_coords))
+
+        # Detect resolution of THIS channel (for info)
+        dx = float(x_coords[1] - x_coords[0])
+        pixel_size_rad = abs(dx)
+        if pixel_size_rad < 0.000021:
+            self.source_resolution_km = 0.5
+        elif pixel_size_rad < 0.000042:
+            self.source_resolution_km = 1.0
+        else:
+            self.source_resolution_km = 2.0
+
+    def edge_extent(self):
+        """
+        Pixel-edge scan extent {'x_min', 'x_max', 'y_min', 'y_max'} (radians)
+        of the source grid, whose x_min ... y_max are first / last pixel centres.
+        """
+        height, width = self.source_shape
+        half_x = self.x_extent_rad / (width - 1) / 2
+        half_y = self.y_extent_rad / (height - 1) / 2
+        return {'x_min': self.x_min - half_x, 'x_max': self.x_max + half_x,
+                'y_min': self.y_min - half_y, 'y_max': self.y_max + half_y}
+
+    def params(self):
+        """Projection parameters as a plain dict (picklable, storable as file attributes)."""
+        return {'sat_lon': self.sat_lon, 'sat_height': self.sat_height,
+                'semi_major': self.semi_major, 'semi_minor': self.semi_minor}
+
+    def latlon(self, x_rad, y_rad):
+        """
+        Lat/lon degrees (float32, y_rad rows x x_rad cols) of fixed-grid scan
+        angles in radians. Longitudes are wrapped into [-180, 180); points off
+        the Earth's disk come back as NaN.
+        """
+        r_eq = self.semi_major
+        r_pol = self.semi_minor
+        H = self.sat_height + r_eq
+        x, y = np.meshgrid(np.asarray(x_rad, dtype=np.float64), np.asarray(y_rad, dtype=np.float64))
+
+        cos_x, sin_x = np.cos(x), np.sin(x)
+        cos_y, sin_y = np.cos(y), np.sin(y)
+        a = sin_x ** 2 + cos_x ** 2 * (cos_y ** 2 + (r_eq / r_pol) ** 2 * sin_y ** 2)
+        b = -2.0 * H * cos_x * cos_y
+        c = H ** 2 - r_eq ** 2
+        disc = b ** 2 - 4.0 * a * c
+
+        with np.errstate(invalid='ignore'):
+            r_s = (-b - np.sqrt(disc)) / (2.0 * a)
+            s_x = r_s * cos_x * cos_y
+            s_y = -r_s * sin_x
+            s_z = r_s * cos_x * sin_y
+            lat = np.degrees(np.arctan((r_eq / r_pol) ** 2 * s_z / np.sqrt((H - s_x) ** 2 + s_y ** 2)))
+            lon = self.sat_lon - np.degrees(np.arctan(s_y / (H - s_x)))
+            # GOES-West (-137.2) full-disk edges fall west of -180
+            lon = (lon + 180.0) % 360.0 - 180.0
+
+        off_disk = disc < 0
+        lat[off_disk] = np.nan
+        lon[off_disk] = np.nan
+        return lat.astype(np.float32), lon.astype(np.float32)
+
+    def fixed_grid(self, lat, lon):
+        """
+        Fixed-grid scan angles x, y (radians) of lat/lon degrees, element-wise.
+        Points not visible from the satellite come back as NaN.
+        """
+        r_eq = self.semi_major
+        r_pol = self.semi_minor
+        H = self.sat_height + r_eq
+        lat = np.radians(np.asarray(lat, dtype=np.float64))
+        dlon = np.radians(np.asarray(lon, dtype=np.float64) - self.sat_lon)
+
+        e2 = (r_eq ** 2 - r_pol ** 2) / r_eq ** 2
+        phi_c = np.arctan((r_pol / r_eq) ** 2 * np.tan(lat))
+        r_c = r_pol / np.sqrt(1.0 - e2 * np.cos(phi_c) ** 2)
+        s_x = H - r_c * np.cos(phi_c) * np.cos(dlon)
+        s_y = -r_c * np.cos(phi_c) * np.sin(dlon)
+        s_z = r_c * np.sin(phi_c)
+
+        with np.errstate(invalid='ignore'):
+            x = np.arcsin(-s_y / np.sqrt(s_x ** 2 + s_y ** 2 + s_z ** 2))
+            y = np.arctan(s_z / s_x)
+
+        hidden = H * (H - s_x) < s_y ** 2 + (r_eq / r_pol) ** 2 * s_z ** 2
+        x[hidden] = np.nan
+        y[hidden] = np.nan
+        return x, y
+
+    def _create_wkt(self):
+        """Create WKT using SetGEOS - sweep handled in PROJ string"""
+        from osgeo import osr
+
+        srs = osr.SpatialReference()
+        srs.SetGeogCS("GRS 1980", "GRS 1980", "GRS80",
+                      self.semi_major, self.inv_flattening)
+        srs.SetGEOS(self.sat_lon, self.sat_height, 0.0, 0.0)
+
+        return srs.ExportToWkt()
+
+    def _create_proj(self):
+        """Create PROJ string with sweep parameter"""
+        proj_str = (f"+proj=geos +lon_0={self.sat_lon} "
+                    f"+h={self.sat_height} "
+                    f"+x_0=0 +y_0=0 "
+                    f"+ellps=GRS80 "
+                    f"+sweep={self.sweep_axis} "
+                    f"+units=m +no_defs")
+        return proj_str
+
+    def get_proj(self):
+        """Return the PROJ string with sweep parameter"""
+        return self._proj
+
+    def get_wkt(self):
+        """Return the WKT - same every time"""
+        if self._wkt is None:
+            self._wkt = self._create_wkt()
+        return self._wkt
+
+    def detect_resolution_from_dimensions(self, data_width, data_height):
+        """
+        Detect what resolution the data is at based on dimensions.
+        Works for channels at native resolution AND upscaled RGBs.
+        """
+        # Calculate pixel spacing from dimensions and the edge-to-edge extent
+        extent = self.edge_extent()
+        pixel_spacing_x_rad = (extent['x_max'] - extent['x_min']) / data_width
+        pixel_spacing_y_rad = (extent['y_max'] - extent['y_min']) / data_height
+
+        # Use X spacing to determine resolution
+        pixel_size_rad = abs(pixel_spacing_x_rad)
+
+        # Determine which standard resolution this matches
+        if pixel_size_rad < 0.000021:
+            detected_km = 0.5
+        elif pixel_size_rad < 0.000042:
+            detected_km = 1.0
+        else:
+            detected_km = 2.0
+
+        return detected_km, pixel_spacing_x_rad, pixel_spacing_y_rad
+
+    def get_geotransform(self, data_width, data_height):
+        """
+        Return geotransform for data of ANY resolution.
+        Auto-detects resolution from dimensions.
+        """
+        # Detect resolution from dimensions
+        detected_km, dx_rad, dy_rad = self.detect_resolution_from_dimensions(data_width, data_height)
+
+        # Convert to meters; the origin is the outer corner of the first pixel
+        extent = self.edge_extent()
+        upper_left_x = extent['x_min'] * self.sat_height
+        upper_left_y = extent['y_max'] * self.sat_height
+        pixel_size_x = dx_rad * self.sat_height
+        pixel_size_y = abs(dy_rad * self.sat_height)
+
+        if self.verbose:
+            print(f"    🔍 Detected resolution: {detected_km} km from dims {data_width}x{data_height}")
+            print(f"    📏 Pixel size: {pixel_size_x:.1f} x {pixel_size_y:.1f} meters")
+
+        return [
+            upper_left_x,
+            pixel_size_x,
+            0.0,
+            upper_left_y,
+            0.0,
+            -pixel_size_y
+        ]
+
+    def get_info_dict(self):
+        """Return info for display"""
+        return {
+            'sat_lon': self.sat_lon,
+            'sat_height': self.sat_height,
+            'source_resolution_km': self.source_resolution_km,
+            'geographic_extent_rad': (self.x_extent_rad, self.y_extent_rad),
+            'supported_resolutions': '0.5, 1.0, 2.0 km (auto-detected)'
+        }
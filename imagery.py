@@ -0,0 +1,681 @@
+"""
+Image stages of the pipeline export, all cut from one processed scan through
+the convert_geodata domain registry:
+
+- encode_pipeline_images: JPEG / WebP / PNG per domain in the app's naming
+- generate_domain_datasets: reduced per-domain H5 datasets (+ lat/lon npz)
+- generate_indexed_products: palette-indexed IR with palette sidecars
+"""
+
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import h5py
+
+from convert_geodata import (GEODATA_DOMAINS, IMAGE_LAYOUTS, cod_base_path, cod_product_name, domain_layout,
+                             domain_windows, format_cod_timestamp, geodata_frame_path, goes_fixed_grid_to_latlon,
+                             layout_axis_coords, layout_core_size, projection_params, scan_start_time,
+                             scene_domain_names)
+from precompress import precompress_outputs
+
+# Optional image encoder (JPEG / WebP / PNG)
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+# ============================================================================
+# IMAGE ENCODE STAGE
+# ============================================================================
+# Encodes RGB_PRODUCTS for every registered domain into the app's image
+# layout ({base_path}/{product}/{domain}.{product}.{timestamp}.jpg) in a
+# thread pool (Pillow releases the GIL while encoding). The .json geodata the
+# app fetches next to each image comes from generate_pipeline_geodata, run
+# with the same layout.
+
+IMAGE_FORMATS = {'jpg': 'JPEG', 'webp': 'WEBP', 'png': 'PNG'}
+
+
+def reduced_npz_name(prefix, layout, window, factor):
+    """{prefix}_{W}x{H}_reduced{N}.npz for the image render_layout draws window into."""
+    row0, row1, col0, col1 = window
+    if not layout:
+        return f"{prefix}_{col1 - col0}x{row1 - row0}_reduced{factor}.npz"
+    core_width, core_height, padding = layout_core_size(layout, row1 - row0, col1 - col0)
+    width = core_width + padding['left'] + padding['right']
+    height = core_height + padding['top'] + padding['bottom']
+    return f"{prefix}_{width}x{height}_reduced{factor}.npz"
+
+
+# Per-thread canvases and encode buffers, reused across files
+_image_buffers = threading.local()
+
+
+def _thread_buffer(name, factory):
+    buffer = getattr(_image_buffers, name, None)
+    if buffer is None:
+        buffer = factory()
+        setattr(_image_buffers, name, buffer)
+    return buffer
+
+
+def layout_source(rgb, layout=None):
+    """
+    Scan-wide resize source for render_layout: one Pillow image shared by every
+    domain window (and thread), or the array itself when there is no layout.
+    """
+    if not layout:
+        return rgb
+    source = Image.fromarray(np.ascontiguousarray(rgb))
+    source.load()
+    return source
+
+
+def render_layout(rgb, layout=None, window=None):
+    """
+    Resize an RGB window into a padded layout (see IMAGE_LAYOUTS).
+
+    rgb is an array, or a layout_source image of the whole scan with window
+    (row_start, row_stop, col_start, col_stop) resampled straight out of it,
+    no crop copy. Returns (image, core_width, core_height, padding). Without
+    a layout the window is returned as a view. The padded image lives in a
+    per-thread canvas that the next call on the same thread overwrites.
+    """
+    if window is None:
+        window = (0, rgb.shape[0], 0, rgb.shape[1])
+    row0, row1, col0, col1 = window
+    height, width = row1 - row0, col1 - col0
+    if not layout:
+        return rgb[row0:row1, col0:col1], width, height, {'left': 0, 'right': 0, 'top': 0, 'bottom': 0}
+
+    core_width, core_height, padding = layout_core_size(layout, height, width)
+    resample = Image.BOX if core_width < width else Image.BILINEAR
+    if isinstance(rgb, np.ndarray):
+        source, box = Image.fromarray(np.ascontiguousarray(rgb[row0:row1, col0:col1])), None
+    else:
+        source, box = rgb, (col0, row0, col1, row1)
+    core = source.resize((core_width, core_height), resample, box=box)
+
+    shape = (core_height + padding['top'] + padding['bottom'], core_width + padding['left'] + padding['right'], 3)
+    canvases = _thread_buffer('canvases', dict)
+    canvas = canvases.get(shape)
+    if canvas is None:
+        canvas = canvases[shape] = np.zeros(shape, dtype=np.uint8)
+    top, left = padding['top'], padding['left']
+    canvas[:top] = 0
+    canvas[top + core_height:] = 0
+    canvas[:, :left] = 0
+    canvas[:, left + core_width:] = 0
+    canvas[top:top + core_height, left:left + core_width] = np.asarray(core)
+    return canvas, core_width, core_height, padding
+
+
+def encode_image_buffer(image, fmt='jpg', quality=85, target_kb=None):
+    """
+    Encode an RGB array into the per-thread buffer; returns (buffer, size,
+    quality used). The buffer is overwritten by the next encode on the thread.
+
+    With target_kb, lossy formats search for the highest quality (30 up to
+    quality) whose output fits the target. PNG is lossless and ignores both.
+    """
+    buffer = _thread_buffer('encode', io.BytesIO)
+    picture = Image.fromarray(image)
+
+    def encode(q):
+        buffer.seek(0)
+        buffer.truncate()
+        options = {'compress_level': 6} if fmt == 'png' else {'quality': q}
+        picture.save(buffer, IMAGE_FORMATS[fmt], **options)
+        return buffer.tell()
+
+    size = encode(quality)
+    if target_kb and fmt != 'png' and size > target_kb * 1024:
+        low, high, best = 30, quality - 1, 30
+        while low <= high:
+            mid = (low + high) // 2
+            if encode(mid) <= target_kb * 1024:
+                best, low = mid, mid + 1
+            else:
+                high = mid - 1
+        quality = best
+        size = encode(quality)
+    return buffer, size, (None if fmt == 'png' else quality)
+
+
+def encode_image_file(image, path, fmt='jpg', quality=85, target_kb=None):
+    """Encode an RGB array to path (see encode_image_buffer); returns (bytes written, quality used)."""
+    buffer, size, quality = encode_image_buffer(image, fmt, quality, target_kb)
+    with open(path, 'wb') as f, buffer.getbuffer() as view:
+        f.write(view[:size])
+    return size, quality
+
+
+def _image_domain_task(task):
+    """Thread-pool worker: encode one product for one domain in every format, plus the reduced npz."""
+    results = []
+    try:
+        domain = task['domain']
+        row0, row1, col0, col1 = task['window']
+        stem = geodata_frame_path(task['output_dir'], domain, task['product'],
+                                  task['timestamp'])[:-len('.json')]
+        # An image the app cannot place is not published: its geodata must exist first
+        geodata = geodata_frame_path(task['geodata_dir'] or task['output_dir'], domain, task['product'],
+                                     task['timestamp'])
+        if not os.path.exists(geodata):
+            raise FileNotFoundError(f"no geodata for this frame at {geodata} "
+                                    f"(run generate_pipeline_geodata with the same layout first)")
+        output_dir = os.path.dirname(stem)
+        os.makedirs(output_dir, exist_ok=True)
+
+        start_time = time.time()
+        image, core_width, core_height, padding = render_layout(task['source'], task['layout'], task['window'])
+        layout_ms = (time.time() - start_time) * 1000
+
+        for fmt in task['formats']:
+            start_time = time.time()
+            path = f"{stem}.{fmt}"
+            size, quality = encode_image_file(image, path, fmt, task['quality'], task['target_kb'])
+            results.append({'success': True, 'domain': task['name'], 'file': path, 'bytes': size,
+                            'quality': quality, 'time': time.time() - start_time, 'layout_ms': layout_ms,
+                            'geodata': geodata, 'files': []})
+
+        if task['reduced']:
+            # Same layout as the sample {domain}_{W}x{H}_reduced{N}.npz inputs
+            factor = task['reduced']
+            x_coords = layout_axis_coords(task['x_axis'], col0, col1, core_width, padding['left'],
+                                          padding['right'], factor)
+            y_coords = layout_axis_coords(task['y_axis'], row0, row1, core_height, padding['top'],
+                                          padding['bottom'], factor)
+            lat, lon = goes_fixed_grid_to_latlon(x_coords, y_coords, task['projection'])
+            npz_path = os.path.join(output_dir, reduced_npz_name(domain['cod_name'], task['layout'],
+                                                                 task['window'], factor))
+            np.savez(npz_path, latitude=lat, longitude=lon, core_width=core_width, core_height=core_height,
+                     padding=np.array(padding, dtype=object), resolution_factor=factor)
+            if results:
+                results[0]['files'].append(npz_path)
+            else:
+                results.append({'success': True, 'domain': task['name'], 'file': npz_path,
+                                'bytes': os.path.getsize(npz_path), 'quality': None, 'time': 0.0,
+                                'layout_ms': layout_ms, 'geodata': geodata, 'files': []})
+    except Exception as e:
+        results.append({'success': False, 'domain': task['name'], 'product': task['product'], 'error': str(e)})
+    return results
+
+
+def encode_pipeline_images(rgb_products, coordinate_data, metadata, scene='conus', output_dir='images',
+                           domains=None, formats=('jpg',), quality=85, target_kb=None, layout=None,
+                           reduced=None, geodata_dir=None, max_workers=4):
+    """
+    Encode every RGB product for every registered domain of one scan.
+
+    formats is any of 'jpg' / 'webp' / 'png'; target_kb caps lossy file size
+    by lowering quality. layout is an IMAGE_LAYOUTS name or dict for padded
+    output (domains in DOMAIN_OUTPUT_SIZES get their app size); reduced=N
+    also writes the {domain}_{W}x{H}_reduced{N}.npz lat/lon file for that
+    layout.
+
+    The .json sidecar geoDataService.generateGeoDataUrl fetches for each
+    image is not written here: it is the frame's geodata from
+    generate_pipeline_geodata (run first, with the same layout, so its grid
+    matches the image), which sits at the image's path with .json under
+    geodata_dir (default output_dir; serve both under one root). A frame
+    whose geodata is missing fails without writing its images; each
+    result's 'geodata' names the file.
+    """
+    start_time = time.time()
+    if Image is None:
+        print("Image encode skipped: Pillow is not installed")
+        return {'success': False, 'error': "Pillow is not installed", 'results': [], 'files': []}
+    if isinstance(layout, str):
+        layout = IMAGE_LAYOUTS[layout]
+
+    projection = projection_params(coordinate_data)
+    timestamp = format_cod_timestamp(scan_start_time(metadata))
+    domains = scene_domain_names(scene, domains)
+
+    tasks = []
+    axes = {}
+    for key, rgb in (rgb_products or {}).items():
+        shape = rgb.shape[:2]
+        if shape not in axes:
+            axes[shape] = domain_windows(shape[0], shape[1], coordinate_data, projection, domains)
+        x_axis, y_axis, windows = axes[shape]
+        source = layout_source(rgb, layout)
+        for name, window in windows.items():
+            tasks.append({
+                'name': name, 'domain': GEODATA_DOMAINS[name], 'product': key, 'source': source,
+                'window': window,
+                'x_axis': x_axis, 'y_axis': y_axis, 'projection': projection, 'timestamp': timestamp,
+                'output_dir': output_dir, 'formats': formats, 'quality': quality, 'target_kb': target_kb,
+                'layout': domain_layout(name, layout), 'geodata_dir': geodata_dir, 'reduced': reduced,
+            })
+    # One reduced lat/lon file per domain and image size is enough
+    written_reduced = set()
+    for task in tasks:
+        if task['reduced']:
+            key = (task['name'], reduced_npz_name(task['name'], task['layout'], task['window'], reduced))
+            task['reduced'] = None if key in written_reduced else task['reduced']
+            written_reduced.add(key)
+
+    print(f"Encoding images: {len(tasks)} domain/product pairs x {len(formats)} formats, timestamp {timestamp}")
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for future in as_completed([executor.submit(_image_domain_task, task) for task in tasks]):
+            results += future.result()
+
+    files = []
+    for result in sorted(results, key=lambda r: r.get('file', r['domain'])):
+        if result['success']:
+            quality_note = f"q{result['quality']}" if result['quality'] else 'lossless'
+            print(f"  {result['file']}: {result['bytes'] / 1024:.1f} KB {quality_note} "
+                  f"(layout {result['layout_ms']:.0f} ms, encode {result['time'] * 1000:.0f} ms)")
+            files += [result['file']] + result.get('files', [])
+        else:
+            print(f"  {result['domain']} {result['product']}: FAILED - {result['error']}")
+
+    print(f"Images complete: {len(files)} files in {time.time() - start_time:.1f}s")
+    return {
+        'success': all(r['success'] for r in results),
+        'timestamp': timestamp,
+        'results': results,
+        'files': files,
+    }
+
+
+# ============================================================================
+# DOMAIN DATASET STAGE
+# ============================================================================
+# Derives every registered sub-domain from one processed CONUS / full-disk
+# scan instead of processing each region on its own: windows come from the
+# domain registry, each product is handed to Pillow once, and every domain is
+# resampled straight out of it, padded to its output size and reduced in a
+# thread pool. Output matches the sample inputs the app's tools read
+# (channel_c13_data_oklahoma.h5 + oklahoma_1840x1200_reduced4.npz).
+
+
+def cut_domain_views(products, coordinate_data, scene='conus', domains=None):
+    """
+    Every domain's window of every product as views of the scan arrays.
+
+    Returns name -> {key: view}; views share memory with products, so no
+    pixels are copied however many domains there are.
+    """
+    projection = projection_params(coordinate_data)
+    domains = scene_domain_names(scene, domains)
+    views = {}
+    windows_by_shape = {}
+    for key, values in (products or {}).items():
+        shape = values.shape[:2]
+        if shape not in windows_by_shape:
+            windows_by_shape[shape] = domain_windows(shape[0], shape[1], coordinate_data, projection, domains)[2]
+        for name, (row0, row1, col0, col1) in windows_by_shape[shape].items():
+            views.setdefault(name, {})[key] = values[row0:row1, col0:col1]
+    return views
+
+
+def reduce_blocks(image, factor):
+    """Block-mean downsample of an (H, W[, C]) uint8 image by factor (partial edge blocks dropped)."""
+    height, width = image.shape[0] // factor, image.shape[1] // factor
+    blocks = image[:height * factor, :width * factor].reshape(height, factor, width, factor, *image.shape[2:])
+    return (blocks.mean(axis=(1, 3), dtype=np.float32) + 0.5).astype(np.uint8)
+
+
+def _domain_dataset_task(task):
+    """Thread-pool worker: pad one product to its domain's output size and write the reduced dataset."""
+    start_time = time.time()
+    try:
+        domain = task['domain']
+        row0, row1, col0, col1 = task['window']
+        factor = task['reduced']
+        image, core_width, core_height, padding = render_layout(task['source'], task['layout'], task['window'])
+        full_height, full_width = image.shape[:2]
+        rgb_values = reduce_blocks(image, factor)
+
+        lat, lon = goes_fixed_grid_to_latlon(
+            layout_axis_coords(task['x_axis'], col0, col1, core_width, padding['left'], padding['right'], factor),
+            layout_axis_coords(task['y_axis'], row0, row1, core_height, padding['top'], padding['bottom'], factor),
+            task['projection'])
+        lat = lat[:rgb_values.shape[0], :rgb_values.shape[1]].astype(np.float32)
+        lon = lon[:rgb_values.shape[0], :rgb_values.shape[1]].astype(np.float32)
+
+        output_dir = os.path.join(task['output_dir'], cod_base_path(domain))
+        os.makedirs(output_dir, exist_ok=True)
+        product = task['product']
+        map_type = f"channel_{product.lower()}" if product.startswith('C') and product[1:].isdigit() else product
+        h5_path = os.path.join(output_dir, f"{map_type}_data_{task['name']}.h5")
+        with h5py.File(h5_path, 'w') as h5:
+            h5.create_dataset('latitude', data=lat)
+            h5.create_dataset('longitude', data=lon)
+            h5.create_dataset('rgb_values', data=rgb_values)
+            h5.attrs.update({
+                'region_name': task['name'], 'map_type': map_type, 'data_type': 'rgb',
+                'core_width': core_width, 'core_height': core_height,
+                'full_width': full_width, 'full_height': full_height,
+                'padding_left': padding['left'], 'padding_right': padding['right'],
+                'padding_top': padding['top'], 'padding_bottom': padding['bottom'],
+                'resolution_factor': factor, 'timestamp': task['timestamp'] or '',
+            })
+        files = [h5_path]
+
+        if task['write_npz']:
+            npz_name = reduced_npz_name(task['name'], task['layout'], task['window'], factor)
+            npz_path = os.path.join(output_dir, npz_name)
+            np.savez(npz_path, latitude=lat, longitude=lon, core_width=core_width, core_height=core_height,
+                     padding=np.array(padding, dtype=object), resolution_factor=factor)
+            files.append(npz_path)
+
+        return {'success': True, 'domain': task['name'], 'product': product, 'files': files,
+                'size': (full_width, full_height), 'time': time.time() - start_time}
+    except Exception as e:
+        return {'success': False, 'domain': task['name'], 'product': task['product'], 'error': str(e),
+                'time': time.time() - start_time}
+
+
+def generate_domain_datasets(rgb_products, coordinate_data, metadata, scene='conus', output_dir='domains',
+                             domains=None, layout='app', reduced=4, max_workers=4):
+    """
+    Reduced per-domain datasets for every RGB product, all cut from one scan.
+
+    Each domain is padded to its output size (DOMAIN_OUTPUT_SIZES, else the
+    layout's core width at the window's aspect), block-reduced by reduced and
+    written as {output_dir}/{base_path}/{map_type}_data_{domain}.h5 with the
+    {domain}_{W}x{H}_reduced{N}.npz lat/lon file alongside.
+    """
+    start_time = time.time()
+    if Image is None:
+        print("Domain datasets skipped: Pillow is not installed")
+        return {'success': False, 'error': "Pillow is not installed", 'results': [], 'files': []}
+    if isinstance(layout, str):
+        layout = IMAGE_LAYOUTS[layout]
+
+    projection = projection_params(coordinate_data)
+    timestamp = format_cod_timestamp(scan_start_time(metadata))
+    domains = scene_domain_names(scene, domains)
+
+    tasks = []
+    axes = {}
+    written_npz = set()
+    for key, rgb in (rgb_products or {}).items():
+        shape = rgb.shape[:2]
+        if shape not in axes:
+            axes[shape] = domain_windows(shape[0], shape[1], coordinate_data, projection, domains)
+        x_axis, y_axis, windows = axes[shape]
+        source = layout_source(rgb, layout)
+        for name, window in windows.items():
+            # The npz name carries only the output size, so products at other
+            # resolutions of the same domain would rewrite the same file
+            domain_shape = domain_layout(name, layout)
+            npz_path = os.path.join(cod_base_path(GEODATA_DOMAINS[name]),
+                                    reduced_npz_name(name, domain_shape, window, reduced))
+            tasks.append({
+                'name': name, 'domain': GEODATA_DOMAINS[name], 'product': key, 'source': source,
+                'window': window, 'x_axis': x_axis, 'y_axis': y_axis, 'projection': projection,
+                'layout': domain_shape, 'reduced': reduced, 'timestamp': timestamp,
+                'output_dir': output_dir, 'write_npz': npz_path not in written_npz,
+            })
+            written_npz.add(npz_path)
+
+    print(f"Domain datasets: {len({task['name'] for task in tasks})} domains x {len(rgb_products or {})} products "
+          f"from one {scene} scan, timestamp {timestamp}")
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for future in as_completed([executor.submit(_domain_dataset_task, task) for task in tasks]):
+            results.append(future.result())
+
+    files = []
+    for result in sorted(results, key=lambda r: (r['domain'], r['product'])):
+        if result['success']:
+            width, height = result['size']
+            print(f"  {result['domain']} {result['product']}: {width}x{height} in {result['time'] * 1000:.0f} ms")
+            files += result['files']
+        else:
+            print(f"  {result['domain']} {result['product']}: FAILED - {result['error']}")
+
+    print(f"Domain datasets complete: {len(files)} files in {time.time() - start_time:.1f}s")
+    return {
+        'success': all(r['success'] for r in results),
+        'timestamp': timestamp,
+        'results': results,
+        'files': files,
+    }
+
+
+# ============================================================================
+# PALETTE-INDEXED DELIVERY
+# ============================================================================
+# IR channels are a uint8 enhancement index looked up in a 256-entry colour
+# table (UltraFastIRProcessor._create_color_lut). Shipping the index as an
+# 8-bit palette PNG (or a raw uint8 tile) plus the palette once per product
+# is about a third of the bytes of the colourised RGB frame. Palette PNGs
+# decode to colour in any image view; raw tiles are index-only and need the
+# {domain}.{product}.palette.json sidecar to colourise.
+
+INDEXED_FORMATS = ('png', 'raw')
+
+
+def temperature_index(bt_kelvin, temp_celsius, enhanced):
+    """
+    Enhancement index of brightness temperatures from a precomputed LUT.
+
+    temp_celsius / enhanced are UltraFastIRProcessor's temperature LUT
+    (uniform grid). Out-of-range temperatures clamp to the ends; NaN maps to 0.
+    """
+    start = float(temp_celsius[0])
+    scale = (len(temp_celsius) - 1) / (float(temp_celsius[-1]) - start)
+    position = (np.asarray(bt_kelvin, dtype=np.float32) - np.float32(273.15 + start)) * np.float32(scale)
+    np.nan_to_num(position, copy=False, nan=0.0)
+    np.clip(position + 0.5, 0, len(temp_celsius) - 1, out=position)
+    return np.asarray(enhanced, dtype=np.uint8)[position.astype(np.intp)]
+
+
+def channel_index(product, palette):
+    """
+    uint8 enhancement index of one CHANNELS entry, or None.
+
+    Uses 'enhanced' when it is already the index (Numba enhancement path);
+    when it was colourised directly (ultra-fast LUT path) the index is
+    rebuilt from calibrated brightness temperature with the palette entry's
+    temperature LUT.
+    """
+    enhanced = product.get('enhanced')
+    if enhanced is not None and enhanced.ndim == 2 and enhanced.dtype == np.uint8:
+        return enhanced
+    if product.get('calibrated') is not None and palette.get('temp_celsius') is not None:
+        return temperature_index(product['calibrated'], palette['temp_celsius'], palette['enhanced'])
+    return None
+
+
+def palette_sidecar(channel, palette, temp_celsius=None, enhanced=None):
+    """
+    Palette sidecar dict: the 256 [r, g, b] entries, plus the temperature
+    range (C) each index covers when the temperature LUT is given.
+    """
+    colors = np.asarray(palette, dtype=np.uint8).reshape(256, 3)
+    sidecar = {'channel': channel, 'entries': 256, 'palette': colors.tolist()}
+    if temp_celsius is not None:
+        enhanced = np.asarray(enhanced, dtype=np.uint8)
+        ranges = [None] * 256
+        low = np.full(256, np.inf)
+        high = np.full(256, -np.inf)
+        np.minimum.at(low, enhanced, temp_celsius)
+        np.maximum.at(high, enhanced, temp_celsius)
+        for value in np.flatnonzero(np.isfinite(low)):
+            ranges[value] = [round(float(low[value]), 2), round(float(high[value]), 2)]
+        sidecar['temperature_c'] = ranges
+    return sidecar
+
+
+def palette_from_sidecar(sidecar, samples=30000):
+    """
+    Inverse of palette_sidecar: {'palette'} plus, when the sidecar has
+    temperature ranges, a temperature LUT ('temp_celsius' / 'enhanced') for
+    temperature_index.
+    """
+    palette = {'palette': np.asarray(sidecar['palette'], dtype=np.uint8).reshape(256, 3)}
+    ranges = sidecar.get('temperature_c')
+    if not ranges or not any(ranges):
+        return palette
+    known = [(value, r[0], r[1]) for value, r in enumerate(ranges) if r]
+    temp_celsius = np.linspace(min(low for _, low, _ in known), max(high for _, _, high in known), samples)
+    enhanced = np.zeros(samples, dtype=np.uint8)
+    for value, low, high in sorted(known, key=lambda item: item[1]):
+        enhanced[(temp_celsius >= low - 0.005) & (temp_celsius <= high + 0.005)] = value
+    palette.update(temp_celsius=temp_celsius, enhanced=enhanced)
+    return palette
+
+
+def write_palette_sidecar(path, sidecar):
+    """Write a palette sidecar unless the file already holds it; returns True when written."""
+    payload = json.dumps(sidecar, separators=(',', ':')).encode()
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == payload:
+                return False
+    with open(path + '.tmp', 'wb') as f:
+        f.write(payload)
+    os.replace(path + '.tmp', path)
+    return True
+
+
+def encode_indexed_file(index, palette, path, fmt='png'):
+    """
+    Write a uint8 index array as an 8-bit palette PNG or a raw uint8 tile
+    (row-major, no header; the domain's palette sidecar records width and
+    height). Returns bytes written.
+    """
+    index = np.ascontiguousarray(index, dtype=np.uint8)
+    if fmt == 'raw':
+        with open(path, 'wb') as f:
+            f.write(index.data)
+        return index.nbytes
+
+    buffer = _thread_buffer('encode', io.BytesIO)
+    buffer.seek(0)
+    buffer.truncate()
+    picture = Image.fromarray(index, 'L')
+    picture.putpalette(np.asarray(palette, dtype=np.uint8).tobytes())
+    picture.save(buffer, 'PNG', compress_level=6)
+    size = buffer.tell()
+    with open(path, 'wb') as f, buffer.getbuffer() as view:
+        f.write(view[:size])
+    return size
+
+
+def _indexed_domain_task(task):
+    """Thread-pool worker: write one channel's index for one domain in every format."""
+    results = []
+    try:
+        domain = task['domain']
+        row0, row1, col0, col1 = task['window']
+        product_name = cod_product_name(task['product'])
+        output_dir = os.path.join(task['output_dir'], cod_base_path(domain), product_name)
+        os.makedirs(output_dir, exist_ok=True)
+        stem = os.path.join(output_dir, f"{domain['cod_name']}.{product_name}")
+        index = task['index'][row0:row1, col0:col1]
+
+        # The sidecar also carries the grid, so headerless .u8 tiles can be decoded
+        files = []
+        palette_path = f"{stem}.palette.json"
+        sidecar = dict(task['sidecar'], width=index.shape[1], height=index.shape[0],
+                       window=[int(row0), int(row1), int(col0), int(col1)], raw_layout='uint8 row-major')
+        if write_palette_sidecar(palette_path, sidecar):
+            files.append(palette_path)
+
+        for fmt in task['formats']:
+            start_time = time.time()
+            path = f"{stem}.{task['timestamp'] or 'latest'}.{'png' if fmt == 'png' else 'u8'}"
+            size = encode_indexed_file(index, task['palette'], path, fmt)
+            result = {'success': True, 'domain': task['name'], 'product': task['product'], 'file': path,
+                      'bytes': size, 'shape': index.shape, 'time': time.time() - start_time,
+                      'files': files}
+            if task['compare']:
+                # What the colourised frame of the same window costs as RGB PNG
+                result['rgb_bytes'] = encode_image_buffer(task['palette'][index], 'png')[1]
+            results.append(result)
+            files = []
+    except Exception as e:
+        results.append({'success': False, 'domain': task['name'], 'product': task['product'], 'error': str(e)})
+    return results
+
+
+def generate_indexed_products(channels, coordinate_data, metadata, palettes, scene='conus',
+                              output_dir='indexed', domains=None, formats=('png',), compare=False,
+                              precompress=False, max_workers=4):
+    """
+    Palette-indexed delivery of IR channels for every registered domain.
+
+    palettes maps channel code -> {'palette': (256, 3) uint8, and optionally
+    'temp_celsius' / 'enhanced' (the temperature LUT)}; channels without a
+    palette are skipped. formats is any of 'png' (8-bit palette PNG) / 'raw'
+    (uint8 .u8 tile). Writes {base_path}/{product}/{domain}.{product}.{timestamp}.png
+    and the {domain}.{product}.palette.json sidecar with the domain's width,
+    height and window (rewritten only when the palette or grid changes). compare also encodes the colourised RGB PNG in memory
+    to report the saving. precompress writes gzip/brotli/zstd variants (raw
+    tiles are meant to be served compressed) and output_dir's manifest.
+    """
+    start_time = time.time()
+    if 'png' in formats and Image is None:
+        print("Indexed export skipped: Pillow is not installed")
+        return {'success': False, 'error': "Pillow is not installed", 'results': [], 'files': []}
+
+    projection = projection_params(coordinate_data)
+    timestamp = format_cod_timestamp(scan_start_time(metadata))
+    domains = scene_domain_names(scene, domains)
+
+    tasks = []
+    axes = {}
+    for key, product in (channels or {}).items():
+        palette = (palettes or {}).get(key)
+        if palette is None or not isinstance(product, dict):
+            continue
+        index = channel_index(product, palette)
+        if index is None:
+            continue
+        colors = np.asarray(palette['palette'], dtype=np.uint8).reshape(256, 3)
+        sidecar = palette_sidecar(key, colors, palette.get('temp_celsius'), palette.get('enhanced'))
+        shape = index.shape
+        if shape not in axes:
+            axes[shape] = domain_windows(shape[0], shape[1], coordinate_data, projection, domains)
+        for name, window in axes[shape][2].items():
+            tasks.append({
+                'name': name, 'domain': GEODATA_DOMAINS[name], 'product': key, 'index': index,
+                'window': window, 'palette': colors, 'sidecar': sidecar, 'timestamp': timestamp,
+                'output_dir': output_dir, 'formats': formats, 'compare': compare,
+            })
+
+    print(f"Writing indexed products: {len(tasks)} domain/channel pairs x {len(formats)} formats, "
+          f"timestamp {timestamp}")
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for future in as_completed([executor.submit(_indexed_domain_task, task) for task in tasks]):
+            results += future.result()
+
+    files = []
+    for result in sorted(results, key=lambda r: r.get('file', r['domain'])):
+        if result['success']:
+            saving = f", RGB PNG {result['rgb_bytes'] / 1024:.1f} KB ({result['rgb_bytes'] / result['bytes']:.1f}x)" \
+                if 'rgb_bytes' in result else ''
+            print(f"  {result['file']}: {result['bytes'] / 1024:.1f} KB{saving}")
+            files += [result['file']] + result['files']
+        else:
+            print(f"  {result['domain']} {result['product']}: FAILED - {result['error']}")
+
+    if precompress and files:
+        precompress_outputs(files, output_dir, max_workers=max_workers)
+
+    print(f"Indexed products complete: {len(files)} files in {time.time() - start_time:.1f}s")
+    return {
+        'success': all(r['success'] for r in results),
+        'timestamp': timestamp,
+        'results': results,
+        'files': files,
+    }
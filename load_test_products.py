@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Load test for product_server.py (or any HTTP server with the same layout).
+
+Usage:
+    python load_test_products.py http://127.0.0.1:8080/data/satellite --root images
+    python load_test_products.py http://127.0.0.1:8080/data/satellite --root images --conditional
+    python load_test_products.py http://127.0.0.1:8080/data/satellite --root images --range 65536 -c 64
+
+Keep-alive connections request the files under --root round-robin for
+--duration seconds and report requests/s, throughput and latency
+percentiles. --conditional revalidates with the ETag from each file's first
+response (the 304 path the app hits when polling for new frames).
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+SKIP_SUFFIXES = ('.gz', '.br', '.zst', '.tmp')
+
+
+def collect_paths(root, prefix):
+    """URL paths of every servable file under root (variants excluded)."""
+    paths = []
+    for directory, _, names in os.walk(root):
+        for name in sorted(names):
+            if name.endswith(SKIP_SUFFIXES):
+                continue
+            rel_path = os.path.relpath(os.path.join(directory, name), root).replace(os.sep, '/')
+            paths.append(f"{prefix}/{quote(rel_path)}")
+    return sorted(paths)
+
+
+async def read_response(reader):
+    """(status, headers, body length) of one response."""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length:
+        await reader.readexactly(length)
+    return status, headers, length
+
+
+async def worker(host, port, paths, offset, deadline, options, etags, latencies, counters):
+    reader = writer = None
+    request_index = offset
+    while time.perf_counter() < deadline:
+        path = paths[request_index % len(paths)]
+        request_index += 1
+        lines = [f"GET {path} HTTP/1.1", f"Host: {host}:{port}"]
+        if options['accept_encoding']:
+            lines.append(f"Accept-Encoding: {options['accept_encoding']}")
+        if options['range']:
+            lines.append(f"Range: bytes=0-{options['range'] - 1}")
+        if options['conditional'] and path in etags:
+            lines.append(f"If-None-Match: {etags[path]}")
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+                counters['connections'] += 1
+            writer.write(request)
+            status, headers, length = await read_response(reader)
+        except (OSError, asyncio.IncompleteReadError) as e:
+            counters['errors'] += 1
+            counters['last_error'] = repr(e)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        latencies.append(time.perf_counter() - start)
+        counters['bytes'] += length
+        counters['status'][status] = counters['status'].get(status, 0) + 1
+        if 'etag' in headers:
+            etags.setdefault(path, headers['etag'])
+        if headers.get('connection', '').lower() == 'close':
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load_test(base_url, paths, concurrency=16, duration=10.0, conditional=False,
+                        byte_range=None, accept_encoding=None):
+    """
+    Hit paths from concurrency keep-alive connections for duration seconds.
+
+    Returns {'requests', 'errors', 'requests_per_s', 'mb_per_s', 'p50_ms',
+    'p90_ms', 'p99_ms', 'max_ms', 'status'}.
+    """
+    url = urlsplit(base_url)
+    host, port = url.hostname, url.port or 80
+    options = {'conditional': conditional, 'range': byte_range, 'accept_encoding': accept_encoding}
+    etags = {}
+    latencies = []
+    counters = {'bytes': 0, 'errors': 0, 'connections': 0, 'status': {}, 'last_error': None}
+
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*[
+        worker(host, port, paths, i * len(paths) // concurrency, deadline, options, etags, latencies, counters)
+        for i in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    latency_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'requests': len(latencies),
+        'errors': counters['errors'],
+        'last_error': counters['last_error'],
+        'connections': counters['connections'],
+        'requests_per_s': len(latencies) / elapsed,
+        'mb_per_s': counters['bytes'] / elapsed / 1024 / 1024,
+        'p50_ms': float(np.percentile(latency_ms, 50)),
+        'p90_ms': float(np.percentile(latency_ms, 90)),
+        'p99_ms': float(np.percentile(latency_ms, 99)),
+        'max_ms': float(latency_ms.max()),
+        'status': dict(sorted(counters['status'].items())),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure requests/s and latency of the product server.")
+    parser.add_argument('base_url', help="URL the output root is served at, e.g. http://127.0.0.1:8080/data/satellite")
+    parser.add_argument('--root', required=True, help="local output directory whose files are requested")
+    parser.add_argument('-c', '--concurrency', type=int, default=16)
+    parser.add_argument('-d', '--duration', type=float, default=10.0, help="seconds")
+    parser.add_argument('--conditional', action='store_true', help="revalidate with If-None-Match")
+    parser.add_argument('--range', type=int, help="request only the first N bytes")
+    parser.add_argument('--accept-encoding', help="e.g. 'br, gzip'")
+    args = parser.parse_args()
+
+    prefix = urlsplit(args.base_url).path.rstrip('/')
+    paths = collect_paths(args.root, prefix)
+    if not paths:
+        raise SystemExit(f"No files under {args.root}")
+
+    print(f"{len(paths)} files, {args.concurrency} connections, {args.duration:.0f}s")
+    result = asyncio.run(run_load_test(args.base_url, paths, args.concurrency, args.duration,
+                                       args.conditional, args.range, args.accept_encoding))
+    print(f"  {result['requests']} requests ({result['errors']} errors, {result['connections']} connections)")
+    print(f"  {result['requests_per_s']:.0f} req/s, {result['mb_per_s']:.1f} MB/s")
+    print(f"  latency p50 {result['p50_ms']:.2f} ms, p90 {result['p90_ms']:.2f} ms, "
+          f"p99 {result['p99_ms']:.2f} ms, max {result['max_ms']:.2f} ms")
+    print(f"  status {result['status']}")
+    if result['last_error']:
+        print(f"  last error: {result['last_error']}")
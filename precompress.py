@@ -0,0 +1,127 @@
+"""
+Pre-compressed variants of pipeline outputs: gzip / brotli / zstd copies next
+to each file plus a manifest of sizes and content hashes, so a static server
+(product_server) can pick the matching Content-Encoding without compressing
+per request.
+
+Standard library only; brotli and zstandard are used when installed.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Optional encoders for pre-compressed variants (gzip is always available)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+PRECOMPRESS_MANIFEST = 'precompressed.json'
+COMPRESSED_EXTENSIONS = {'gzip': '.gz', 'br': '.br', 'zstd': '.zst'}
+
+
+def available_encodings():
+    """Content-Encodings that can be produced here (brotli / zstd are optional)."""
+    encodings = ['gzip']
+    if brotli is not None:
+        encodings.append('br')
+    if zstandard is not None:
+        encodings.append('zstd')
+    return encodings
+
+
+def compress_bytes(data, encoding):
+    """Compress data at the highest practical level for encoding (deterministic output)."""
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=19).compress(data)
+    raise ValueError(f"Unknown content encoding: {encoding}")
+
+
+def _precompress_file(path, rel_path, encodings, previous):
+    """Write the variants of one file; reuse them if the manifest hash still matches."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    # Reusable only if the same bytes were already tried with every requested encoding
+    if previous and previous.get('sha256') == digest and set(encodings) <= set(previous.get('encodings', [])) \
+            and all(os.path.exists(path + COMPRESSED_EXTENSIONS[name]) for name in previous['variants']):
+        return rel_path, previous, False
+
+    entry = {'bytes': len(data), 'sha256': digest, 'encodings': sorted(encodings), 'variants': {}}
+    for encoding in encodings:
+        compressed = compress_bytes(data, encoding)
+        variant_path = path + COMPRESSED_EXTENSIONS[encoding]
+        # Only keep variants that are actually smaller than the original
+        if len(compressed) >= len(data):
+            if os.path.exists(variant_path):
+                os.remove(variant_path)
+            continue
+        with open(variant_path, 'wb') as f:
+            f.write(compressed)
+        entry['variants'][encoding] = {
+            'file': rel_path + COMPRESSED_EXTENSIONS[encoding],
+            'bytes': len(compressed),
+            'sha256': hashlib.sha256(compressed).hexdigest(),
+        }
+    return rel_path, entry, True
+
+
+def precompress_outputs(paths, root, encodings=None, max_workers=None):
+    """
+    Write pre-compressed variants of paths and update {root}/precompressed.json.
+
+    The manifest maps each file (relative to root, '/' separated) to its size,
+    sha256, the encodings tried and {encoding: {file, bytes, sha256}} of the
+    variants kept. Files are compressed in a thread pool (zlib / brotli / zstd
+    release the GIL); unchanged files already tried with every requested
+    encoding keep their existing variants. Returns the manifest.
+    """
+    start_time = time.time()
+    encodings = encodings or available_encodings()
+    manifest_path = os.path.join(root, PRECOMPRESS_MANIFEST)
+    manifest = {'files': {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    jobs = []
+    for path in paths:
+        rel_path = os.path.relpath(path, root).replace(os.sep, '/')
+        if rel_path == PRECOMPRESS_MANIFEST:
+            continue
+        jobs.append((path, rel_path, encodings, manifest['files'].get(rel_path)))
+
+    compressed = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for future in as_completed([executor.submit(_precompress_file, *job) for job in jobs]):
+            rel_path, entry, written = future.result()
+            manifest['files'][rel_path] = entry
+            compressed += written
+
+    manifest['encodings'] = sorted(set(manifest.get('encodings', [])) | set(encodings))
+    manifest['files'] = dict(sorted(manifest['files'].items()))
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    original = sum(manifest['files'][rel]['bytes'] for _, rel, _, _ in jobs)
+    print(f"Pre-compressed {compressed} of {len(jobs)} files ({', '.join(encodings)}) "
+          f"in {time.time() - start_time:.1f}s")
+    for encoding in encodings:
+        sizes = [manifest['files'][rel]['variants'].get(encoding, {}).get('bytes',
+                                                                          manifest['files'][rel]['bytes'])
+                 for _, rel, _, _ in jobs]
+        print(f"  {encoding:<5} {original / 1024:.1f} KB -> {sum(sizes) / 1024:.1f} KB")
+    return manifest
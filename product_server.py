@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Local HTTP server for pipeline outputs (images, .json / .bin geodata, tiles,
+loops), mounted under the same paths imageService / geoDataService build
+their URLs from.
+
+Usage:
+    python product_server.py images                    # http://127.0.0.1:8080/data/satellite/...
+    python product_server.py images --port 9000 --cache-mb 256
+    python load_test_products.py http://127.0.0.1:8080/data/satellite --root images
+
+Responses carry strong ETags (sha256 of the bytes served) and honour
+If-None-Match / If-Modified-Since / If-Range and single byte ranges. Files up
+to --max-entry-kb are kept in a byte-bounded LRU; larger files go out with
+sendfile. Pre-compressed variants next to a file (precompress.py, e.g.
+convert_geodata --precompress: .br / .zst / .gz) are served when
+Accept-Encoding allows. Standard library only.
+"""
+
+import argparse
+import asyncio
+import email.utils
+import hashlib
+import mimetypes
+import os
+import time
+from collections import OrderedDict
+from urllib.parse import unquote, urlsplit
+
+from precompress import COMPRESSED_EXTENSIONS
+
+SERVER_NAME = 'sat-weather-products/1'
+DEFAULT_PREFIX = '/data/satellite'
+MAX_HEADER_BYTES = 16384
+HASH_BLOCK = 1 << 20
+
+# Preferred first when the client accepts several
+ENCODING_PREFERENCE = [(encoding, COMPRESSED_EXTENSIONS[encoding]) for encoding in ('br', 'zstd', 'gzip')]
+
+CONTENT_TYPES = {
+    '.json': 'application/json',
+    '.bin': 'application/octet-stream',
+    '.u8': 'application/octet-stream',
+    '.npz': 'application/octet-stream',
+    '.h5': 'application/x-hdf5',
+    '.webp': 'image/webp',
+    '.tif': 'image/tiff',
+}
+
+STATUS_TEXT = {
+    200: 'OK', 206: 'Partial Content', 304: 'Not Modified', 400: 'Bad Request',
+    404: 'Not Found', 405: 'Method Not Allowed', 416: 'Range Not Satisfiable',
+    500: 'Internal Server Error',
+}
+
+
+# ============================================================================
+# CACHES
+# ============================================================================
+
+class ByteLRU:
+    """
+    LRU of file bytes bounded by total size, keyed by path and validated by
+    a version (inode, mtime_ns, size) so a rewritten file is never served
+    stale. Only used from the event loop thread.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, version):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, version, value, size):
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[2]
+        self._entries[key] = (version, value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def file_version(stat):
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def read_and_hash(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    return data, hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ============================================================================
+# HTTP HELPERS
+# ============================================================================
+
+def accepted_encodings(header):
+    """Content codings an Accept-Encoding header allows (q > 0)."""
+    accepted = set()
+    for item in header.split(','):
+        token, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if token and quality > 0:
+            accepted.add(token.strip().lower())
+    return accepted
+
+
+def parse_range(header, size):
+    """
+    (start, end) of a single 'bytes=' range, 'unsatisfiable', or None to
+    ignore the header (malformed or multiple ranges: the full body is sent).
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, _, last = spec.strip().partition('-')
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0 or size == 0:
+                return 'unsatisfiable'
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        return 'unsatisfiable'
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def etag_matches(header, etag):
+    """If-None-Match comparison (weak, per RFC 9110)."""
+    if header.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+
+def content_type(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in CONTENT_TYPES:
+        return CONTENT_TYPES[extension]
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+class ProductServer:
+    """
+    Serves files under root at prefix. cache_bytes bounds the in-memory LRU;
+    files above max_entry_bytes are streamed with sendfile and only their
+    ETag is cached.
+    """
+
+    def __init__(self, root, prefix=DEFAULT_PREFIX, cache_bytes=128 * 1024 * 1024,
+                 max_entry_bytes=4 * 1024 * 1024, cache_control='no-cache'):
+        self.root = os.path.realpath(root)
+        self.prefix = '/' + prefix.strip('/') if prefix.strip('/') else ''
+        self.max_entry_bytes = max_entry_bytes
+        self.cache_control = cache_control
+        self.cache = ByteLRU(cache_bytes)
+        self.etags = ByteLRU(1 << 16)  # large files: version -> etag, counted as 1 each
+        self.stats = {'requests': 0, 'bytes_sent': 0, 'sendfile': 0, 'status': {}}
+        self._date = (0, '')
+
+    # -- request parsing -----------------------------------------------------
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                parts = lines[0].split()
+                if len(parts) != 3 or not parts[2].startswith('HTTP/1.'):
+                    await self.send_error(writer, 400, False)
+                    break
+                method, target, version = parts
+                headers = {}
+                for line in lines[1:]:
+                    if line:
+                        name, _, value = line.partition(':')
+                        headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+                if 'content-length' in headers or 'transfer-encoding' in headers:
+                    # GET / HEAD only; don't try to skip request bodies
+                    keep_alive = False
+                await self.respond(writer, method, target, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        except Exception as e:
+            print(f"Connection error: {e}")
+        finally:
+            writer.close()
+
+    def resolve(self, target):
+        """Filesystem path of a request target under root, or None."""
+        path = unquote(urlsplit(target).path)
+        if self.prefix:
+            if path != self.prefix and not path.startswith(self.prefix + '/'):
+                return None
+            path = path[len(self.prefix):]
+        full_path = os.path.realpath(os.path.join(self.root, path.lstrip('/')))
+        if not full_path.startswith(self.root + os.sep) or not os.path.isfile(full_path):
+            return None
+        return full_path
+
+    def select_variant(self, path, stat, headers):
+        """(path, stat, encoding) of the representation to send."""
+        accepted = accepted_encodings(headers.get('accept-encoding', ''))
+        for encoding, extension in ENCODING_PREFERENCE:
+            if encoding not in accepted:
+                continue
+            try:
+                variant_stat = os.stat(path + extension)
+            except OSError:
+                continue
+            if variant_stat.st_mtime_ns >= stat.st_mtime_ns:
+                return path + extension, variant_stat, encoding
+        return path, stat, None
+
+    # -- responses -----------------------------------------------------------
+
+    def http_date(self):
+        now = int(time.time())
+        if self._date[0] != now:
+            self._date = (now, email.utils.formatdate(now, usegmt=True))
+        return self._date[1]
+
+    def write_head(self, writer, status, headers, keep_alive):
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}",
+                 f"Date: {self.http_date()}", f"Server: {SERVER_NAME}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        if not keep_alive:
+            lines.append('Connection: close')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        self.stats['requests'] += 1
+        self.stats['status'][status] = self.stats['status'].get(status, 0) + 1
+
+    async def send_error(self, writer, status, keep_alive, extra=None):
+        body = f"{status} {STATUS_TEXT[status]}\n".encode()
+        headers = {'Content-Type': 'text/plain', 'Content-Length': len(body), **(extra or {})}
+        self.write_head(writer, status, headers, keep_alive)
+        writer.write(body)
+        await writer.drain()
+
+    async def representation(self, path, stat):
+        """(etag, bytes or None); small files come from / go into the LRU."""
+        version = file_version(stat)
+        if stat.st_size <= self.max_entry_bytes:
+            entry = self.cache.get(path, version)
+            if entry is None:
+                data, digest = await asyncio.to_thread(read_and_hash, path)
+                entry = (f'"{digest[:32]}"', data)
+                self.cache.put(path, version, entry, len(data))
+            return entry
+        etag = self.etags.get(path, version)
+        if etag is None:
+            etag = f'"{(await asyncio.to_thread(hash_file, path))[:32]}"'
+            self.etags.put(path, version, etag, 1)
+        return etag, None
+
+    async def respond(self, writer, method, target, headers, keep_alive):
+        if method not in ('GET', 'HEAD'):
+            await self.send_error(writer, 405, keep_alive, {'Allow': 'GET, HEAD'})
+            return
+        path = self.resolve(target)
+        if path is None:
+            await self.send_error(writer, 404, keep_alive)
+            return
+        try:
+            base_stat = os.stat(path)
+            path, stat, encoding = self.select_variant(path, base_stat, headers)
+            etag, data = await self.representation(path, stat)
+        except OSError:
+            await self.send_error(writer, 404, keep_alive)
+            return
+
+        size = stat.st_size
+        modified = int(stat.st_mtime)
+        response = {
+            'ETag': etag,
+            'Last-Modified': email.utils.formatdate(modified, usegmt=True),
+            'Cache-Control': self.cache_control,
+            'Vary': 'Accept-Encoding',
+            'Access-Control-Allow-Origin': '*',
+        }
+
+        if_none_match = headers.get('if-none-match')
+        if if_none_match is not None:
+            not_modified = etag_matches(if_none_match, etag)
+        else:
+            since = headers.get('if-modified-since')
+            since = email.utils.parsedate_tz(since) if since else None
+            not_modified = since is not None and modified <= email.utils.mktime_tz(since)
+        if not_modified:
+            self.write_head(writer, 304, response, keep_alive)
+            await writer.drain()
+            return
+
+        status, start, end = 200, 0, size - 1
+        byte_range = headers.get('range')
+        if byte_range and headers.get('if-range', etag) == etag:
+            byte_range = parse_range(byte_range, size)
+            if byte_range == 'unsatisfiable':
+                await self.send_error(writer, 416, keep_alive, {'Content-Range': f"bytes */{size}"})
+                return
+            if byte_range:
+                status, (start, end) = 206, byte_range
+                response['Content-Range'] = f"bytes {start}-{end}/{size}"
+
+        response['Content-Type'] = content_type(path[:-len(COMPRESSED_EXTENSIONS[encoding])] if encoding else path)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Content-Length'] = end - start + 1
+        response['Accept-Ranges'] = 'bytes'
+        self.write_head(writer, status, response, keep_alive)
+        if method == 'HEAD' or end < start:
+            await writer.drain()
+            return
+
+        if data is not None:
+            writer.write(memoryview(data)[start:end + 1])
+            await writer.drain()
+        else:
+            await writer.drain()
+            with open(path, 'rb') as f:
+                await asyncio.get_running_loop().sendfile(writer.transport, f, start, end - start + 1)
+            self.stats['sendfile'] += 1
+        self.stats['bytes_sent'] += end - start + 1
+
+    def summary(self):
+        cache = self.cache
+        return (f"{self.stats['requests']} requests, {self.stats['bytes_sent'] / 1024 / 1024:.1f} MB sent, "
+                f"status {dict(sorted(self.stats['status'].items()))}, "
+                f"LRU {len(cache)} files / {cache.bytes / 1024 / 1024:.1f} MB "
+                f"({cache.hits} hits, {cache.misses} misses), {self.stats['sendfile']} sendfile")
+
+
+async def serve(root, host='127.0.0.1', port=8080, **options):
+    """Run a ProductServer until cancelled."""
+    product_server = ProductServer(root, **options)
+    server = await asyncio.start_server(product_server.handle_connection, host, port,
+                                        limit=MAX_HEADER_BYTES)
+    print(f"Serving {product_server.root} at http://{host}:{port}{product_server.prefix}/")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        print(product_server.summary())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve pipeline outputs over HTTP with ETags, ranges and an LRU.")
+    parser.add_argument('root', help="output directory (e.g. the image stage's output_dir)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--prefix', default=DEFAULT_PREFIX, help="URL path the root is mounted at")
+    parser.add_argument('--cache-mb', type=float, default=128, help="in-memory LRU size")
+    parser.add_argument('--max-entry-kb', type=float, default=4096,
+                        help="larger files are sent with sendfile instead of cached")
+    parser.add_argument('--cache-control', default='no-cache')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.root, args.host, args.port, prefix=args.prefix,
+                          cache_bytes=int(args.cache_mb * 1024 * 1024),
+                          max_entry_bytes=int(args.max_entry_kb * 1024),
+                          cache_control=args.cache_control))
+    except KeyboardInterrupt:
+        pass
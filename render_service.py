@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+"""
+On-demand render service: custom domains (e.g. from the app's
+DomainMapSelector) rendered from the latest product archive without a
+batch run.
+
+Usage:
+    python render_service.py products_conus.h5 --root images --palettes indexed
+    curl 'http://127.0.0.1:8080/data/satellite/render?product=C13&bounds=33,38,-100,-93&width=800'
+    python render_service.py products_conus.h5 --timeseries timeseries_conus.h5
+    curl 'http://127.0.0.1:8080/data/satellite/point?lat=35.2&lon=-97.4&products=C13,C08&frames=12'
+    curl 'http://127.0.0.1:8080/data/satellite/stats?product=C13&polygon=33,-100;38,-100;36,-93'
+
+The archive written by archive.write_product_archive is loaded once
+and kept in memory with its scan-angle axes and palettes, and reloaded when
+the file changes. A render is (product, window, width, format): the window
+is given as lat/lon bounds (minLat,maxLat,minLon,maxLon) or pixel rows /
+cols. Identical concurrent requests share one render, and results are kept
+in a byte-bounded LRU. /stats returns region statistics (mean / std / min /
+max / cold-cloud fractions) of a window, bounds box or lat/lon polygon from
+summed-area tables built once per archive. With --timeseries, /point answers crosshair
+queries (values at lat/lon across frames) from the time-series archive via
+archive.PointSeriesQuery. Everything else under --root is served as
+static files by product_server.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import h5py
+
+from archive import (COLD_CLOUD_THRESHOLDS_C, PointSeriesQuery, build_region_tables, latlon_polygon_vertices,
+                     pixel_edge_extent, polygon_stats, rect_stats)
+from convert_geodata import grid_to_list, latlon_to_goes_fixed_grid, pixel_axis_coords
+from imagery import IMAGE_FORMATS, Image, encode_image_buffer, palette_from_sidecar, temperature_index
+from product_server import DEFAULT_PREFIX, MAX_HEADER_BYTES, ByteLRU, ProductServer, etag_matches
+
+RENDER_PATH = '/render'
+POINT_PATH = '/point'
+STATS_PATH = '/stats'
+MAX_POINTS = 64
+CONTENT_TYPES = {'jpg': 'image/jpeg', 'webp': 'image/webp', 'png': 'image/png'}
+MAX_RENDER_WIDTH = 4096
+
+
+# ============================================================================
+# WARM STATE
+# ============================================================================
+
+def load_palette_sidecars(directory):
+    """Palettes keyed by channel from every *.palette.json under directory (generate_indexed_products)."""
+    palettes = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.endswith('.palette.json'):
+                with open(os.path.join(root, name)) as f:
+                    sidecar = json.load(f)
+                palettes.setdefault(sidecar['channel'], palette_from_sidecar(sidecar))
+    return palettes
+
+
+class ArchiveState:
+    """One product archive held in memory: products, scan-angle axes and attributes."""
+
+    def __init__(self, path):
+        start_time = time.time()
+        self.path = path
+        self.version = os.stat(path).st_mtime_ns
+        self.products = {}
+        self.units = {}
+        with h5py.File(path, 'r') as h5:
+            self.frame = str(h5.attrs.get('time_coverage_start', ''))
+            self.projection = {key: float(h5.attrs[key])
+                               for key in ('sat_lon', 'sat_height', 'semi_major', 'semi_minor')}
+            self.x_coords = h5['x'][...]
+            self.y_coords = h5['y'][...]
+            for key, dataset in h5['products'].items():
+                self.products[key] = dataset[...]
+                self.units[key] = str(dataset.attrs.get('units', ''))
+        self.load_time = time.time() - start_time
+        self._axes = {}
+        self._region_tables = {}
+        self._tables_lock = threading.Lock()
+
+    def axes(self, height, width):
+        """Scan-angle pixel centres of a height x width product grid."""
+        axes = self._axes.get((height, width))
+        if axes is None:
+            axes = self._axes[(height, width)] = (pixel_axis_coords(self.x_coords, width),
+                                                  pixel_axis_coords(self.y_coords, height))
+        return axes
+
+    @property
+    def extent(self):
+        """Pixel-edge scan extent, the same layout as authority_extent (fixed_grid_position)."""
+        return pixel_edge_extent(self.x_coords[0], self.x_coords[-1], self.y_coords[0], self.y_coords[-1],
+                                 len(self.x_coords), len(self.y_coords))
+
+    def region_tables(self, key):
+        """Region statistics tables of a 2-D product, built on first use."""
+        with self._tables_lock:
+            tables = self._region_tables.get(key)
+            if tables is None:
+                if self.products[key].ndim != 2:
+                    raise ValueError(f"{key} is not a single-channel product")
+                thresholds = [t + 273.15 for t in COLD_CLOUD_THRESHOLDS_C] if self.units[key] == 'K' else []
+                tables = self._region_tables[key] = build_region_tables(self.products[key], thresholds)
+            return tables
+
+    @property
+    def nbytes(self):
+        return sum(data.nbytes for data in self.products.values())
+
+
+# ============================================================================
+# RENDERING
+# ============================================================================
+
+@lru_cache(maxsize=1024)
+def bounds_window(bounds, x0, dx, y0, dy, height, width, projection_items, samples=33):
+    """
+    Pixel window (row_start, row_stop, col_start, col_stop) covering lat/lon
+    bounds on a fixed grid with axis origin / step (x0, dx), (y0, dy).
+
+    The bounds outline and interior are projected exactly, so the window is
+    the smallest rectangle holding every visible point. None when the
+    domain is not in the scene.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounds
+    lat, lon = np.meshgrid(np.linspace(min_lat, max_lat, samples), np.linspace(min_lon, max_lon, samples))
+    x, y = latlon_to_goes_fixed_grid(lat, lon, dict(projection_items))
+    visible = np.isfinite(x)
+    if not visible.any():
+        return None
+    cols = (x[visible] - x0) / dx
+    rows = (y[visible] - y0) / dy
+    row_start, row_stop = max(0, int(np.floor(rows.min()))), min(height, int(np.ceil(rows.max())) + 1)
+    col_start, col_stop = max(0, int(np.floor(cols.min()))), min(width, int(np.ceil(cols.max())) + 1)
+    if row_start >= row_stop or col_start >= col_stop:
+        return None
+    return row_start, row_stop, col_start, col_stop
+
+
+def resize_window(data, width):
+    """Area-average (downscale) or bilinear (upscale) resize to width, aspect kept."""
+    height, current_width = data.shape[:2]
+    if not width or width == current_width:
+        return data
+    new_height = max(1, round(height * width / current_width))
+    resample = Image.BOX if width < current_width else Image.BILINEAR
+    if data.dtype == np.uint8:
+        return np.asarray(Image.fromarray(np.ascontiguousarray(data)).resize((width, new_height), resample))
+    data = np.ascontiguousarray(data, dtype=np.float32)
+    valid = np.isfinite(data)
+    filled = Image.fromarray(np.where(valid, data, 0).astype(np.float32), 'F').resize((width, new_height), resample)
+    weight = Image.fromarray(valid.astype(np.float32), 'F').resize((width, new_height), resample)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.asarray(filled) / np.asarray(weight)
+
+
+def colorize(values, units, palette=None):
+    """RGB uint8 image of resampled product values (IR through its palette when one is loaded)."""
+    if values.ndim == 3:
+        return np.ascontiguousarray(values, dtype=np.uint8)
+    if units == 'K' and palette is not None and palette.get('temp_celsius') is not None:
+        return palette['palette'][temperature_index(values, palette['temp_celsius'], palette['enhanced'])]
+    if units == 'K':
+        # Same default stretch as the IR enhancement for channels without a palette
+        gray = np.clip((np.nan_to_num(values, nan=373.15) - 173.15) / 200 * 255, 0, 255)
+    elif units == '%':
+        gray = np.clip(np.nan_to_num(values, nan=0.0) / 100 * 255, 0, 255)
+    else:
+        gray = np.nan_to_num(values, nan=0.0)
+    return np.repeat(gray.astype(np.uint8)[..., None], 3, axis=2)
+
+
+class RenderService:
+    """
+    Renders (product, window, width, format) from a warm ArchiveState.
+
+    submit() returns a concurrent.futures.Future of {'bytes', 'etag', 'window',
+    'shape', 'frame', 'render_ms'}; a request identical to one in flight gets
+    the same future, and finished renders are kept in a byte-bounded LRU.
+    A rewritten archive is reloaded on a background thread; requests keep
+    rendering from the current state until the new one replaces it.
+    """
+
+    def __init__(self, archive_path, palettes=None, cache_bytes=256 * 1024 * 1024, max_workers=2,
+                 check_interval=5.0):
+        self.archive_path = archive_path
+        self.palettes = palettes or {}
+        self.check_interval = check_interval
+        self.results = ByteLRU(cache_bytes)
+        self.stats = {'renders': 0, 'cache_hits': 0, 'coalesced': 0, 'errors': 0, 'reloads': 0}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='render')
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='reload')
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._reloading = None
+        self._checked = 0.0
+        self.state = ArchiveState(archive_path)
+        print(f"Render service: {len(self.state.products)} products from {archive_path} "
+              f"({self.state.nbytes / 1024 / 1024:.0f} MB in memory, {self.state.load_time:.1f}s), "
+              f"frame {self.state.frame}")
+
+    def refresh(self):
+        """
+        Start reloading the archive if it was rewritten (checked at most every
+        check_interval seconds). Never blocks: the new ArchiveState is built
+        on the reload thread and swapped in once complete. Returns the Future
+        of the reload in progress, or None.
+        """
+        now = time.time()
+        if now - self._checked < self.check_interval:
+            return self._reloading
+        self._checked = now
+        try:
+            version = os.stat(self.archive_path).st_mtime_ns
+        except OSError:
+            return self._reloading
+        with self._lock:
+            if self._reloading is None and version != self.state.version:
+                self._reloading = self._loader.submit(self._reload)
+            return self._reloading
+
+    def _reload(self):
+        try:
+            state = ArchiveState(self.archive_path)
+        except Exception as e:
+            # e.g. caught mid-write; the next refresh tries again
+            with self._lock:
+                self._reloading = None
+            print(f"Render service: reload of {self.archive_path} failed: {e}")
+            raise
+        with self._lock:
+            self.state = state
+            self.stats['reloads'] += 1
+            self._reloading = None
+        print(f"Render service: reloaded {self.archive_path}, frame {state.frame}")
+        return state
+
+    def resolve_window(self, state, product, bounds=None, window=None):
+        height, width = state.products[product].shape[:2]
+        if window is not None:
+            row_start, row_stop, col_start, col_stop = (int(v) for v in window)
+            window = (max(0, row_start), min(height, row_stop), max(0, col_start), min(width, col_stop))
+            if window[0] >= window[1] or window[2] >= window[3]:
+                raise ValueError(f"Empty window {window}")
+            return window
+        if bounds is None:
+            return 0, height, 0, width
+        x_axis, y_axis = state.axes(height, width)
+        window = bounds_window(tuple(float(b) for b in bounds), float(x_axis[0]), float(x_axis[1] - x_axis[0]),
+                               float(y_axis[0]), float(y_axis[1] - y_axis[0]), height, width,
+                               tuple(sorted(state.projection.items())))
+        if window is None:
+            raise ValueError(f"Bounds {bounds} are not in the scene")
+        return window
+
+    def submit(self, product, bounds=None, window=None, width=None, fmt='png', quality=85):
+        self.refresh()
+        state = self.state
+        if product not in state.products:
+            raise KeyError(product)
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown format {fmt}")
+        if width is not None and not 0 < width <= MAX_RENDER_WIDTH:
+            raise ValueError(f"Width must be 1-{MAX_RENDER_WIDTH}")
+        window = self.resolve_window(state, product, bounds, window)
+        key = (product, window, width, fmt, quality if fmt != 'png' else None)
+
+        with self._lock:
+            cached = self.results.get(key, state.version)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                future = Future()
+                future.set_result(cached)
+                return future
+            future = self._inflight.get((state.version, key))
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return future
+            future = self._executor.submit(self._render, state, key)
+            self._inflight[(state.version, key)] = future
+        future.add_done_callback(lambda done: self._finish(state.version, key, done))
+        return future
+
+    def render(self, product, **options):
+        """Blocking render; see submit."""
+        return self.submit(product, **options).result()
+
+    def _finish(self, version, key, future):
+        with self._lock:
+            self._inflight.pop((version, key), None)
+            if future.exception() is not None:
+                self.stats['errors'] += 1
+                return
+            self.stats['renders'] += 1
+            result = future.result()
+            self.results.put(key, version, result, len(result['bytes']))
+
+    def _render(self, state, key):
+        start_time = time.time()
+        product, (row_start, row_stop, col_start, col_stop), width, fmt, quality = key
+        values = resize_window(state.products[product][row_start:row_stop, col_start:col_stop], width)
+        image = colorize(values, state.units[product], self.palettes.get(product))
+        buffer, size, _ = encode_image_buffer(image, fmt, quality or 85)
+        with buffer.getbuffer() as view:
+            data = bytes(view[:size])
+        return {
+            'bytes': data,
+            'etag': f'"{hashlib.sha256(data).hexdigest()[:32]}"',
+            'window': key[1],
+            'shape': image.shape[:2],
+            'frame': state.frame,
+            'render_ms': (time.time() - start_time) * 1000,
+        }
+
+    def region_stats(self, product, window=None, bounds=None, polygon=None):
+        """
+        Statistics of a channel over a pixel window, a lat/lon bounds box
+        (minLat, maxLat, minLon, maxLon) or a lat/lon polygon [(lat, lon), ...];
+        see archive.rect_stats / polygon_stats.
+        """
+        self.refresh()
+        state = self.state
+        if product not in state.products:
+            raise KeyError(product)
+        tables = state.region_tables(product)
+        if window is not None:
+            result = rect_stats(tables, window)
+        else:
+            if bounds is not None:
+                min_lat, max_lat, min_lon, max_lon = bounds
+                # Box outline densified so its edges follow the lat/lon lines
+                edge = np.linspace(0.0, 1.0, 16, endpoint=False)
+                lat = np.concatenate([np.full(16, min_lat), min_lat + edge * (max_lat - min_lat),
+                                      np.full(16, max_lat), max_lat - edge * (max_lat - min_lat)])
+                lon = np.concatenate([min_lon + edge * (max_lon - min_lon), np.full(16, max_lon),
+                                      max_lon - edge * (max_lon - min_lon), np.full(16, min_lon)])
+            elif polygon is not None:
+                lat, lon = np.asarray(polygon, dtype=np.float64).T
+            else:
+                raise ValueError("Need a window, bounds or polygon")
+            vertices = latlon_polygon_vertices(lat, lon, state.projection, state.extent, *tables['shape'])
+            result = polygon_stats(tables, vertices)
+        result.update(product=product, units=state.units[product], frame=state.frame)
+        return result
+
+    def summary(self):
+        stats = self.stats
+        return (f"{stats['renders']} renders, {stats['cache_hits']} cache hits, {stats['coalesced']} coalesced, "
+                f"{stats['errors']} errors, {stats['reloads']} reloads, "
+                f"LRU {len(self.results)} results / {self.results.bytes / 1024 / 1024:.1f} MB")
+
+
+# ============================================================================
+# HTTP
+# ============================================================================
+
+def parse_render_query(query):
+    """submit() arguments from a /render query string."""
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    options = {'fmt': params.get('format', 'png'), 'quality': int(params.get('quality', 85))}
+    if 'bounds' in params:
+        options['bounds'] = tuple(float(v) for v in params['bounds'].split(','))
+    if 'window' in params:
+        options['window'] = tuple(int(v) for v in params['window'].split(','))
+    if 'width' in params:
+        options['width'] = int(params['width'])
+    for name in ('bounds', 'window'):
+        if name in options and len(options[name]) != 4:
+            raise ValueError(f"{name} needs 4 values")
+    return params['product'], options
+
+
+def parse_point_query(query):
+    """PointSeriesQuery.query() arguments from a /point query string."""
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    options = {
+        'lat': [float(v) for v in params['lat'].split(',')],
+        'lon': [float(v) for v in params['lon'].split(',')],
+    }
+    if len(options['lat']) != len(options['lon']) or len(options['lat']) > MAX_POINTS:
+        raise ValueError(f"lat / lon need the same number of points (at most {MAX_POINTS})")
+    if 'products' in params:
+        options['products'] = params['products'].split(',')
+    if 'frames' in params:
+        options['frames'] = int(params['frames'])
+    for name in ('start', 'end'):
+        if name in params:
+            options[name] = params[name]
+    return options
+
+
+def parse_stats_query(query):
+    """RenderService.region_stats() arguments from a /stats query string."""
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    options = {'product': params['product']}
+    if 'window' in params:
+        options['window'] = tuple(int(v) for v in params['window'].split(','))
+    if 'bounds' in params:
+        options['bounds'] = tuple(float(v) for v in params['bounds'].split(','))
+    if 'polygon' in params:
+        options['polygon'] = [tuple(float(v) for v in point.split(',')) for point in params['polygon'].split(';')]
+        if len(options['polygon']) < 3 or any(len(point) != 2 for point in options['polygon']):
+            raise ValueError("polygon needs at least 3 lat,lon points")
+    for name in ('window', 'bounds'):
+        if name in options and len(options[name]) != 4:
+            raise ValueError(f"{name} needs 4 values")
+    return options
+
+
+def stats_response(result):
+    """JSON body of a region_stats result; threshold fractions are keyed in C for K products."""
+    body = dict(result)
+    if result['units'] == 'K':
+        body['fractions'] = {f"{t - 273.15:g}C": f for t, f in result['fractions'].items()}
+    body['query_ms'] = round(result['query_ms'], 3)
+    return json.dumps(body, separators=(',', ':')).encode()
+
+
+def point_response(result):
+    """JSON body of a PointSeriesQuery result (NaN as null)."""
+    body = {
+        'times': [f"{t}Z" for t in result['times']],
+        'lat': result['lat'].tolist(),
+        'lon': result['lon'].tolist(),
+        'products': {
+            key: {
+                'units': product['units'],
+                'pixels': np.stack([product['rows'], product['cols']], axis=1).tolist(),
+                'values': grid_to_list(product['values']),
+            }
+            for key, product in result['products'].items()
+        },
+        'query_ms': round(result['query_ms'], 2),
+    }
+    return json.dumps(body, separators=(',', ':')).encode()
+
+
+class RenderServer(ProductServer):
+    """
+    ProductServer with a {prefix}/render endpoint backed by a RenderService
+    and, given a PointSeriesQuery, a {prefix}/point endpoint.
+    """
+
+    def __init__(self, root, service, point_query=None, **options):
+        super().__init__(root, **options)
+        self.service = service
+        self.point_query = point_query
+
+    async def respond(self, writer, method, target, headers, keep_alive):
+        url = urlsplit(target)
+        if url.path == self.prefix + POINT_PATH and self.point_query is not None:
+            await self.respond_json(writer, method, keep_alive, lambda: point_response(
+                self.point_query.query(**parse_point_query(url.query))))
+            return
+        if url.path == self.prefix + STATS_PATH and self.service is not None:
+            await self.respond_json(writer, method, keep_alive, lambda: stats_response(
+                self.service.region_stats(**parse_stats_query(url.query))))
+            return
+        if url.path != self.prefix + RENDER_PATH or self.service is None:
+            await super().respond(writer, method, target, headers, keep_alive)
+            return
+        if method not in ('GET', 'HEAD'):
+            await self.send_error(writer, 405, keep_alive, {'Allow': 'GET, HEAD'})
+            return
+        try:
+            product, options = parse_render_query(url.query)
+            result = await asyncio.wrap_future(self.service.submit(product, **options))
+        except KeyError:
+            await self.send_error(writer, 404, keep_alive)
+            return
+        except ValueError:
+            await self.send_error(writer, 400, keep_alive)
+            return
+        except Exception as e:
+            print(f"Render failed for {target}: {e}")
+            await self.send_error(writer, 500, keep_alive)
+            return
+
+        response = {
+            'ETag': result['etag'],
+            'Cache-Control': self.cache_control,
+            'Access-Control-Allow-Origin': '*',
+            'X-Frame-Time': result['frame'],
+            'X-Window': ','.join(str(v) for v in result['window']),
+        }
+        if etag_matches(headers.get('if-none-match', ''), result['etag']):
+            self.write_head(writer, 304, response, keep_alive)
+            await writer.drain()
+            return
+        response['Content-Type'] = CONTENT_TYPES[options['fmt']]
+        response['Content-Length'] = len(result['bytes'])
+        self.write_head(writer, 200, response, keep_alive)
+        if method == 'GET':
+            writer.write(result['bytes'])
+            self.stats['bytes_sent'] += len(result['bytes'])
+        await writer.drain()
+
+    async def respond_json(self, writer, method, keep_alive, build_body):
+        """Answer with the JSON bytes build_body() returns (run in a thread); bad queries are 400."""
+        if method not in ('GET', 'HEAD'):
+            await self.send_error(writer, 405, keep_alive, {'Allow': 'GET, HEAD'})
+            return
+        try:
+            body = await asyncio.to_thread(build_body)
+        except (KeyError, ValueError):
+            await self.send_error(writer, 400, keep_alive)
+            return
+        except Exception as e:
+            print(f"Query failed: {e}")
+            await self.send_error(writer, 500, keep_alive)
+            return
+        response = {
+            'Content-Type': 'application/json',
+            'Content-Length': len(body),
+            'Cache-Control': 'no-cache',
+            'Access-Control-Allow-Origin': '*',
+        }
+        self.write_head(writer, 200, response, keep_alive)
+        if method == 'GET':
+            writer.write(body)
+            self.stats['bytes_sent'] += len(body)
+        await writer.drain()
+
+
+async def serve(archive_path, root, host='127.0.0.1', port=8080, palettes=None, cache_bytes=256 * 1024 * 1024,
+                max_workers=2, timeseries_path=None, **options):
+    """Run a RenderServer until cancelled (archive_path / timeseries_path enable /render / /point)."""
+    service = RenderService(archive_path, palettes, cache_bytes, max_workers) if archive_path else None
+    point_query = PointSeriesQuery(timeseries_path) if timeseries_path else None
+    render_server = RenderServer(root, service, point_query, **options)
+    server = await asyncio.start_server(render_server.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+    base = f"http://{host}:{port}{render_server.prefix}"
+    if service:
+        print(f"Rendering at {base}{RENDER_PATH}")
+    if point_query:
+        print(f"Point queries at {base}{POINT_PATH} from {timeseries_path}")
+    print(f"Serving {render_server.root} at {base}/")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        print(render_server.summary())
+        if service:
+            print(service.summary())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Render custom domains on demand from a product archive.")
+    parser.add_argument('archive', nargs='?', help="product archive from write_product_archive")
+    parser.add_argument('--timeseries', help="time-series archive from append_timeseries_frame (enables /point)")
+    parser.add_argument('--root', default='.', help="directory also served as static files")
+    parser.add_argument('--palettes', help="directory of *.palette.json sidecars (generate_indexed_products)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--prefix', default=DEFAULT_PREFIX)
+    parser.add_argument('--cache-mb', type=float, default=256, help="rendered-result LRU size")
+    parser.add_argument('--workers', type=int, default=2, help="render threads")
+    args = parser.parse_args()
+
+    if args.archive and Image is None:
+        raise SystemExit("Pillow is required for rendering")
+    try:
+        asyncio.run(serve(args.archive, args.root, args.host, args.port,
+                          palettes=load_palette_sidecars(args.palettes) if args.palettes else None,
+                          cache_bytes=int(args.cache_mb * 1024 * 1024), max_workers=args.workers,
+                          timeseries_path=args.timeseries, prefix=args.prefix))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,501 @@
+"""
+Map tile stages of the pipeline export:
+
+- generate_tile_pyramids: XYZ tiles in native GEOS pixel space
+- generate_mercator_tiles: Web Mercator tiles through cached GEOS index maps
+- generate_cogs: Cloud-Optimized GeoTIFFs from the projection authority
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from archive import authority_extent, fixed_grid_pixels
+from convert_geodata import (GEODATA_DOMAINS, PHYSICAL_ENCODINGS, SCENE_DOMAINS, cod_base_path, cod_product_name,
+                             domain_windows, format_cod_timestamp, goes_fixed_grid_to_latlon, product_values,
+                             projection_params, scan_start_time, scene_domain_names)
+from imagery import Image, encode_image_file
+
+# Optional GDAL for Cloud-Optimized GeoTIFF export
+try:
+    from osgeo import gdal
+except ImportError:
+    gdal = None
+
+
+# ============================================================================
+# TILE PYRAMID
+# ============================================================================
+# XYZ tiles in native GEOS pixel space: z = max_zoom is full resolution and
+# each lower zoom halves it by 2x2 area averaging of the level above. Tiles
+# are hashed; a tile identical to one already encoded (previous frame, or
+# repeated space / off-disk tiles in this frame) is hard-linked instead of
+# being encoded again.
+
+TILE_SIZE = 256
+TILE_MANIFEST = 'tiles.json'
+
+
+def downsample_2x(level):
+    """Area-average 2x2 blocks (odd edges replicate the last row / col)."""
+    height, width = level.shape[:2]
+    if height % 2 or width % 2:
+        pad = ((0, height % 2), (0, width % 2)) + ((0, 0),) * (level.ndim - 2)
+        level = np.pad(level, pad, mode='edge')
+        height, width = level.shape[:2]
+    blocks = level.reshape((height // 2, 2, width // 2, 2) + level.shape[2:])
+    return ((blocks.sum(axis=(1, 3), dtype=np.uint16) + 2) // 4).astype(np.uint8)
+
+
+def build_pyramid(image, tile=TILE_SIZE):
+    """
+    [level z=0, ..., z=max_zoom] arrays; z=0 fits in a single tile.
+
+    One pass from full resolution down: every level is averaged from the one
+    above it, never from the original.
+    """
+    max_zoom = max(0, int(np.ceil(np.log2(max(image.shape[:2]) / tile))))
+    levels = [np.ascontiguousarray(image)]
+    for _ in range(max_zoom):
+        levels.append(downsample_2x(levels[-1]))
+    return levels[::-1]
+
+
+def _link_or_copy(source, target):
+    if os.path.exists(target):
+        os.remove(target)
+    try:
+        os.link(source, target)
+    except OSError:
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            dst.write(src.read())
+
+
+def write_tile_pyramid(image, output_dir, frame, tile=TILE_SIZE, fmt='jpg', quality=85, max_workers=4):
+    """
+    Write {output_dir}/{frame}/{z}/{x}/{y}.{fmt} for every pyramid tile.
+
+    Edge tiles are padded with black to tile x tile. The frame's tiles.json
+    maps z/x/y to tile hashes; output_dir/latest.json points at the newest
+    frame, whose tiles are reused when their hash matches. Returns a result
+    dict with encoded / reused tile counts.
+    """
+    start_time = time.time()
+    frame_dir = os.path.join(output_dir, frame)
+
+    previous = {}
+    latest_path = os.path.join(output_dir, 'latest.json')
+    if os.path.exists(latest_path):
+        with open(latest_path) as f:
+            previous_frame = json.load(f)['frame']
+        manifest_path = os.path.join(output_dir, previous_frame, TILE_MANIFEST)
+        if previous_frame != frame and os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                previous_hashes = json.load(f)['tiles']
+            previous = {digest: os.path.join(output_dir, previous_frame, key + '.' + fmt)
+                        for key, digest in previous_hashes.items()}
+
+    levels = build_pyramid(image, tile)
+    hashes = {}
+    first_of_hash = {}
+    encode_jobs = []
+    link_jobs = []
+    for z, level in enumerate(levels):
+        rows = -(-level.shape[0] // tile)
+        cols = -(-level.shape[1] // tile)
+        for y in range(rows):
+            for x in range(cols):
+                block = level[y * tile:(y + 1) * tile, x * tile:(x + 1) * tile]
+                if block.shape[:2] != (tile, tile):
+                    padded = np.zeros((tile, tile) + level.shape[2:], dtype=np.uint8)
+                    padded[:block.shape[0], :block.shape[1]] = block
+                    block = padded
+                block = np.ascontiguousarray(block)
+                key = f"{z}/{x}/{y}"
+                digest = hashlib.blake2b(block.tobytes(), digest_size=16).hexdigest()
+                hashes[key] = digest
+                path = os.path.join(frame_dir, str(z), str(x), f"{y}.{fmt}")
+                if digest in previous and os.path.exists(previous[digest]):
+                    link_jobs.append((previous[digest], path))
+                elif digest in first_of_hash:
+                    link_jobs.append((first_of_hash[digest], path))
+                else:
+                    first_of_hash[digest] = path
+                    encode_jobs.append((block, path))
+
+    for directory in {os.path.dirname(path) for _, path in encode_jobs + link_jobs}:
+        os.makedirs(directory, exist_ok=True)
+
+    encoded_bytes = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(encode_image_file, block, path, fmt, quality) for block, path in encode_jobs]
+        for future in as_completed(futures):
+            encoded_bytes += future.result()[0]
+    # Links last: in-frame duplicates point at tiles encoded above
+    for source, path in link_jobs:
+        _link_or_copy(source, path)
+
+    with open(os.path.join(frame_dir, TILE_MANIFEST), 'w') as f:
+        json.dump({'frame': frame, 'tile': tile, 'format': fmt, 'max_zoom': len(levels) - 1,
+                   'width': image.shape[1], 'height': image.shape[0], 'tiles': hashes}, f)
+    with open(latest_path, 'w') as f:
+        json.dump({'frame': frame}, f)
+
+    return {'success': True, 'path': frame_dir, 'tiles': len(hashes), 'encoded': len(encode_jobs),
+            'reused': len(link_jobs), 'bytes': encoded_bytes, 'max_zoom': len(levels) - 1,
+            'time': time.time() - start_time}
+
+
+def generate_tile_pyramids(rgb_products, coordinate_data, metadata, scene='conus', output_dir='tiles',
+                           domains=None, tile=TILE_SIZE, fmt='jpg', quality=85, max_workers=4):
+    """
+    Tile pyramids for every RGB product and registered domain of one scan.
+
+    Pyramids land in {output_dir}/{base_path}/{product}/{timestamp}/{z}/{x}/{y}.{fmt}.
+    """
+    start_time = time.time()
+    if Image is None:
+        print("Tile pyramid skipped: Pillow is not installed")
+        return {'success': False, 'error': "Pillow is not installed", 'results': []}
+
+    projection = projection_params(coordinate_data)
+    timestamp = format_cod_timestamp(scan_start_time(metadata)) or 'latest'
+    domains = scene_domain_names(scene, domains)
+
+    results = []
+    for key, rgb in (rgb_products or {}).items():
+        _, _, windows = domain_windows(rgb.shape[0], rgb.shape[1], coordinate_data, projection, domains)
+        product_name = cod_product_name(key)
+        for name, (row0, row1, col0, col1) in windows.items():
+            domain = GEODATA_DOMAINS[name]
+            product_dir = os.path.join(output_dir, cod_base_path(domain), product_name)
+            result = write_tile_pyramid(rgb[row0:row1, col0:col1], product_dir, timestamp, tile, fmt,
+                                        quality, max_workers)
+            result.update({'domain': name, 'product': key})
+            results.append(result)
+            print(f"  {name} {product_name}: z0-{result['max_zoom']}, {result['tiles']} tiles, "
+                  f"{result['encoded']} encoded / {result['reused']} reused "
+                  f"({result['bytes'] / 1024:.0f} KB) in {result['time']:.1f}s")
+
+    print(f"Tile pyramids complete in {time.time() - start_time:.1f}s")
+    return {'success': True, 'timestamp': timestamp, 'results': results}
+
+
+# ============================================================================
+# WEB MERCATOR TILES
+# ============================================================================
+# Map-aligned XYZ tiles reprojected from GEOS pixels. The expensive part, the
+# per-pixel inverse projection, is done once per (satellite, domain, zoom,
+# grid) into a sparse nearest-neighbour index map cached on disk; every frame
+# is then one vectorized gather.
+
+MERCATOR_TILE = 256
+MERCATOR_MAX_LAT = 85.05112878
+
+
+def authority_bounds(authority, samples=64):
+    """Lat/lon bounds of the authority's scan extent (Mercator-clamped)."""
+    lat, lon = goes_fixed_grid_to_latlon(np.linspace(authority.x_min, authority.x_max, samples),
+                                         np.linspace(authority.y_max, authority.y_min, samples),
+                                         authority.params())
+    return (max(float(np.nanmin(lat)), -MERCATOR_MAX_LAT), min(float(np.nanmax(lat)), MERCATOR_MAX_LAT),
+            float(np.nanmin(lon)), float(np.nanmax(lon)))
+
+
+def mercator_tile_range(bounds, zoom):
+    """Inclusive XYZ tile range (x0, x1, y0, y1) covering bounds at zoom."""
+    min_lat, max_lat, min_lon, max_lon = bounds
+    n = 2 ** zoom
+
+    def tile_xy(lat, lon):
+        lat = np.radians(np.clip(lat, -MERCATOR_MAX_LAT, MERCATOR_MAX_LAT))
+        x = int((lon + 180.0) / 360.0 * n)
+        y = int((1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0 * n)
+        return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+    x0, y0 = tile_xy(max_lat, min_lon)
+    x1, y1 = tile_xy(min_lat, max_lon)
+    return x0, x1, y0, y1
+
+
+def mercator_pixel_latlon(zoom, x, y, tile=MERCATOR_TILE):
+    """Lat/lon of the pixel centres of XYZ tile (zoom, x, y) as (tile, tile) arrays."""
+    size = 2 ** zoom * tile
+    px = x * tile + np.arange(tile) + 0.5
+    py = y * tile + np.arange(tile) + 0.5
+    lon = px / size * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * py / size))))
+    return np.broadcast_to(lat[:, None], (tile, tile)), np.broadcast_to(lon[None, :], (tile, tile))
+
+
+def build_mercator_index(authority, width, height, bounds, zoom, tile=MERCATOR_TILE):
+    """
+    Sparse nearest-neighbour index map from Web Mercator tiles to GEOS pixels.
+
+    Mercator pixel centres map to the width x height product's pixels through
+    fixed_grid_pixels with the authority's pixel-edge extent. Returns {'tiles': (n, 2) x/y, 'dst': flat indices into the
+    (n, tile, tile) output, 'src': flat indices into the product} with tiles
+    that hold no scan pixels left out.
+    """
+    projection = authority.params()
+    extent = authority_extent(authority)
+    src_dtype = np.int32 if width * height < 2 ** 31 else np.int64
+    x0, x1, y0, y1 = mercator_tile_range(bounds, zoom)
+
+    tiles, dst, src = [], [], []
+    for ty in range(y0, y1 + 1):
+        for tx in range(x0, x1 + 1):
+            lat, lon = mercator_pixel_latlon(zoom, tx, ty, tile)
+            row, col = fixed_grid_pixels(lat, lon, projection, extent, height, width)
+            row, col = row.ravel(), col.ravel()
+            valid = np.flatnonzero(row >= 0)
+            if valid.size == 0:
+                continue
+            dst.append((len(tiles) * tile * tile + valid).astype(np.int32))
+            src.append(row[valid].astype(src_dtype) * width + col[valid].astype(src_dtype))
+            tiles.append((tx, ty))
+
+    return {
+        'zoom': zoom, 'tile': tile, 'width': width, 'height': height,
+        'tiles': np.array(tiles, dtype=np.int32).reshape(-1, 2),
+        'dst': np.concatenate(dst) if dst else np.zeros(0, dtype=np.int32),
+        'src': np.concatenate(src) if src else np.zeros(0, dtype=src_dtype),
+    }
+
+
+def load_mercator_index(cache_dir, domain_name, authority, width, height, bounds, zoom, tile=MERCATOR_TILE):
+    """
+    Index map for (satellite, domain, zoom, grid), built once and cached as .npz.
+
+    The file name carries a hash of the pixel-edge extent and bounds, so a
+    moved mesoscale sector or different product grid gets its own map.
+    """
+    extent = authority_extent(authority)
+    key = json.dumps([authority.sat_lon, [extent[name] for name in ('x_min', 'x_max', 'y_min', 'y_max')],
+                      list(bounds), zoom, tile])
+    digest = hashlib.sha256(key.encode('ascii')).hexdigest()[:12]
+    path = os.path.join(cache_dir, f"mercator.{domain_name}.z{zoom}.{width}x{height}.{digest}.npz")
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            return {name: cached[name] if cached[name].ndim else cached[name].item() for name in cached.files}
+
+    index = build_mercator_index(authority, width, height, bounds, zoom, tile)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, **index)
+    os.replace(tmp_path, path)
+    return index
+
+
+def reproject_to_mercator(image, index):
+    """
+    Apply an index map to one frame: (n, tile, tile, channels + 1) uint8 tiles
+    in index['tiles'] order, with an alpha channel (0 where there is no data).
+    """
+    tile = index['tile']
+    channels = image.shape[2] if image.ndim == 3 else 1
+    # Pack each RGBA / LA pixel into one uint32 / uint16 so the gather moves
+    # whole pixels instead of channel by channel
+    pixel_type = {2: np.uint16, 4: np.uint32}[channels + 1]
+    packed = np.empty(image.shape[:2] + (channels + 1,), dtype=np.uint8)
+    packed[..., :channels] = image.reshape(image.shape[:2] + (channels,))
+    packed[..., channels] = 255
+
+    out = np.zeros(len(index['tiles']) * tile * tile, dtype=pixel_type)
+    out[index['dst']] = packed.reshape(-1).view(pixel_type)[index['src']]
+    return out.view(np.uint8).reshape(len(index['tiles']), tile, tile, channels + 1)
+
+
+def generate_mercator_tiles(rgb_products, authority, metadata, scene='conus', output_dir='mercator',
+                            domains=None, zooms=(4, 5, 6, 7), cache_dir='mercator_cache', fmt='png',
+                            quality=85, max_workers=4):
+    """
+    Web Mercator XYZ tiles for every RGB product and registered domain.
+
+    authority is the Cell 4 GOESProjectionAuthority. Tiles land in
+    {output_dir}/{base_path}/{product}/{timestamp}/{z}/{x}/{y}.{fmt}; PNG / WebP
+    keep the alpha channel, JPEG drops it.
+    """
+    start_time = time.time()
+    if Image is None:
+        print("Mercator tiles skipped: Pillow is not installed")
+        return {'success': False, 'error': "Pillow is not installed", 'results': []}
+
+    timestamp = format_cod_timestamp(scan_start_time(metadata)) or 'latest'
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for name in scene_domain_names(scene, domains):
+            domain = GEODATA_DOMAINS[name]
+            bounds = domain['bounds'] or authority_bounds(authority)
+            for zoom in zooms:
+                indexes = {}
+                for key, rgb in (rgb_products or {}).items():
+                    zoom_start = time.time()
+                    height, width = rgb.shape[:2]
+                    if (height, width) not in indexes:
+                        indexes[(height, width)] = load_mercator_index(cache_dir, name, authority, width, height,
+                                                                      bounds, zoom)
+                    index = indexes[(height, width)]
+                    index_time = time.time() - zoom_start
+
+                    tiles = reproject_to_mercator(rgb, index)
+                    if fmt == 'jpg':
+                        tiles = tiles[..., :-1]
+                    frame_dir = os.path.join(output_dir, cod_base_path(domain), cod_product_name(key), timestamp)
+                    jobs = []
+                    for (tx, ty), tile_image in zip(index['tiles'], tiles):
+                        path = os.path.join(frame_dir, str(zoom), str(tx), f"{ty}.{fmt}")
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        jobs.append(executor.submit(encode_image_file, tile_image, path, fmt, quality))
+                    encoded = sum(job.result()[0] for job in jobs)
+
+                    results.append({'domain': name, 'product': key, 'zoom': zoom, 'tiles': len(jobs),
+                                    'bytes': encoded, 'index_time': index_time,
+                                    'time': time.time() - zoom_start})
+                    print(f"  {name} {cod_product_name(key)} z{zoom}: {len(jobs)} tiles "
+                          f"({encoded / 1024:.0f} KB), index {index_time * 1000:.0f} ms, "
+                          f"total {(time.time() - zoom_start) * 1000:.0f} ms")
+
+    print(f"Mercator tiles complete in {time.time() - start_time:.1f}s")
+    return {'success': True, 'timestamp': timestamp, 'results': results}
+
+
+# ============================================================================
+# CLOUD-OPTIMIZED GEOTIFF
+# ============================================================================
+# Georeferenced COGs of whole-scene products (GOESProjectionAuthority
+# geotransform + WKT), tiled with internal overviews, so GIS clients range-read
+# only the tiles and overview levels they need.
+
+COG_BLOCKSIZE = 512
+
+
+def _mem_dataset(data):
+    """GDAL MEM dataset whose bands point straight at the NumPy buffer (no copy)."""
+    gdal_type = {np.dtype(np.uint8): gdal.GDT_Byte, np.dtype(np.float32): gdal.GDT_Float32}[data.dtype]
+    height, width = data.shape[:2]
+    bands = data.shape[2] if data.ndim == 3 else 1
+    dataset = gdal.GetDriverByName('MEM').Create('', width, height, 0, gdal_type)
+    for band in range(bands):
+        dataset.AddBand(gdal_type, options=[
+            f"DATAPOINTER={data.ctypes.data + band * data.itemsize}",
+            f"PIXELOFFSET={data.strides[1]}",
+            f"LINEOFFSET={data.strides[0]}",
+        ])
+    return dataset
+
+
+def write_cog(path, data, geotransform, wkt, compression='DEFLATE', blocksize=COG_BLOCKSIZE, quality=85,
+              nodata=None):
+    """
+    Write a uint8 (rows, cols[, bands]) or float32 (rows, cols) array as a COG.
+
+    compression is any GDAL COG codec (DEFLATE, ZSTD, LZW, JPEG, WEBP, ...);
+    JPEG / WEBP use quality, lossless codecs get a predictor. Overviews are
+    built by the COG driver, averaging around nodata when it is set. Written to a temporary name, then moved into
+    place.
+    """
+    data = np.ascontiguousarray(data)
+    source = _mem_dataset(data)
+    source.SetGeoTransform(list(geotransform))
+    source.SetProjection(wkt)
+    if nodata is not None:
+        for band in range(source.RasterCount):
+            source.GetRasterBand(band + 1).SetNoDataValue(nodata)
+
+    options = [f"COMPRESS={compression}", f"BLOCKSIZE={blocksize}", "OVERVIEWS=AUTO", "BIGTIFF=IF_SAFER"]
+    if compression in ('JPEG', 'WEBP'):
+        options.append(f"QUALITY={quality}")
+    elif compression in ('DEFLATE', 'ZSTD', 'LZW'):
+        options.append("PREDICTOR=YES")
+    if nodata is not None:
+        # The default CUBIC overview kernel spreads nodata (NaN) to every overview pixel it touches
+        options.append("OVERVIEW_RESAMPLING=AVERAGE")
+
+    tmp_path = path + '.tmp.tif'
+    output = gdal.GetDriverByName('COG').CreateCopy(tmp_path, source, options=options)
+    if output is None:
+        raise RuntimeError(f"GDAL could not write {path}: {gdal.GetLastErrorMsg()}")
+    output = None
+    source = None
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def _cog_task(task):
+    """Thread-pool worker: one product to one COG."""
+    start_time = time.time()
+    try:
+        size = write_cog(task['path'], task['data'], task['geotransform'], task['wkt'], task['compression'],
+                         task['blocksize'], task['quality'], task['nodata'])
+        return {'success': True, 'product': task['product'], 'file': task['path'], 'bytes': size,
+                'time': time.time() - start_time}
+    except Exception as e:
+        return {'success': False, 'product': task['product'], 'error': str(e), 'time': time.time() - start_time}
+
+
+def generate_cogs(channels, rgb_products, authority, metadata, scene='conus', output_dir='cog',
+                  compression='DEFLATE', rgb_compression=None, blocksize=COG_BLOCKSIZE, quality=85,
+                  max_workers=4):
+    """
+    COGs for every channel and RGB product of one scan, in parallel.
+
+    Channels are written as calibrated float32 (K / reflectance %, NaN
+    nodata) while calibrated data is still in memory, else as the enhanced
+    uint8 image. rgb_compression overrides compression for RGB products
+    (e.g. 'JPEG'). Files land in {base_path}/{product}/{scene}.{product}.{timestamp}.tif.
+    """
+    start_time = time.time()
+    if gdal is None:
+        print("COG export skipped: GDAL is not installed")
+        return {'success': False, 'error': "GDAL is not installed", 'results': [], 'files': []}
+    gdal.UseExceptions()
+
+    domain = GEODATA_DOMAINS[SCENE_DOMAINS.get(scene, scene)]
+    timestamp = format_cod_timestamp(scan_start_time(metadata)) or 'latest'
+    wkt = authority.get_wkt()
+
+    tasks = []
+    for key, product in list((channels or {}).items()) + list((rgb_products or {}).items()):
+        if isinstance(product, dict) and product.get('enhanced') is None:
+            continue
+        values, data_unit, _, _ = product_values(key, product)
+        if data_unit == '%':
+            values = values * np.float32(100.0)
+        if data_unit in PHYSICAL_ENCODINGS:
+            data, nodata, codec = np.asarray(values, dtype=np.float32), float('nan'), compression
+        else:
+            data, nodata = np.asarray(values, dtype=np.uint8), None
+            codec = (rgb_compression or compression) if data.ndim == 3 else compression
+        product_name = cod_product_name(key)
+        product_dir = os.path.join(output_dir, cod_base_path(domain), product_name)
+        os.makedirs(product_dir, exist_ok=True)
+        tasks.append({
+            'product': key, 'data': data, 'nodata': nodata, 'compression': codec,
+            'path': os.path.join(product_dir, f"{domain['cod_name']}.{product_name}.{timestamp}.tif"),
+            'geotransform': authority.get_geotransform(data.shape[1], data.shape[0]), 'wkt': wkt,
+            'blocksize': blocksize, 'quality': quality,
+        })
+
+    print(f"Writing COGs: {len(tasks)} products, timestamp {timestamp}")
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for future in as_completed([executor.submit(_cog_task, task) for task in tasks]):
+            result = future.result()
+            results.append(result)
+            if result['success']:
+                print(f"  {result['file']}: {result['bytes'] / 1024 / 1024:.1f} MB in {result['time']:.1f}s")
+            else:
+                print(f"  {result['product']}: FAILED - {result['error']}")
+
+    print(f"COGs complete in {time.time() - start_time:.1f}s")
+    return {
+        'success': all(r['success'] for r in results),
+        'timestamp': timestamp,
+        'results': results,
+        'files': [r['file'] for r in results if r['success']],
+    }